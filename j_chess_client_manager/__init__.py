@@ -1,12 +1,31 @@
 """Top-level package for j-chess client manager."""
-from j_chess_client_manager.logging import SYSTEM_LOGGER
-from j_chess_lib import __version__ as __lib__version__, __schema_version__, __author__ as __lib__author__
 
 __author__ = """RedRem95"""
 __email__ = 'redrem@botschmot.de'
 __version__ = '0.3.2'
 __project_name__ = "J-Chess Client Manager"
 
-SYSTEM_LOGGER.info(f"Running \"{__project_name__}\" Version {__version__} by {__author__}")
-SYSTEM_LOGGER.info(f"Using \"j_chess_lib\" Version {__lib__version__} by {__lib__author__} "
-                   f"with schema version {__schema_version__}")
+_LIB_ATTRIBUTES = {"__lib__version__": "__version__", "__schema_version__": "__schema_version__",
+                   "__lib__author__": "__author__"}
+
+
+def __getattr__(name: str):
+    # Logging and j_chess_lib are only imported when needed so command line tools start fast
+    if name == "SYSTEM_LOGGER":
+        from j_chess_client_manager.logging import SYSTEM_LOGGER
+        return SYSTEM_LOGGER
+    if name in _LIB_ATTRIBUTES:
+        import j_chess_lib
+        return getattr(j_chess_lib, _LIB_ATTRIBUTES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def log_versions():
+    """
+    Log the versions of the manager and of j_chess_lib
+    """
+    from j_chess_client_manager.logging import SYSTEM_LOGGER
+    from j_chess_lib import __version__ as lib_version, __schema_version__, __author__ as lib_author
+    SYSTEM_LOGGER.info(f"Running \"{__project_name__}\" Version {__version__} by {__author__}")
+    SYSTEM_LOGGER.info(f"Using \"j_chess_lib\" Version {lib_version} by {lib_author} "
+                       f"with schema version {__schema_version__}")
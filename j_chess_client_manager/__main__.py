@@ -1,59 +1,255 @@
 """Console script for j_chess_client_manager."""
-from . import SYSTEM_LOGGER
 import argparse
 import sys
 from typing import Any
-import importlib
 
-from asciimatics.screen import Screen
-from asciimatics.exceptions import ResizeScreenError
-from asciimatics.widgets.utilities import THEMES
+# Everything else is imported in main, after the arguments decided which parts are needed and whether the imports
+# are profiled
 
-from .ui import run_function_creator
 
+def _print_import_profile(profiler):
+    if profiler is not None:
+        print(profiler.stop().report(), file=sys.stderr, flush=True)
 
-def main():
 
-    available_themes = list(THEMES.keys())
-    default_theme = available_themes[0]
+def main():
 
     parser = argparse.ArgumentParser(prog="j_chess_client_manager",
                                      description="Program to manage your clients and see their playstate")
 
-    parser.add_argument("--theme", dest="theme", choices=available_themes, required=False, default=default_theme,
-                        help=f"Set the theme used for the application [Default: \"{default_theme}\"]")
+    parser.add_argument("--theme", dest="theme", type=str, required=False, default="default",
+                        help="Set the theme used for the application, one of the themes of asciimatics like "
+                             "\"monochrome\" or \"green\" [Default: \"default\"]")
+    parser.add_argument("--pieces", dest="pieces", choices=("auto", "shapes", "glyphs", "letters"), required=False,
+                        default="auto",
+                        help="How pieces are drawn on the board. \"auto\" draws shapes when the tiles are large enough "
+                             "and unicode chess symbols otherwise [Default: \"auto\"]")
     parser.add_argument("--with-package", dest="package", type=str, nargs="+", required=False, default=tuple(),
                         help="Set package to be included. Should point to a package that then imports your AI so it can"
                              "be detected")
 
+    parser.add_argument("--max-fps", dest="max_fps", type=float, required=False, default=10,
+                        help="Maximum number of repaints per second caused by playing clients [Default: 10]")
+    parser.add_argument("--log-capacity", dest="log_capacity", type=int, required=False, default=100000,
+                        help="Maximum number of log records kept for the UI [Default: 100000]")
+    parser.add_argument("--log-max-age", dest="log_max_age", type=float, required=False, default=None,
+                        help="Maximum age in seconds of log records kept for the UI [Default: no limit]")
+    parser.add_argument("--fleet", dest="fleet", type=str, required=False, default=None,
+                        help="Json or toml file describing clients that are started right away")
+    parser.add_argument("--headless", dest="headless", action="store_true",
+                        help="Run clients without the UI. Needs --ai or --fleet to know which AIs to start")
+    parser.add_argument("--ai", dest="ai", type=str, required=False, default=None,
+                        help="Name or import path (package.module:Class) of the AI started in headless mode")
+    parser.add_argument("--ai-parameter", dest="ai_parameters", type=str, nargs="+", required=False,
+                        default=tuple(), metavar="KEY=VALUE", help="Parameters passed to the AI in headless mode")
+    parser.add_argument("--connection-parameter", dest="connection_parameters", type=str, nargs="+",
+                        required=False, default=tuple(), metavar="KEY=VALUE",
+                        help="Parameters for the connection in headless mode, e.g. address=localhost port=5123")
+    parser.add_argument("--tournament-code", dest="tournament_code", type=str, required=False, default=None,
+                        help="Tournament code the clients join in headless mode. Quick play if not set")
+    parser.add_argument("--count", dest="count", type=int, required=False, default=1,
+                        help="Number of clients started in headless mode [Default: 1]")
+    parser.add_argument("--backend", dest="backend", choices=["thread", "process"], required=False, default="thread",
+                        help="Run the clients started in headless mode as threads of this process or each in its own "
+                             "worker process [Default: \"thread\"]")
+    parser.add_argument("--log-file", dest="log_file", type=str, required=False, default=None,
+                        help="File the logs are written to in headless mode [Default: stdout]")
+
+    parser.add_argument("--log-dir", dest="log_dir", type=str, required=False, default=None,
+                        help="Additionally write all logs to rotating files in this directory. Read them with "
+                             "j_chess_log_viewer")
+    parser.add_argument("--log-dir-segment-size", dest="log_dir_segment_size", type=int, required=False, default=64,
+                        help="Size in MiB after which a new log file is started in --log-dir [Default: 64]")
+    parser.add_argument("--log-dir-segments", dest="log_dir_segments", type=int, required=False, default=16,
+                        help="Number of log files kept in --log-dir [Default: 16]")
+    parser.add_argument("--clock-warnings", dest="clock_warnings", type=float, nargs="+", required=False,
+                        default=(0.5, 0.9), metavar="FRACTION",
+                        help="Warn when a move used up these fractions of the remaining clock [Default: 0.5 0.9]")
+    parser.add_argument("--clock-stop", dest="clock_stop", type=float, required=False, default=None,
+                        metavar="FRACTION",
+                        help="Ask AIs to stop their search after this fraction of the remaining clock. AIs can poll "
+                             "self.should_stop() [Default: never]")
+    parser.add_argument("--metrics-port", dest="metrics_port", type=int, required=False, default=None,
+                        help="Serve metrics of all clients in the Prometheus text format on this port under /metrics")
+    parser.add_argument("--metrics-address", dest="metrics_address", type=str, required=False, default="127.0.0.1",
+                        help="Address the metrics are served on [Default: \"127.0.0.1\"]")
+    parser.add_argument("--archive", dest="archive", type=str, required=False, default=None,
+                        help="SQLite file all finished games are archived in. Query it with j_chess_archive")
+    parser.add_argument("--move-cache", dest="move_cache", action="store_true",
+                        help="Answer positions an AI already saw with the move it chose then, without asking it again. "
+                             "Only useful for deterministic AIs")
+    parser.add_argument("--move-cache-file", dest="move_cache_file", type=str, required=False, default=None,
+                        help="Json file the move cache is loaded from and saved to between runs. Implies --move-cache")
+    parser.add_argument("--move-cache-size", dest="move_cache_size", type=int, required=False, default=100000,
+                        help="Maximum number of moves kept in the move cache [Default: 100000]")
+    parser.add_argument("--ponder", dest="ponder", action="store_true",
+                        help="Let AIs search the likely replies of their opponent on its time and answer from that "
+                             "search when one of them is played. The searches run on a second instance of the AI")
+    parser.add_argument("--ponder-workers", dest="ponder_workers", type=int, required=False, default=2,
+                        help="Number of threads pondering for all AIs together, per worker process with --backend "
+                             "process [Default: 2]")
+    parser.add_argument("--ponder-replies", dest="ponder_replies", type=int, required=False, default=4,
+                        help="Number of replies pondered after every move [Default: 4]")
+    parser.add_argument("--validate-moves", dest="validate_moves", action="store_true",
+                        help="Check every move of the AIs before it is sent and replace illegal moves following "
+                             "--validation-policy")
+    parser.add_argument("--validation-policy", dest="validation_policy", choices=("retry", "legal"), required=False,
+                        default="retry",
+                        help="\"retry\" asks the AI again, \"legal\" plays a legal move instead of an illegal one. "
+                             "A legal move is also played once the retries are used up [Default: \"retry\"]")
+    parser.add_argument("--validation-retries", dest="validation_retries", type=int, required=False, default=1,
+                        help="Number of times an AI is asked again after an illegal move [Default: 1]")
+    parser.add_argument("--ratings", dest="ratings", action="store_true",
+                        help="Rate all clients and their opponents with Elo and Glicko-2 after every game and show the "
+                             "ratings in the metrics. With --archive the ratings start from the archived games")
+    parser.add_argument("--ratings-file", dest="ratings_file", type=str, required=False, default=None,
+                        help="Json file the ratings are loaded from and saved to between runs. Implies --ratings")
+    parser.add_argument("--rating-period", dest="rating_period", type=float, required=False, default=3600,
+                        help="Length of a Glicko-2 rating period in seconds [Default: 3600]")
+    parser.add_argument("--profile-startup", dest="profile_startup", action="store_true",
+                        help="Print the time every module took to import once the manager started, after the UI "
+                             "closed when not headless")
+
     args = parser.parse_args()
 
-    for package in args.package:
-        package: str
+    profiler = None
+    if args.profile_startup:
+        from .import_profile import ImportProfiler
+        profiler = ImportProfiler().start()
+
+    from . import log_versions
+    from .logging import SYSTEM_LOGGER, LOG_STORE, add_log_sink
+    from .clients.watchdog import get_clock_watchdog
+    from .clients.move_cache import get_move_cache
+    from .clients.ponder import get_ponderer
+    from .clients.ratings import get_rating_engine
+    from .clients.validation import get_move_validator
+    from .clients.registry import get_ai_registry
+    from .clients.standings import TournamentStandings
+
+    log_versions()
+
+    LOG_STORE.configure(capacity=args.log_capacity, max_age=args.log_max_age)
+    try:
+        get_clock_watchdog().configure(fractions=args.clock_warnings, stop_fraction=args.clock_stop)
+        get_move_cache().configure(enabled=args.move_cache or args.move_cache_file is not None,
+                                   max_entries=args.move_cache_size, path=args.move_cache_file)
+        get_ponderer().configure(enabled=args.ponder, workers=args.ponder_workers, replies=args.ponder_replies)
+        get_move_validator().configure(enabled=args.validate_moves, policy=args.validation_policy,
+                                       retries=args.validation_retries)
+        get_rating_engine().configure(enabled=args.ratings or args.ratings_file is not None, path=args.ratings_file,
+                                      period=args.rating_period)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.archive is not None:
+        from .archive import GameArchive
+        from .clients.observers import add_game_observer
+        archive = GameArchive(path=args.archive)
+        if get_rating_engine().enabled and args.ratings_file is None:
+            SYSTEM_LOGGER.info(f"Rated {get_rating_engine().rebuild(archive.outcomes())} archived games")
+        add_game_observer(archive.add)
+    if args.log_dir is not None:
+        add_log_sink(directory=args.log_dir, max_bytes=args.log_dir_segment_size * 1024 * 1024,
+                     max_segments=args.log_dir_segments)
+
+    if args.headless:
+        if args.ai is None and args.fleet is None:
+            parser.error("--headless needs --ai or --fleet")
+        from .headless import setup_headless_logging
+        setup_headless_logging(log_file=args.log_file)
+    else:
+        from asciimatics.widgets.utilities import THEMES
+        if args.theme not in THEMES:
+            parser.error(f"Unknown theme \"{args.theme}\". Choose from {', '.join(THEMES.keys())}")
+
+    if len(args.package) > 0:
         import os
-        import sys
         SYSTEM_LOGGER.info(os.getcwd())
         sys.path.append(os.getcwd())
+    for package in args.package:
+        # Imported once AIs are looked up, e.g. when the first client is added in the UI
+        get_ai_registry().include(package)
+
+    fleet = []
+    try:
+        if args.fleet is not None:
+            from .fleet import load_fleet
+            fleet.extend(load_fleet(args.fleet))
+        if args.headless and args.ai is not None:
+            from .headless import fleet_from_arguments
+            fleet.extend(fleet_from_arguments(ai_name=args.ai, ai_parameters=args.ai_parameters,
+                                              connection_parameters=args.connection_parameters,
+                                              tournament_code=args.tournament_code, count=args.count,
+                                              backend=args.backend))
+    except (ValueError, ImportError) as e:
+        SYSTEM_LOGGER.error(f"Could not load clients: {e}")
+        if args.headless:
+            return 2
+        fleet = []
+
+    if not args.headless:
+        from asciimatics.screen import Screen
+        from asciimatics.exceptions import ResizeScreenError
+        from .ui import run_function_creator, create_client_manager
+        from .ui.scheduler import RedrawScheduler
+
+    try:
+        scheduler = None if args.headless else RedrawScheduler(max_fps=args.max_fps)
+    except ValueError as e:
+        parser.error(str(e))
+        return 2
+    standings = TournamentStandings()
+    if scheduler is not None:
+        scheduler.add_listener(standings.update)
+    exporter = None
+    if args.metrics_port is not None:
+        from .exporter import MetricsExporter
+        exporter = MetricsExporter(address=args.metrics_address, port=args.metrics_port, scheduler=scheduler)
         try:
-            importlib.import_module(package)
-            SYSTEM_LOGGER.info(f"Imported \"{package}\"")
-        except ModuleNotFoundError:
-            SYSTEM_LOGGER.info(f"Package \"{package}\" could not be imported")
+            exporter.start()
+        except OSError as e:
+            SYSTEM_LOGGER.error(f"Could not serve metrics: {e}")
+            exporter = None
+    on_client_added = None if exporter is None else exporter.add_client
 
-    last_scene: Any = None
+    if args.headless:
+        from .headless import run_headless
+        _print_import_profile(profiler)
+        try:
+            return run_headless(fleet=fleet, on_client_added=on_client_added)
+        except OSError as e:
+            SYSTEM_LOGGER.error(f"Could not start clients: {e}")
+            return 2
 
-    while True:
+    clients = []
+    if len(fleet) > 0:
+        from .fleet import start_fleet
         try:
-            Screen.wrapper(run_function_creator(start_scene=last_scene, theme=args.theme),
-                           catch_interrupt=False, arguments=[])
-            return 0
-        except KeyboardInterrupt:
-            return 1
-        except ResizeScreenError as e:
-            last_scene = e.scene
-            pass
-
-    return 0
+            clients = [ai for _client, ai in start_fleet(fleet=fleet, need_update=scheduler.notify)]
+        except OSError as e:
+            SYSTEM_LOGGER.error(f"Could not start clients: {e}")
+    # Outlives the frames, which are rebuilt on every resize
+    manager = create_client_manager(scheduler=scheduler, standings=standings, clients=clients,
+                                    on_client_added=on_client_added)
+
+    if profiler is not None:
+        profiler.stop()
+    last_scene: Any = None
+
+    try:
+        while True:
+            try:
+                Screen.wrapper(run_function_creator(start_scene=last_scene, scheduler=scheduler, standings=standings,
+                                                    manager=manager, theme=args.theme, piece_style=args.pieces),
+                               catch_interrupt=False, arguments=[])
+                return 0
+            except KeyboardInterrupt:
+                return 1
+            except ResizeScreenError as e:
+                last_scene = e.scene
+                pass
+    finally:
+        _print_import_profile(profiler)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,314 @@
+"""Keep the results of all finished games in an indexed SQLite archive."""
+import argparse
+import atexit
+import os
+import queue
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Any
+
+from j_chess_client_manager.clients.observers import GameResult, WIN, LOSS, DRAW
+from j_chess_client_manager.logging import SYSTEM_LOGGER
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id TEXT NOT NULL,
+    match_id TEXT NOT NULL,
+    client TEXT NOT NULL,
+    opponent TEXT,
+    tournament_code TEXT,
+    white INTEGER NOT NULL,
+    winner TEXT,
+    result TEXT NOT NULL,
+    finished REAL NOT NULL,
+    pgn TEXT NOT NULL,
+    PRIMARY KEY (game_id, client)
+);
+CREATE INDEX IF NOT EXISTS games_client ON games (client, tournament_code, result, white, finished);
+CREATE INDEX IF NOT EXISTS games_opponent ON games (opponent, finished);
+CREATE INDEX IF NOT EXISTS games_tournament ON games (tournament_code, finished);
+CREATE INDEX IF NOT EXISTS games_result ON games (result, finished);
+CREATE INDEX IF NOT EXISTS games_finished ON games (finished);
+"""
+
+_COLUMNS = ("game_id", "match_id", "client", "opponent", "tournament_code", "white", "winner", "result", "finished",
+            "pgn")
+
+
+def _connect(path: str, read_only: bool = False) -> sqlite3.Connection:
+    if read_only:
+        # A read only connection neither creates the file nor changes its journal
+        return sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True, timeout=30)
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+def _row(result: GameResult) -> Tuple[Any, ...]:
+    return (result.game_id, result.match_id, result.client, result.opponent, result.tournament_code,
+            int(result.white), result.winner, result.result, result.finished, result.pgn)
+
+
+def _result(row: Tuple[Any, ...]) -> GameResult:
+    game_id, match_id, client, opponent, tournament_code, white, winner, _, finished, pgn = row
+    return GameResult(game_id=game_id, match_id=match_id, client=client, opponent=opponent,
+                      tournament_code=tournament_code, white=bool(white), winner=winner, pgn=pgn, finished=finished)
+
+
+def _where(client: Optional[str] = None, opponent: Optional[str] = None, tournament_code: Optional[str] = None,
+           result: Optional[str] = None, white: Optional[bool] = None, since: Optional[float] = None,
+           until: Optional[float] = None) -> Tuple[str, List[Any]]:
+    conditions, parameters = [], []
+    for column, value in (("client", client), ("opponent", opponent), ("tournament_code", tournament_code),
+                          ("result", result)):
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            parameters.append(value)
+    if white is not None:
+        conditions.append("white = ?")
+        parameters.append(int(white))
+    if since is not None:
+        conditions.append("finished >= ?")
+        parameters.append(since)
+    if until is not None:
+        conditions.append("finished < ?")
+        parameters.append(until)
+    return (" WHERE " + " AND ".join(conditions)) if len(conditions) > 0 else "", parameters
+
+
+class GameArchive:
+    """
+    Archive of finished games. Games are added from any thread and written by one writer thread in batches, queries
+    read from their own connection and see every game that was already written. A read only archive opens an existing
+    file for queries without a writer thread
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: str, batch_size: int = 256, read_only: bool = False):
+        self._path = path
+        self._batch_size = batch_size
+        self._read_only = read_only
+        self._queue: queue.Queue = queue.Queue()
+        self._local = threading.local()
+        self._written = 0
+        self._thread: Optional[threading.Thread] = None
+        if read_only:
+            return
+        with _connect(path) as connection:
+            connection.executescript(_SCHEMA)
+        connection.close()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="GameArchiveWriter")
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def written(self) -> int:
+        return self._written
+
+    def add(self, result: GameResult):
+        """
+        Queue a game to be written. Can be used as game observer
+        """
+        if self._read_only:
+            raise ValueError(f"Can not add games to the read only archive \"{self._path}\"")
+        self._queue.put(result)
+
+    def flush(self):
+        """
+        Block until all games added so far are written
+        """
+        self._queue.join()
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def _write(self, connection: sqlite3.Connection, batch: List[GameResult]):
+        try:
+            with connection:
+                connection.executemany(f"INSERT OR REPLACE INTO games ({', '.join(_COLUMNS)}) "
+                                       f"VALUES ({', '.join('?' for _ in _COLUMNS)})", [_row(x) for x in batch])
+            self._written += len(batch)
+        except sqlite3.Error as e:
+            SYSTEM_LOGGER.error(f"Could not archive {len(batch)} games: {e}")
+
+    def _run(self):
+        connection = _connect(self._path)
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is self._STOP:
+                stop = True
+            games = [x for x in batch if x is not self._STOP]
+            if len(games) > 0:
+                self._write(connection, games)
+            for _ in batch:
+                self._queue.task_done()
+        connection.close()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = _connect(self._path, read_only=self._read_only)
+            self._local.connection = connection
+        return connection
+
+    def query(self, client: Optional[str] = None, opponent: Optional[str] = None,
+              tournament_code: Optional[str] = None, result: Optional[str] = None, white: Optional[bool] = None,
+              since: Optional[float] = None, until: Optional[float] = None,
+              limit: Optional[int] = None) -> List[GameResult]:
+        """
+        Find archived games. Every given filter has to match
+
+        Parameters
+        ----------
+        client: Optional[str]
+            Name of the client that played the game
+        opponent: Optional[str]
+            Name of its opponent
+        tournament_code: Optional[str]
+            Tournament the game was played in
+        result: Optional[str]
+            "win", "loss" or "draw" from the view of the client
+        white: Optional[bool]
+            Whether the client played white
+        since: Optional[float]
+            Only games finished at or after this unix timestamp
+        until: Optional[float]
+            Only games finished before this unix timestamp
+        limit: Optional[int]
+            Maximum number of games
+
+        Returns
+        -------
+        Matching games, newest first
+        """
+        where, parameters = _where(client=client, opponent=opponent, tournament_code=tournament_code, result=result,
+                                   white=white, since=since, until=until)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM games{where} ORDER BY finished DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        return [_result(x) for x in self._connection().execute(sql, parameters)]
+
+    def count(self, client: Optional[str] = None, opponent: Optional[str] = None,
+              tournament_code: Optional[str] = None, result: Optional[str] = None, white: Optional[bool] = None,
+              since: Optional[float] = None, until: Optional[float] = None) -> int:
+        """
+        Number of archived games matching the filters of query
+        """
+        where, parameters = _where(client=client, opponent=opponent, tournament_code=tournament_code, result=result,
+                                   white=white, since=since, until=until)
+        return self._connection().execute(f"SELECT COUNT(*) FROM games{where}", parameters).fetchone()[0]
+
+    def outcomes(self, since: Optional[float] = None) -> Iterator[Tuple[str, str, str, float, float]]:
+        """
+        Results of all archived games against known opponents without their pgn, oldest first. A game two clients
+        played against each other is contained twice with the same game id
+
+        Returns
+        -------
+        Game id, client, opponent, points of the client and the unix timestamp the game ended at
+        """
+        where, parameters = _where(since=since)
+        where += (" AND" if len(where) > 0 else " WHERE") + " opponent IS NOT NULL"
+        rows = self._connection().execute(f"SELECT game_id, client, opponent, winner, finished FROM games{where} "
+                                          f"ORDER BY finished, game_id", parameters)
+        for game_id, client, opponent, winner, finished in rows:
+            yield game_id, client, opponent, 0.5 if winner is None else float(winner == client), finished
+
+
+def _timestamp(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _print_ratings(archive: GameArchive, since: Optional[float], period: float):
+    from j_chess_client_manager.clients.ratings import RatingEngine
+
+    engine = RatingEngine(period=period)
+    games = engine.rebuild(archive.outcomes(since=since))
+    ratings = engine.ratings()
+    width = max([len("Player")] + [len(x.name) for x in ratings])
+    print(f"{'Player':<{width}s}  {'Glicko-2':>8s}  {'95% interval':>13s}  {'Elo':>6s}  {'Games':>6s}")
+    for x in ratings:
+        low, high = x.interval
+        print(f"{x.name:<{width}s}  {x.rating:>8.0f}  {f'{low:.0f}-{high:.0f}':>13s}  {x.elo:>6.0f}  {x.games:>6d}")
+    print(f"\n{games} games rated")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="j_chess_archive",
+                                     description="Query games archived by j_chess_client_manager --archive")
+    parser.add_argument("path", type=str, help="Archive file")
+    parser.add_argument("--client", dest="client", type=str, required=False, default=None,
+                        help="Name of the client that played the games")
+    parser.add_argument("--opponent", dest="opponent", type=str, required=False, default=None,
+                        help="Name of the opponent")
+    parser.add_argument("--tournament-code", dest="tournament_code", type=str, required=False, default=None,
+                        help="Tournament the games were played in")
+    parser.add_argument("--result", dest="result", choices=[WIN, LOSS, DRAW], required=False, default=None,
+                        help="Result from the view of the client")
+    parser.add_argument("--color", dest="color", choices=["white", "black"], required=False, default=None,
+                        help="Color the client played")
+    parser.add_argument("--since", dest="since", type=_timestamp, required=False, default=None,
+                        help="Only games finished at or after this ISO date")
+    parser.add_argument("--until", dest="until", type=_timestamp, required=False, default=None,
+                        help="Only games finished before this ISO date")
+    parser.add_argument("--limit", dest="limit", type=int, required=False, default=50,
+                        help="Maximum number of games shown [Default: 50]")
+    parser.add_argument("--count", dest="count", action="store_true", help="Only print the number of games")
+    parser.add_argument("--pgn", dest="pgn", action="store_true", help="Print the pgn of every game")
+    parser.add_argument("--ratings", dest="ratings", action="store_true",
+                        help="Print the Elo and Glicko-2 ratings of all players rated from the games since --since")
+    parser.add_argument("--rating-period", dest="rating_period", type=float, required=False, default=3600,
+                        help="Length of a Glicko-2 rating period in seconds [Default: 3600]")
+
+    args = parser.parse_args(argv)
+    filters = dict(client=args.client, opponent=args.opponent, tournament_code=args.tournament_code,
+                   result=args.result, white=None if args.color is None else args.color == "white",
+                   since=args.since, until=args.until)
+
+    if not os.path.isfile(args.path):
+        parser.error(f"There is no archive \"{args.path}\"")
+        return 2
+    archive = GameArchive(args.path, read_only=True)
+    try:
+        if args.count:
+            print(archive.count(**filters))
+            return 0
+        if args.ratings:
+            _print_ratings(archive, since=args.since, period=args.rating_period)
+            return 0
+        for game in archive.query(limit=args.limit, **filters):
+            finished = datetime.fromtimestamp(game.finished).strftime("%Y-%m-%d %H:%M:%S")
+            print(f"{finished} {game.client} ({'white' if game.white else 'black'}) vs {game.opponent}: "
+                  f"{game.result}{'' if game.tournament_code is None else f' [{game.tournament_code}]'} "
+                  f"game {game.game_id}")
+            if args.pgn:
+                print(game.pgn)
+    finally:
+        archive.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
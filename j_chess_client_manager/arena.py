@@ -0,0 +1,721 @@
+"""Let AIs play each other locally, refereed in this process, to compare them without a J-Chess server."""
+import argparse
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from inspect import Parameter, signature
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
+from uuid import uuid4
+
+from j_chess_lib.ai import AI
+from j_chess_lib.ai.board import BoardState
+from j_chess_lib.ai.container import GameState
+from j_chess_lib.communication import MoveData, MatchStatusData, MatchFormatData
+from j_chess_lib.communication.schema import MatchTypeValue, MatchTypeScore
+
+from j_chess_client_manager.chess import Position, Move, apply_move_squares, check_move, has_legal_move, in_check, \
+    parse_square, san
+from j_chess_client_manager.clients.move_cache import position_key
+from j_chess_client_manager.logging import SYSTEM_LOGGER
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+ROUND_ROBIN = "round-robin"
+SWISS = "swiss"
+SCHEDULES = (ROUND_ROBIN, SWISS)
+
+WHITE_WINS, BLACK_WINS, DRAW = "1-0", "0-1", "1/2-1/2"
+
+
+class ArenaPlayer(NamedTuple):
+    name: str
+    ai_class: Type[AI]
+    ai_parameters: Dict[str, Any] = {}
+
+    def create(self) -> AI:
+        parameters = dict(self.ai_parameters)
+        accepted = signature(self.ai_class).parameters
+        if "name" in accepted or any(x.kind == Parameter.VAR_KEYWORD for x in accepted.values()):
+            parameters.setdefault("name", self.name)
+        return self.ai_class(**parameters)
+
+
+class GameRecord(NamedTuple):
+    round: int
+    game: int
+    white: str
+    black: str
+    result: str
+    termination: str
+    plies: int
+    pgn: str
+
+    def score(self, player: str) -> float:
+        """
+        Points the player got from this game
+        """
+        if self.result == DRAW:
+            return 0.5
+        return float((self.result == WHITE_WINS) == (player == self.white))
+
+
+class RefereeSettings(NamedTuple):
+    # Clock of each side in milliseconds
+    time_per_side: int = 60000
+    # Milliseconds added to the clock after every move
+    time_per_side_increment: int = 0
+    # Half moves after which a game is a draw
+    max_plies: int = 400
+
+
+def _call(function: Callable, **kwargs) -> Tuple[Any, Optional[str]]:
+    # AIs may raise anything or even exit, that must only end their game
+    try:
+        return function(**kwargs), None
+    except (Exception, SystemExit) as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _call_until(timeout: float, function: Callable, **kwargs) -> Tuple[Any, Optional[str], bool]:
+    # Calls in a thread of its own, an AI that does not answer in time is left behind in it
+    ret = []
+    thread = threading.Thread(target=lambda: ret.append(_call(function, **kwargs)), daemon=True, name="ArenaMove")
+    thread.start()
+    thread.join(max(timeout, 0))
+    if thread.is_alive():
+        return None, None, True
+    return ret[0][0], ret[0][1], False
+
+
+def _pgn(tags: Dict[str, str], moves: List[str], result: str) -> str:
+    lines = [f"[{key} \"{value}\"]" for key, value in tags.items()]
+    lines.append("")
+    tokens = [f"{i // 2 + 1}. {x}" if i % 2 == 0 else x for i, x in enumerate(moves)] + [result]
+    line = ""
+    for token in tokens:
+        if len(line) + len(token) + 1 > 80:
+            lines.append(line)
+            line = token
+        else:
+            line = token if len(line) == 0 else f"{line} {token}"
+    lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def _record(white: str, black: str, winner: Optional[bool], termination: str, moves: List[str], round_number: int,
+            game: int) -> GameRecord:
+    result = DRAW if winner is None else (WHITE_WINS if winner else BLACK_WINS)
+    pgn = _pgn({
+        "Event": "Local arena", "Site": "j_chess_arena", "Date": datetime.now().strftime("%Y.%m.%d"),
+        "Round": f"{round_number}.{game}", "White": white, "Black": black, "Result": result,
+        "Termination": termination, "PlyCount": str(len(moves)),
+    }, moves=moves, result=result)
+    return GameRecord(round=round_number, game=game, white=white, black=black, result=result,
+                      termination=termination, plies=len(moves), pgn=pgn)
+
+
+class Referee:
+    """
+    Plays games between two AIs through their callbacks, like a server would. Illegal moves, exceptions and
+    running out of time lose the game. Checkmate, stalemate, the fifty move rule, threefold repetition, bare kings and
+    max_plies end it. An AI that does not answer before its clock runs out is left behind in its thread and forfeits
+    the rest of its match
+    """
+
+    def __init__(self, settings: RefereeSettings = RefereeSettings()):
+        self._settings = settings
+        self._abandoned: List[AI] = []
+
+    @property
+    def abandoned(self) -> int:
+        """
+        Number of AIs left behind in a thread that may still be running
+        """
+        return len(self._abandoned)
+
+    def _is_abandoned(self, ai: AI) -> bool:
+        return any(x is ai for x in self._abandoned)
+
+    def _match_format(self, games: int) -> MatchFormatData:
+        return MatchFormatData(
+            match_type_value=MatchTypeValue.SCORE, match_type_data=MatchTypeScore(amount_to_play=games),
+            time_per_side=self._settings.time_per_side,
+            time_per_side_increment=self._settings.time_per_side_increment, time_per_side_per_move=0,
+        )
+
+    def play_match(self, first: ArenaPlayer, second: ArenaPlayer, games: int = 2,
+                   round_number: int = 1) -> List[GameRecord]:
+        """
+        Play a match of games with fresh AIs, first plays white in the first game and the colors swap after every game
+
+        Returns
+        -------
+        Records of all games in the order they were played
+        """
+        ais, failed = {}, set()
+        for player in (first, second):
+            ais[player.name], error = _call(player.create)
+            if error is not None:
+                SYSTEM_LOGGER.warning(f"Arena: Could not create {player.name}: {error}")
+                failed.add(player.name)
+        if len(failed) > 0:
+            records = []
+            for game in range(games):
+                white, black = (first, second) if game % 2 == 0 else (second, first)
+                records.append(self._forfeit(white.name, black.name, failed, termination="error",
+                                             round_number=round_number, game=game + 1))
+            return records
+        match_id = uuid4()
+        match_format = self._match_format(games)
+        for player, enemy in ((first, second), (second, first)):
+            _call(ais[player.name].new_match, match_id=match_id, enemy=ais[enemy.name].name,
+                  match_format=match_format)
+        records = []
+        for game in range(games):
+            white, black = (first, second) if game % 2 == 0 else (second, first)
+            gone = {x.name for x in (white, black) if self._is_abandoned(ais[x.name])}
+            if len(gone) > 0:
+                records.append(self._forfeit(white.name, black.name, gone, termination="time forfeit",
+                                             round_number=round_number, game=game + 1))
+                continue
+            records.append(self.play_game(white=(white.name, ais[white.name]), black=(black.name, ais[black.name]),
+                                          match_id=match_id, round_number=round_number, game=game + 1))
+        scores = {x.name: 2 * sum(r.score(x.name) for r in records) for x in (first, second)}
+        status = MatchStatusData(name_player1=ais[first.name].name, name_player2=ais[second.name].name,
+                                 score_player1=int(scores[first.name]), score_player2=int(scores[second.name]))
+        for ai in ais.values():
+            if not self._is_abandoned(ai):
+                _call(ai.finalize_match, match_id=match_id, status=status, statistics="")
+        return records
+
+    @staticmethod
+    def _forfeit(white: str, black: str, losers: set, termination: str, round_number: int,
+                 game: int) -> GameRecord:
+        # A game that is not played, lost by the given players and a draw if both lose
+        winner = None if len(losers) > 1 else black in losers
+        return _record(white=white, black=black, winner=winner, termination=termination, moves=[],
+                       round_number=round_number, game=game)
+
+    def play_game(self, white: Tuple[str, AI], black: Tuple[str, AI], match_id=None, round_number: int = 1,
+                  game: int = 1) -> GameRecord:
+        """
+        Play one game
+
+        Parameters
+        ----------
+        white: Tuple[str, AI]
+            Name in the results and AI of the white player
+        black: Tuple[str, AI]
+            Name in the results and AI of the black player
+        match_id: UUID
+            Match the game belongs to
+        round_number: int
+            Round of the tournament, only used for the records
+        game: int
+            Number of the game in its match, only used for the records
+
+        Returns
+        -------
+        Record of the game
+        """
+        match_id = uuid4() if match_id is None else match_id
+        game_id = uuid4()
+        players = {True: white, False: black}
+        for _name, ai in players.values():
+            _call(ai.new_game, game_id=game_id, match_id=match_id, white_player=white[1].name)
+
+        settings = self._settings
+        position = Position.from_fen(START_FEN)
+        clocks = {True: settings.time_per_side, False: settings.time_per_side}
+        seen = Counter([position_key(position.fen())])
+        moves: List[str] = []
+        last_move: Optional[MoveData] = None
+        winner: Optional[bool] = None
+        termination = "max plies"
+        while len(moves) < settings.max_plies:
+            side = position.white_turn
+            if not has_legal_move(position):
+                if in_check(position):
+                    winner, termination = not side, "checkmate"
+                else:
+                    termination = "stalemate"
+                break
+            if position.half_moves_since_pawn >= 100:
+                termination = "fifty moves"
+                break
+            if seen[position_key(position.fen())] >= 3:
+                termination = "repetition"
+                break
+            if sum(1 for x in position.squares if x != 0) <= 2:
+                termination = "insufficient material"
+                break
+            name, ai = players[side]
+            state = GameState(enemy_time=clocks[not side], your_time=clocks[side], last_move=last_move,
+                              board_state=BoardState(fen=position.fen()))
+            start = time.perf_counter()
+            move, error, hung = _call_until(clocks[side] / 1000, ai.get_move, game_id=game_id, match_id=match_id,
+                                            game_state=state)
+            clocks[side] -= int((time.perf_counter() - start) * 1000)
+            if hung:
+                SYSTEM_LOGGER.warning(f"Arena: {name} did not move before its clock ran out")
+                self._abandoned.append(ai)
+                winner, termination = not side, "time forfeit"
+                break
+            if error is not None:
+                SYSTEM_LOGGER.warning(f"Arena: {name} failed to move: {error}")
+                winner, termination = not side, "error"
+                break
+            if clocks[side] < 0:
+                winner, termination = not side, "time forfeit"
+                break
+            clocks[side] += settings.time_per_side_increment
+            problem = "No move" if move is None else check_move(position, move.from_value, move.to,
+                                                                move.promotion_unit)
+            if problem is not None:
+                SYSTEM_LOGGER.warning(f"Arena: {name} played an illegal move: {problem}")
+                winner, termination = not side, "illegal move"
+                break
+            origin, target = parse_square(move.from_value), parse_square(move.to)
+            promotion = None
+            if position.piece_at(origin) in "Pp" and target // 8 in (0, 7):
+                promotion = (move.promotion_unit or "Q").upper()
+            played = Move(origin, target, promotion)
+            moves.append(san(position, played))
+            position = apply_move_squares(position, origin, target, promotion)[0]
+            seen[position_key(position.fen())] += 1
+            last_move = move
+
+        record = _record(white=white[0], black=black[0], winner=winner, termination=termination, moves=moves,
+                         round_number=round_number, game=game)
+        winner_name = None if winner is None else players[winner][1].name
+        for _name, ai in players.values():
+            if not self._is_abandoned(ai):
+                _call(ai.finalize_game, game_id=game_id, match_id=match_id, winner=winner_name, pgn=record.pgn)
+        return record
+
+
+def round_robin_rounds(players: int) -> List[List[Tuple[int, int]]]:
+    """
+    Rounds of a round robin by the circle method, every player meets every other player once. With an odd number of
+    players one of them sits out each round
+
+    Returns
+    -------
+    Pairs of player indices per round
+    """
+    ids: List[Optional[int]] = list(range(players))
+    if len(ids) % 2 == 1:
+        ids.append(None)
+    ret = []
+    for round_number in range(len(ids) - 1):
+        pairs = []
+        for i in range(len(ids) // 2):
+            first, second = ids[i], ids[len(ids) - 1 - i]
+            if first is None or second is None:
+                continue
+            # Alternate who is listed first so the colors of the first games are balanced
+            pairs.append((first, second) if (round_number + i) % 2 == 0 else (second, first))
+        ret.append(pairs)
+        ids = [ids[0], ids[-1]] + ids[1:-1]
+    return ret
+
+
+def swiss_pairs(scores: Sequence[float], met: Dict[int, set], byes: set) -> Tuple[List[Tuple[int, int]], Optional[int]]:
+    """
+    Pairs of the next round of a swiss tournament. Players with equal scores meet and nobody meets an opponent twice
+    as long as that can be avoided
+
+    Parameters
+    ----------
+    scores: Sequence[float]
+        Current score of every player
+    met: Dict[int, set]
+        Opponents every player already met
+    byes: set
+        Players that already sat out a round
+
+    Returns
+    -------
+    The pairs and the player sitting out or None
+    """
+    order = sorted(range(len(scores)), key=lambda x: (-scores[x], x))
+    bye = None
+    if len(order) % 2 == 1:
+        # The lowest ranked player that did not sit out yet
+        bye = next((x for x in reversed(order) if x not in byes), order[-1])
+        order.remove(bye)
+
+    def pair(remaining: List[int]) -> Optional[List[Tuple[int, int]]]:
+        if len(remaining) == 0:
+            return []
+        first, rest = remaining[0], remaining[1:]
+        for i, second in enumerate(rest):
+            if second in met.get(first, set()):
+                continue
+            tail = pair(rest[:i] + rest[i + 1:])
+            if tail is not None:
+                return [(first, second)] + tail
+        return None
+
+    pairs = pair(order)
+    if pairs is None:
+        # Everybody met everybody, fall back to pairing neighbours again
+        pairs = [(order[i], order[i + 1]) for i in range(0, len(order), 2)]
+    return pairs, bye
+
+
+class ArenaStanding(NamedTuple):
+    name: str
+    games: int
+    wins: int
+    draws: int
+    losses: int
+    score: float
+    # Sum of the scores of the beaten opponents and half of the drawn ones, breaks ties
+    sonneborn_berger: float
+
+
+class ArenaResults:
+    """
+    Finished games of a tournament and the standings derived from them
+    """
+
+    def __init__(self, players: Sequence[str]):
+        self._players = list(players)
+        self._records: List[GameRecord] = []
+        self._byes: Counter = Counter()
+
+    @property
+    def records(self) -> List[GameRecord]:
+        return list(self._records)
+
+    def add(self, records: Sequence[GameRecord]):
+        self._records.extend(records)
+
+    def add_bye(self, player: str, points: float):
+        self._byes[player] += points
+
+    def scores(self) -> Dict[str, float]:
+        ret = {x: float(self._byes[x]) for x in self._players}
+        for record in self._records:
+            ret[record.white] += record.score(record.white)
+            ret[record.black] += record.score(record.black)
+        return ret
+
+    def standings(self) -> List[ArenaStanding]:
+        scores = self.scores()
+        counts = {x: Counter() for x in self._players}
+        tie_break = {x: 0.0 for x in self._players}
+        for record in self._records:
+            for player, opponent in ((record.white, record.black), (record.black, record.white)):
+                score = record.score(player)
+                counts[player]["wins" if score == 1 else "draws" if score == 0.5 else "losses"] += 1
+                tie_break[player] += score * scores[opponent]
+        ret = [ArenaStanding(name=x, games=sum(counts[x].values()), wins=counts[x]["wins"], draws=counts[x]["draws"],
+                             losses=counts[x]["losses"], score=scores[x], sonneborn_berger=tie_break[x])
+               for x in self._players]
+        return sorted(ret, key=lambda x: (-x.score, -x.sonneborn_berger, x.name))
+
+    def table(self) -> str:
+        width = max([len("Player")] + [len(x) for x in self._players])
+        lines = [f"{'#':>3s}  {'Player':<{width}s}  {'Score':>6s}  {'Games':>5s}  {'Wins':>5s}  {'Draws':>5s}  "
+                 f"{'Losses':>6s}  {'SB':>6s}"]
+        for i, x in enumerate(self.standings()):
+            lines.append(f"{i + 1:>3d}  {x.name:<{width}s}  {x.score:>6g}  {x.games:>5d}  {x.wins:>5d}  {x.draws:>5d}  "
+                         f"{x.losses:>6d}  {x.sonneborn_berger:>6g}")
+        terminations = Counter(x.termination for x in self._records)
+        lines.append("")
+        lines.append(f"{len(self._records)} games: " + ", ".join(f"{v} {k}" for k, v in terminations.most_common()))
+        return "\n".join(lines)
+
+    def pgn(self) -> str:
+        return "\n".join(x.pgn for x in sorted(self._records, key=lambda x: (x.round, x.white, x.black, x.game)))
+
+
+def _play_pairing(settings: RefereeSettings, first: ArenaPlayer, second: ArenaPlayer, games: int,
+                  round_number: int) -> Tuple[List[GameRecord], bool]:
+    # The records and whether an AI was left behind in a thread of the worker
+    referee = Referee(settings)
+    records = referee.play_match(first, second, games=games, round_number=round_number)
+    return records, referee.abandoned > 0
+
+
+def _init_worker(log_file: Optional[str]):
+    if log_file is not None:
+        from j_chess_client_manager.headless import setup_headless_logging
+        setup_headless_logging(log_file=log_file)
+
+
+class _InlineExecutor:
+    # Plays the matches in this process, for debugging AIs and for AIs that can not be pickled
+
+    def submit(self, function: Callable, *args) -> Future:
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait: bool = True):
+        pass
+
+
+class _MatchQueue:
+    """
+    Hands the matches to the worker processes, one at a time per worker. When a worker left an AI behind in a thread
+    the workers are retired and replaced, a retired worker process exits with the thread after its current match.
+    Without worker processes the matches are played in this process and such threads stay until it exits
+    """
+
+    def __init__(self, create_executor: Callable, workers: int):
+        self._create_executor = create_executor
+        self._processes = workers > 0
+        self._workers = max(workers, 1)
+        self._executor = create_executor()
+        self._retired = []
+
+    def play(self, jobs: Sequence[Tuple[Any, ...]], on_match: Callable[[List[GameRecord]], None]):
+        """
+        Play the matches, on_match is called with the records of every match as soon as it is finished
+        """
+        waiting = list(reversed(jobs))
+        running: Dict[Future, Any] = {}
+        while len(waiting) > 0 or len(running) > 0:
+            while len(waiting) > 0 and len(running) < self._workers:
+                running[self._executor.submit(_play_pairing, *waiting.pop())] = self._executor
+            done, _not_done = wait(running.keys(), return_when=FIRST_COMPLETED)
+            for future in done:
+                executor = running.pop(future)
+                records, abandoned = future.result()
+                if abandoned and self._processes and executor is self._executor:
+                    self._retire()
+                on_match(records)
+
+    def _retire(self):
+        SYSTEM_LOGGER.warning("Arena: Replacing the worker processes since an AI was left behind in one of them")
+        self._executor.shutdown(wait=False)
+        self._retired.append(self._executor)
+        self._executor = self._create_executor()
+
+    def shutdown(self):
+        for executor in self._retired + [self._executor]:
+            executor.shutdown(wait=True)
+
+
+class Arena:
+    """
+    Local tournament between AIs. The matches of a round are spread across a pool of worker processes, a round robin
+    submits all rounds at once since they do not depend on each other
+    """
+
+    def __init__(self, players: Sequence[ArenaPlayer], settings: RefereeSettings = RefereeSettings(),
+                 games_per_match: int = 2, workers: Optional[int] = None, log_file: Optional[str] = None):
+        """
+        Parameters
+        ----------
+        players: Sequence[ArenaPlayer]
+            Players of the tournament, their names have to be unique
+        settings: RefereeSettings
+            Clocks and game length
+        games_per_match: int
+            Games every pair of players plays per round, the colors swap after every game
+        workers: Optional[int]
+            Number of worker processes. None for one per cpu, 0 to play in this process
+        log_file: Optional[str]
+            File the logs of the worker processes are written to
+        """
+        if len(players) < 2:
+            raise ValueError(f"An arena needs at least two players not {len(players)}")
+        names = [x.name for x in players]
+        if len(set(names)) != len(names):
+            raise ValueError(f"The names of the players are not unique: {', '.join(sorted(names))}")
+        if games_per_match < 1:
+            raise ValueError(f"A match needs at least one game not {games_per_match}")
+        self._players = list(players)
+        self._settings = settings
+        self._games_per_match = games_per_match
+        self._workers = (os.cpu_count() or 1) if workers is None else workers
+        self._log_file = log_file
+
+    @property
+    def players(self) -> List[ArenaPlayer]:
+        return list(self._players)
+
+    def _executor(self):
+        if self._workers <= 0:
+            return _InlineExecutor()
+        return ProcessPoolExecutor(max_workers=self._workers, initializer=_init_worker, initargs=(self._log_file,))
+
+    def _jobs(self, pairs: Sequence[Tuple[int, int]], round_number: int) -> List[Tuple[Any, ...]]:
+        return [(self._settings, self._players[first], self._players[second], self._games_per_match, round_number)
+                for first, second in pairs]
+
+    def run(self, schedule: str = ROUND_ROBIN, rounds: Optional[int] = None,
+            on_match: Callable[[List[GameRecord]], None] = None) -> ArenaResults:
+        """
+        Play the tournament
+
+        Parameters
+        ----------
+        schedule: str
+            ROUND_ROBIN or SWISS
+        rounds: Optional[int]
+            Rounds of a swiss tournament, by default enough to find a winner. Number of cycles of a round robin,
+            by default one
+        on_match: Callable[[List[GameRecord]], None]
+            Called with the games of every finished match
+
+        Returns
+        -------
+        Results of all games
+        """
+        if schedule not in SCHEDULES:
+            raise ValueError(f"Unknown schedule \"{schedule}\". Choose from {', '.join(SCHEDULES)}")
+        results = ArenaResults([x.name for x in self._players])
+        matches = _MatchQueue(self._executor, workers=self._workers)
+
+        def finished(records: List[GameRecord]):
+            results.add(records)
+            if on_match is not None:
+                on_match(records)
+
+        try:
+            if schedule == ROUND_ROBIN:
+                self._run_round_robin(matches, cycles=rounds or 1, on_match=finished)
+            else:
+                rounds = rounds or math.ceil(math.log2(len(self._players)))
+                self._run_swiss(matches, results, rounds=rounds, on_match=finished)
+        finally:
+            matches.shutdown()
+        return results
+
+    def _run_round_robin(self, matches: _MatchQueue, cycles: int, on_match):
+        jobs = []
+        rounds = round_robin_rounds(len(self._players))
+        for cycle in range(cycles):
+            for i, pairs in enumerate(rounds):
+                if cycle % 2 == 1:
+                    pairs = [(second, first) for first, second in pairs]
+                jobs.extend(self._jobs(pairs, round_number=cycle * len(rounds) + i + 1))
+        matches.play(jobs, on_match=on_match)
+
+    def _run_swiss(self, matches: _MatchQueue, results: ArenaResults, rounds: int, on_match):
+        names = [x.name for x in self._players]
+        met: Dict[int, set] = {i: set() for i in range(len(names))}
+        byes = set()
+        for round_number in range(1, rounds + 1):
+            scores = results.scores()
+            pairs, bye = swiss_pairs([scores[x] for x in names], met=met, byes=byes)
+            if bye is not None:
+                byes.add(bye)
+                # A bye is worth a won match
+                results.add_bye(names[bye], self._games_per_match)
+            for first, second in pairs:
+                met[first].add(second)
+                met[second].add(first)
+            matches.play(self._jobs(pairs, round_number=round_number), on_match=on_match)
+
+
+def _playable_players(names: Sequence[str]) -> List[ArenaPlayer]:
+    from j_chess_client_manager.clients.registry import get_ai_registry
+
+    registry = get_ai_registry()
+    if len(names) > 0:
+        classes = [registry.find(x) for x in names]
+    else:
+        classes = []
+        for entry in registry.entries():
+            try:
+                ai_class = entry.load()
+            except (ImportError, AttributeError, ValueError) as e:
+                SYSTEM_LOGGER.error(f"Could not load AI \"{entry.name}\": {e}")
+                continue
+            required = [x for x in signature(ai_class).parameters.values() if x.default is Parameter.empty and
+                        x.kind not in (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD) and x.name != "name"]
+            if len(required) > 0:
+                SYSTEM_LOGGER.info(f"Leaving out {entry.name}, it needs {', '.join(x.name for x in required)}")
+                continue
+            classes.append(ai_class)
+    ret, counts = [], Counter()
+    for ai_class in classes:
+        counts[ai_class.__name__] += 1
+        suffix = "" if counts[ai_class.__name__] == 1 else f"-{counts[ai_class.__name__]}"
+        ret.append(ArenaPlayer(name=f"{ai_class.__name__}{suffix}", ai_class=ai_class))
+    return ret
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="j_chess_arena",
+                                     description="Let AIs play a local tournament against each other with a referee "
+                                                 "in this process, no server needed")
+    parser.add_argument("--ai", dest="ais", type=str, nargs="+", required=False, default=tuple(),
+                        help="Names or import paths of the AIs that play. The same AI may be given more than once "
+                             "[Default: all AIs that need no parameters]")
+    parser.add_argument("--with-package", dest="package", type=str, nargs="+", required=False, default=tuple(),
+                        help="Packages imported to find the AIs")
+    parser.add_argument("--schedule", dest="schedule", choices=SCHEDULES, required=False, default=ROUND_ROBIN,
+                        help=f"Who plays whom [Default: \"{ROUND_ROBIN}\"]")
+    parser.add_argument("--rounds", dest="rounds", type=int, required=False, default=None,
+                        help="Rounds of a swiss tournament or cycles of a round robin [Default: enough to find a "
+                             "winner or one cycle]")
+    parser.add_argument("--games-per-match", dest="games_per_match", type=int, required=False, default=2,
+                        help="Games every pair plays per round, colors swap after every game [Default: 2]")
+    parser.add_argument("--time-per-side", dest="time_per_side", type=int, required=False, default=60000,
+                        help="Clock of each side in milliseconds [Default: 60000]")
+    parser.add_argument("--time-per-side-increment", dest="time_per_side_increment", type=int, required=False,
+                        default=0, help="Milliseconds added to the clock after every move [Default: 0]")
+    parser.add_argument("--max-plies", dest="max_plies", type=int, required=False, default=400,
+                        help="Half moves after which a game is a draw [Default: 400]")
+    parser.add_argument("--workers", dest="workers", type=int, required=False, default=None,
+                        help="Worker processes the matches are played in, 0 to play in this process "
+                             "[Default: one per cpu]")
+    parser.add_argument("--pgn", dest="pgn", type=str, required=False, default=None,
+                        help="File all games are written to as pgn")
+    parser.add_argument("--log-file", dest="log_file", type=str, required=False, default=os.devnull,
+                        help="File the logs of the AIs are written to [Default: discarded]")
+    args = parser.parse_args(argv)
+
+    from j_chess_client_manager.clients.registry import get_ai_registry
+    from j_chess_client_manager.headless import setup_headless_logging
+
+    setup_headless_logging(log_file=args.log_file)
+    if len(args.package) > 0:
+        sys.path.append(os.getcwd())
+    for package in args.package:
+        get_ai_registry().include(package)
+    try:
+        players = _playable_players(args.ais)
+        arena = Arena(players=players, games_per_match=args.games_per_match, workers=args.workers,
+                      log_file=args.log_file, settings=RefereeSettings(
+                          time_per_side=args.time_per_side, time_per_side_increment=args.time_per_side_increment,
+                          max_plies=args.max_plies))
+    except (ValueError, ImportError) as e:
+        parser.error(str(e))
+        return 2
+
+    print(f"{len(players)} players: {', '.join(x.name for x in players)}", flush=True)
+    start = time.perf_counter()
+
+    def report(records: List[GameRecord]):
+        first, second = records[0].white, records[0].black
+        first_score = sum(x.score(first) for x in records)
+        print(f"[round {records[0].round}] {first} {first_score:g} - {len(records) - first_score:g} {second} "
+              f"({', '.join(x.termination for x in records)})", flush=True)
+
+    results = arena.run(schedule=args.schedule, rounds=args.rounds, on_match=report)
+    print(f"\nFinished in {time.perf_counter() - start:.1f}s\n")
+    print(results.table())
+    if args.pgn is not None:
+        with open(args.pgn, "w", encoding="utf-8") as f:
+            f.write(results.pgn())
+        print(f"\nGames written to {args.pgn}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
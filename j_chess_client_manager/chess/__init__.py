@@ -0,0 +1,4 @@
+"""Chess helpers independent of the UI and the clients."""
+from .position import Position, square_name, parse_square
+from .moves import IllegalMove, apply_move, apply_move_squares
+from .movegen import Move, legal_moves, has_legal_move, check_move, is_legal, in_check, san
@@ -0,0 +1,317 @@
+"""Legal moves of a Position, generated on bitboards."""
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .position import Position, parse_square, square_name
+
+# (file step, rank step) of the sliding directions, rook directions first
+_DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0), (1, 1), (1, -1), (-1, -1), (-1, 1))
+_ROOK_DIRECTIONS = (0, 1, 2, 3)
+_BISHOP_DIRECTIONS = (4, 5, 6, 7)
+# Directions going to higher squares find their first blocker in the lowest bit, the others in the highest
+_ASCENDING = tuple(rank > 0 or (rank == 0 and file > 0) for file, rank in _DIRECTIONS)
+
+PROMOTIONS = "QRBN"
+
+
+def _on_board(file: int, rank: int) -> bool:
+    return 0 <= file < 8 and 0 <= rank < 8
+
+
+def _jumps(steps: Tuple[Tuple[int, int], ...]) -> Tuple[int, ...]:
+    ret = []
+    for square in range(64):
+        mask = 0
+        for file_step, rank_step in steps:
+            file, rank = square % 8 + file_step, square // 8 + rank_step
+            if _on_board(file, rank):
+                mask |= 1 << (rank * 8 + file)
+        ret.append(mask)
+    return tuple(ret)
+
+
+def _rays() -> Tuple[Tuple[int, ...], ...]:
+    ret = []
+    for file_step, rank_step in _DIRECTIONS:
+        masks = []
+        for square in range(64):
+            mask, file, rank = 0, square % 8 + file_step, square // 8 + rank_step
+            while _on_board(file, rank):
+                mask |= 1 << (rank * 8 + file)
+                file, rank = file + file_step, rank + rank_step
+            masks.append(mask)
+        ret.append(tuple(masks))
+    return tuple(ret)
+
+
+_KNIGHT = _jumps(((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)))
+_KING = _jumps(((0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1)))
+# Squares a pawn of the given color attacks from a square
+_PAWN_ATTACKS = {True: _jumps(((-1, 1), (1, 1))), False: _jumps(((-1, -1), (1, -1)))}
+_RAYS = _rays()
+
+# King square, target, squares that have to be empty, squares that must not be attacked
+_CASTLES = {
+    "K": (4, 6, (5, 6), (4, 5, 6)), "Q": (4, 2, (1, 2, 3), (4, 3, 2)),
+    "k": (60, 62, (61, 62), (60, 61, 62)), "q": (60, 58, (57, 58, 59), (60, 59, 58)),
+}
+_CASTLE_ROOKS = {"K": (7, "R"), "Q": (0, "R"), "k": (63, "r"), "q": (56, "r")}
+
+
+class Move(NamedTuple):
+    origin: int
+    target: int
+    # Upper case symbol of the piece a pawn is promoted to or None
+    promotion: Optional[str] = None
+
+    @property
+    def from_value(self) -> str:
+        return square_name(self.origin)
+
+    @property
+    def to(self) -> str:
+        return square_name(self.target)
+
+    def __str__(self):
+        return f"{self.from_value}{self.to}{'' if self.promotion is None else self.promotion.lower()}"
+
+
+def _slide(square: int, occupancy: int, directions: Tuple[int, ...]) -> int:
+    attacks = 0
+    for direction in directions:
+        ray = _RAYS[direction][square]
+        blockers = ray & occupancy
+        if blockers:
+            if _ASCENDING[direction]:
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            ray ^= _RAYS[direction][blocker]
+        attacks |= ray
+    return attacks
+
+
+def _squares(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _attacked(position: Position, square: int, by_white: bool, occupancy: int, removed: int = 0) -> bool:
+    # removed are squares whose pieces are gone, e.g. a piece that was just captured
+    keep = ~removed
+    pawn, knight, bishop, rook, queen, king = "PNBRQK" if by_white else "pnbrqk"
+    if _KNIGHT[square] & position.bitboard(knight) & keep:
+        return True
+    if _KING[square] & position.bitboard(king) & keep:
+        return True
+    # A pawn attacks the square if a pawn of the other color on the square would attack the pawn
+    if _PAWN_ATTACKS[not by_white][square] & position.bitboard(pawn) & keep:
+        return True
+    queens = position.bitboard(queen)
+    if _slide(square, occupancy, _ROOK_DIRECTIONS) & (position.bitboard(rook) | queens) & keep:
+        return True
+    return _slide(square, occupancy, _BISHOP_DIRECTIONS) & (position.bitboard(bishop) | queens) & keep != 0
+
+
+def in_check(position: Position, white: Optional[bool] = None) -> bool:
+    """
+    Whether the king of a side is attacked. The side to move if white is None
+    """
+    white = position.white_turn if white is None else white
+    king = position.bitboard("K" if white else "k")
+    if king == 0:
+        return False
+    return _attacked(position, king.bit_length() - 1, by_white=not white, occupancy=position.occupancy())
+
+
+def _targets(position: Position, piece: str, origin: int, own: int, enemy: int) -> int:
+    # Squares the piece can move to without looking at the own king, castling is handled apart
+    kind = piece.upper()
+    occupancy = own | enemy
+    if kind == "P":
+        white = piece == "P"
+        step = 8 if white else -8
+        ret = 0
+        one = origin + step
+        if 0 <= one < 64 and not occupancy >> one & 1:
+            ret |= 1 << one
+            if origin // 8 == (1 if white else 6) and not occupancy >> (one + step) & 1:
+                ret |= 1 << (one + step)
+        capturable = enemy | (0 if position.en_passant < 0 else 1 << position.en_passant)
+        return ret | (_PAWN_ATTACKS[white][origin] & capturable)
+    if kind == "N":
+        ret = _KNIGHT[origin]
+    elif kind == "K":
+        ret = _KING[origin]
+    elif kind == "B":
+        ret = _slide(origin, occupancy, _BISHOP_DIRECTIONS)
+    elif kind == "R":
+        ret = _slide(origin, occupancy, _ROOK_DIRECTIONS)
+    else:
+        ret = _slide(origin, occupancy, _ROOK_DIRECTIONS) | _slide(origin, occupancy, _BISHOP_DIRECTIONS)
+    return ret & ~own
+
+
+def _castles(position: Position, white: bool, occupancy: int) -> List[int]:
+    ret = []
+    for right in ("KQ" if white else "kq"):
+        if not position.can_castle(right):
+            continue
+        king, target, empty, safe = _CASTLES[right]
+        rook_square, rook = _CASTLE_ROOKS[right]
+        if position.piece_at(king) != ("K" if white else "k") or position.piece_at(rook_square) != rook:
+            continue
+        if any(occupancy >> x & 1 for x in empty):
+            continue
+        if any(_attacked(position, x, by_white=not white, occupancy=occupancy) for x in safe):
+            continue
+        ret.append(target)
+    return ret
+
+
+def _king_safe(position: Position, white: bool, origin: int, target: int, occupancy: int) -> bool:
+    # Whether the own king is not attacked after the piece on origin moved to target
+    piece = position.piece_at(origin)
+    captured = target
+    if piece in "Pp" and target == position.en_passant:
+        captured = target - 8 if white else target + 8
+    occupancy = (occupancy & ~(1 << origin) & ~(1 << captured)) | (1 << target)
+    if piece in "Kk":
+        king = target
+    else:
+        king = position.bitboard("K" if white else "k").bit_length() - 1
+        if king < 0:
+            return True
+    return not _attacked(position, king, by_white=not white, occupancy=occupancy, removed=1 << captured)
+
+
+def legal_moves(position: Position) -> List[Move]:
+    """
+    All legal moves of the side to move, a pawn reaching the last rank gives one move per promotion
+    """
+    white = position.white_turn
+    own, enemy = position.occupancy(white), position.occupancy(not white)
+    occupancy = own | enemy
+    ret = []
+    for piece in ("PNBRQK" if white else "pnbrqk"):
+        for origin in _squares(position.bitboard(piece)):
+            for target in _squares(_targets(position, piece, origin, own, enemy)):
+                if not _king_safe(position, white, origin, target, occupancy):
+                    continue
+                if piece in "Pp" and target // 8 in (0, 7):
+                    ret.extend(Move(origin, target, x) for x in PROMOTIONS)
+                else:
+                    ret.append(Move(origin, target))
+            if piece in "Kk":
+                ret.extend(Move(origin, x) for x in _castles(position, white, occupancy))
+    return ret
+
+
+def has_legal_move(position: Position) -> bool:
+    white = position.white_turn
+    own, enemy = position.occupancy(white), position.occupancy(not white)
+    occupancy = own | enemy
+    for piece in ("KQRBNP" if white else "kqrbnp"):
+        for origin in _squares(position.bitboard(piece)):
+            for target in _squares(_targets(position, piece, origin, own, enemy)):
+                if _king_safe(position, white, origin, target, occupancy):
+                    return True
+    # Castling needs a legal king move to f1/d1 (or f8/d8) first, so it never is the only legal move
+    return False
+
+
+def check_move(position: Position, from_value: Optional[str], to: Optional[str],
+               promotion: Optional[str] = None) -> Optional[str]:
+    """
+    Check a single move without generating all others
+
+    Parameters
+    ----------
+    position: Position
+        Position the move is played in
+    from_value: Optional[str]
+        Square the piece moves from, e.g. "e2"
+    to: Optional[str]
+        Square the piece moves to
+    promotion: Optional[str]
+        Piece a pawn is promoted to. Pawns reaching the last rank without one become queens
+
+    Returns
+    -------
+    None if the move is legal, else why it is not
+    """
+    try:
+        origin, target = parse_square(from_value or ""), parse_square(to or "")
+    except ValueError as e:
+        return str(e)
+    white = position.white_turn
+    piece = position.piece_at(origin)
+    if piece == "" or piece.isupper() != white:
+        return f"No piece of the side to move on {from_value}"
+    own, enemy = position.occupancy(white), position.occupancy(not white)
+    occupancy = own | enemy
+    if not _targets(position, piece, origin, own, enemy) >> target & 1:
+        if piece not in "Kk" or target not in _castles(position, white, occupancy):
+            return f"The {piece} on {from_value} can not move to {to}"
+        return None
+    if promotion is not None and piece in "Pp" and target // 8 in (0, 7) and promotion.upper() not in PROMOTIONS:
+        return f"Can not promote to \"{promotion}\""
+    if not _king_safe(position, white, origin, target, occupancy):
+        return f"{from_value}-{to} leaves the king in check"
+    return None
+
+
+def is_legal(position: Position, from_value: Optional[str], to: Optional[str], promotion: Optional[str] = None) -> bool:
+    return check_move(position, from_value, to, promotion) is None
+
+
+_SAN_PIECES: Dict[str, str] = {"P": "", "N": "N", "B": "B", "R": "R", "Q": "Q", "K": "K"}
+
+
+def san(position: Position, move: Move, moves: Optional[List[Move]] = None) -> str:
+    """
+    Standard algebraic notation of a legal move, as used in pgn
+
+    Parameters
+    ----------
+    position: Position
+        Position the move is played in
+    move: Move
+        The move
+    moves: Optional[List[Move]]
+        Legal moves of the position if they are known already
+
+    Returns
+    -------
+    The move like "Nbd7", "exd5", "O-O" or "e8=Q+"
+    """
+    from .moves import apply_move_squares
+
+    piece = position.piece_at(move.origin).upper()
+    if piece == "K" and abs(move.target - move.origin) == 2:
+        text = "O-O" if move.target > move.origin else "O-O-O"
+    else:
+        capture = position.piece_at(move.target) != "" or (piece == "P" and move.target == position.en_passant)
+        text = _SAN_PIECES[piece]
+        if piece == "P":
+            if capture:
+                text = square_name(move.origin)[0]
+        else:
+            moves = legal_moves(position) if moves is None else moves
+            rivals = [x.origin for x in moves if x.target == move.target and x.origin != move.origin and
+                      position.piece_at(x.origin).upper() == piece]
+            if len(rivals) > 0:
+                if all(x % 8 != move.origin % 8 for x in rivals):
+                    text += square_name(move.origin)[0]
+                elif all(x // 8 != move.origin // 8 for x in rivals):
+                    text += square_name(move.origin)[1]
+                else:
+                    text += square_name(move.origin)
+        text += f"{'x' if capture else ''}{square_name(move.target)}"
+        if move.promotion is not None:
+            text += f"={move.promotion.upper()}"
+    after = apply_move_squares(position, move.origin, move.target, move.promotion)[0]
+    if in_check(after):
+        text += "+" if has_legal_move(after) else "#"
+    return text
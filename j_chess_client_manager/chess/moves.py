@@ -0,0 +1,80 @@
+"""Play moves given in the format of the J-Chess protocol on a Position."""
+from typing import Optional, Tuple
+
+from j_chess_lib.communication import MoveData
+
+from .position import Position, PIECES, CASTLING, EMPTY, parse_square, square_name
+
+# Castling rights lost when a piece leaves or arrives at one of these squares
+_CASTLING_SQUARES = {0: CASTLING["Q"], 4: CASTLING["K"] | CASTLING["Q"], 7: CASTLING["K"],
+                     56: CASTLING["q"], 60: CASTLING["k"] | CASTLING["q"], 63: CASTLING["k"]}
+
+
+class IllegalMove(ValueError):
+    pass
+
+
+def apply_move(position: Position, move: MoveData) -> Tuple[Position, str]:
+    """
+    Play a move on a position. Only checks that a piece of the side to move is moved and no own piece is captured,
+    castling, en passant and promotions are carried out
+
+    Parameters
+    ----------
+    position: Position
+        Position before the move
+    move: MoveData
+        Move of the side to move
+
+    Returns
+    -------
+    The position after the move and the symbol of the captured piece or ""
+    """
+    try:
+        origin, target = parse_square(move.from_value or ""), parse_square(move.to or "")
+    except ValueError as e:
+        raise IllegalMove(str(e)) from e
+    return apply_move_squares(position, origin, target, move.promotion_unit)
+
+
+def apply_move_squares(position: Position, origin: int, target: int,
+                       promotion: Optional[str] = None) -> Tuple[Position, str]:
+    """
+    Like apply_move with the squares counted from a1 = 0
+    """
+    piece = position.piece_at(origin)
+    if piece == "" or piece.isupper() != position.white_turn:
+        raise IllegalMove(f"No piece of the side to move on {square_name(origin)}")
+    captured = position.piece_at(target)
+    if captured != "" and captured.isupper() == position.white_turn:
+        raise IllegalMove(f"{square_name(origin)}-{square_name(target)} captures an own piece")
+
+    squares = bytearray(position.squares)
+    squares[origin] = EMPTY
+    squares[target] = PIECES.index(piece) + 1
+    en_passant = -1
+    if piece in "Pp":
+        if target == position.en_passant and captured == "":
+            captured_square = target - 8 if position.white_turn else target + 8
+            captured = position.piece_at(captured_square)
+            squares[captured_square] = EMPTY
+        elif abs(target - origin) == 16:
+            en_passant = (origin + target) // 2
+        if target // 8 in (0, 7):
+            promoted = promotion or "Q"
+            promoted = promoted.upper() if position.white_turn else promoted.lower()
+            if promoted not in PIECES or promoted in "PpKk":
+                raise IllegalMove(f"Can not promote to \"{promotion}\"")
+            squares[target] = PIECES.index(promoted) + 1
+    elif piece in "Kk" and abs(target - origin) == 2:
+        rook_origin, rook_target = (origin + 3, origin + 1) if target > origin else (origin - 4, origin - 1)
+        squares[rook_target] = squares[rook_origin]
+        squares[rook_origin] = EMPTY
+
+    castling = position.castling & ~(_CASTLING_SQUARES.get(origin, 0) | _CASTLING_SQUARES.get(target, 0))
+    reset = piece in "Pp" or captured != ""
+    return Position(
+        bytes(squares), white_turn=not position.white_turn, castling=castling, en_passant=en_passant,
+        half_moves_since_pawn=0 if reset else position.half_moves_since_pawn + 1,
+        turn=position.turn + (0 if position.white_turn else 1),
+    ), captured
@@ -1,8 +1,23 @@
 from abc import ABC, abstractmethod
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Type
+
+_Paths = Tuple[Tuple[Tuple[int, int], ...], ...]
+
+# Shared by the pieces, the tiles are mostly 2:1 so the body of a piece is a bit wider than its head
+_BASE = [(0.24, 0.76), (0.76, 0.76), (0.76, 0.88), (0.24, 0.88)]
 
 
 class Piece(ABC):
+    """
+    Shape of a piece as polygons in a unit square, x to the right and y down. The polygons of a piece do not overlap
+    so they can be filled together
+    """
+
+    # Upper case symbol of the piece in a fen
+    symbol: str = ""
+    # Unicode chess symbols of the white and the black piece
+    glyphs: Tuple[str, str] = ("", "")
 
     @classmethod
     @abstractmethod
@@ -11,15 +26,122 @@ class Piece(ABC):
 
     @classmethod
     def path(cls, w: int, h: int, dx: int = 0, dy: int = 0) -> List[List[Tuple[int, int]]]:
+        """
+        Polygons of the piece scaled to a tile of w x h cells whose top left cell is (dx, dy). Scaling is only done
+        once per tile size
+        """
+        return [[(x + dx, y + dy) for x, y in polygon] for polygon in _scaled(cls, w, h)]
+
+    @classmethod
+    def glyph(cls, white: bool) -> str:
+        return cls.glyphs[0 if white else 1]
+
+
+@lru_cache(maxsize=64)
+def _scaled(piece: Type[Piece], w: int, h: int) -> _Paths:
+    # Twelve pieces per tile size, so the cache holds a few sizes. The board clears it when its tiles change
+    # noinspection PyProtectedMember
+    return tuple(tuple((int(w_f * w), int(h_f * h)) for w_f, h_f in x) for x in piece._paths())
+
+
+def clear_path_cache():
+    """
+    Forget all scaled paths, e.g. after the terminal was resized
+    """
+    _scaled.cache_clear()
+
+
+def path_cache_size() -> int:
+    return _scaled.cache_info().currsize
+
+
+class Pawn(Piece):
+    symbol = "P"
+    glyphs = ("♙", "♟")
+
+    @classmethod
+    def _paths(cls) -> List[List[Tuple[float, float]]]:
         return [
-            [(int(w_f * w) + dx, int(h_f * h) + dy) for w_f, h_f in x] for x in cls._paths()
+            [(0.44, 0.2), (0.56, 0.2), (0.62, 0.3), (0.56, 0.42), (0.44, 0.42), (0.38, 0.3)],
+            [(0.42, 0.42), (0.58, 0.42), (0.66, 0.76), (0.34, 0.76)],
+            _BASE,
         ]
 
 
-class Pawn(Piece):
+class Knight(Piece):
+    symbol = "N"
+    glyphs = ("♘", "♞")
+
+    @classmethod
+    def _paths(cls) -> List[List[Tuple[float, float]]]:
+        return [
+            [(0.46, 0.12), (0.58, 0.16), (0.68, 0.34), (0.72, 0.56), (0.7, 0.76), (0.34, 0.76), (0.5, 0.5),
+             (0.44, 0.44), (0.28, 0.52), (0.22, 0.44), (0.3, 0.3), (0.42, 0.22)],
+            _BASE,
+        ]
+
+
+class Bishop(Piece):
+    symbol = "B"
+    glyphs = ("♗", "♝")
 
     @classmethod
     def _paths(cls) -> List[List[Tuple[float, float]]]:
         return [
-            [(0.33, 0.9), (0.66, 0.9), (0.66, 0.2), (0.33, 0.2)]
+            [(0.5, 0.1), (0.6, 0.22), (0.64, 0.36), (0.56, 0.48), (0.44, 0.48), (0.36, 0.36), (0.4, 0.22)],
+            [(0.44, 0.48), (0.56, 0.48), (0.64, 0.76), (0.36, 0.76)],
+            _BASE,
         ]
+
+
+class Rook(Piece):
+    symbol = "R"
+    glyphs = ("♖", "♜")
+
+    @classmethod
+    def _paths(cls) -> List[List[Tuple[float, float]]]:
+        return [
+            [(0.26, 0.14), (0.36, 0.14), (0.36, 0.22), (0.45, 0.22), (0.45, 0.14), (0.55, 0.14), (0.55, 0.22),
+             (0.64, 0.22), (0.64, 0.14), (0.74, 0.14), (0.74, 0.34), (0.26, 0.34)],
+            [(0.32, 0.34), (0.68, 0.34), (0.68, 0.76), (0.32, 0.76)],
+            _BASE,
+        ]
+
+
+class Queen(Piece):
+    symbol = "Q"
+    glyphs = ("♕", "♛")
+
+    @classmethod
+    def _paths(cls) -> List[List[Tuple[float, float]]]:
+        return [
+            [(0.22, 0.14), (0.36, 0.34), (0.38, 0.1), (0.5, 0.32), (0.62, 0.1), (0.64, 0.34), (0.78, 0.14),
+             (0.7, 0.5), (0.3, 0.5)],
+            [(0.3, 0.5), (0.7, 0.5), (0.66, 0.76), (0.34, 0.76)],
+            _BASE,
+        ]
+
+
+class King(Piece):
+    symbol = "K"
+    glyphs = ("♔", "♚")
+
+    @classmethod
+    def _paths(cls) -> List[List[Tuple[float, float]]]:
+        return [
+            [(0.46, 0.06), (0.54, 0.06), (0.54, 0.12), (0.62, 0.12), (0.62, 0.2), (0.54, 0.2), (0.54, 0.3),
+             (0.46, 0.3), (0.46, 0.2), (0.38, 0.2), (0.38, 0.12), (0.46, 0.12)],
+            [(0.3, 0.3), (0.7, 0.3), (0.66, 0.5), (0.34, 0.5)],
+            [(0.34, 0.5), (0.66, 0.5), (0.7, 0.76), (0.3, 0.76)],
+            _BASE,
+        ]
+
+
+PIECE_TYPES: Dict[str, Type[Piece]] = {x.symbol: x for x in (Pawn, Knight, Bishop, Rook, Queen, King)}
+
+
+def piece_type(symbol: str) -> Optional[Type[Piece]]:
+    """
+    Piece of a fen symbol of either color, None for empty squares and unknown symbols
+    """
+    return PIECE_TYPES.get(symbol.upper(), None)
@@ -0,0 +1,228 @@
+from typing import Dict, List, Optional, Tuple
+
+PIECES = "PNBRQKpnbrqk"
+EMPTY = 0
+CASTLING = {"K": 1, "Q": 2, "k": 4, "q": 8}
+PIECE_VALUES = {"P": 1, "N": 3, "B": 3, "R": 5, "Q": 9, "K": 0}
+
+_CODES: Dict[str, int] = {piece: i + 1 for i, piece in enumerate(PIECES)}
+_SYMBOLS: Tuple[str, ...] = ("",) + tuple(PIECES)
+# Translation tables turning the squares into a string of "0" and "1" per piece so bitboards are built in one call
+_BIT_TABLES: Dict[str, bytes] = {
+    piece: bytes(ord("1") if i == code else ord("0") for i in range(256)) for piece, code in _CODES.items()
+}
+_WHITE_TABLE = bytes(ord("1") if 1 <= i <= 6 else ord("0") for i in range(256))
+_BLACK_TABLE = bytes(ord("1") if 7 <= i <= 12 else ord("0") for i in range(256))
+
+
+def square_name(square: int) -> str:
+    return f"{chr(97 + square % 8)}{square // 8 + 1}"
+
+
+def parse_square(name: str) -> int:
+    if len(name) != 2 or name[0] not in "abcdefgh" or name[1] not in "12345678":
+        raise ValueError(f"\"{name}\" is no square")
+    return (int(name[1]) - 1) * 8 + ord(name[0]) - 97
+
+
+class Position:
+    """
+    Compact chess position. The pieces are stored in 64 bytes, one per square with a1 = 0, b1 = 1, ..., h8 = 63.
+    Counting and locating pieces runs on the bytes, bitboards are built on first use
+    """
+
+    __slots__ = ("_squares", "_white_turn", "_castling", "_en_passant", "_half_moves_since_pawn", "_turn",
+                 "_bitboards")
+
+    def __init__(self, squares: bytes, white_turn: bool = True, castling: int = 0, en_passant: int = -1,
+                 half_moves_since_pawn: int = 0, turn: int = 1):
+        if len(squares) != 64:
+            raise ValueError(f"A position needs 64 squares not {len(squares)}")
+        self._squares = bytes(squares)
+        self._white_turn = white_turn
+        self._castling = castling
+        self._en_passant = en_passant
+        self._half_moves_since_pawn = half_moves_since_pawn
+        self._turn = turn
+        self._bitboards: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def empty(cls) -> "Position":
+        return cls(bytes(64))
+
+    @classmethod
+    def from_fen(cls, fen: str) -> "Position":
+        """
+        Create a position from a fen. Missing fields after the board get defaults
+
+        Parameters
+        ----------
+        fen: str
+            Fen of the position
+
+        Returns
+        -------
+        The position
+        """
+        parts = fen.split(" ")
+        ranks = parts[0].split("/")
+        if len(ranks) != 8:
+            raise ValueError(f"Board of \"{fen}\" does not have 8 ranks")
+        squares = bytearray(64)
+        for i, rank in enumerate(ranks):
+            file, offset = 0, (7 - i) * 8
+            for c in rank:
+                if c.isdigit():
+                    file += int(c)
+                elif c in _CODES:
+                    if file < 8:
+                        squares[offset + file] = _CODES[c]
+                    file += 1
+                else:
+                    raise ValueError(f"Unknown piece \"{c}\" in \"{fen}\"")
+            if file != 8:
+                raise ValueError(f"Rank {8 - i} of \"{fen}\" does not have 8 squares")
+        castling = 0
+        if len(parts) > 2:
+            for c in parts[2]:
+                castling |= CASTLING.get(c, 0)
+        try:
+            en_passant = parse_square(parts[3]) if len(parts) > 3 and parts[3] != "-" else -1
+        except ValueError:
+            en_passant = -1
+        try:
+            half_moves_since_pawn = int(parts[4]) if len(parts) > 4 else 0
+        except ValueError:
+            half_moves_since_pawn = 0
+        try:
+            turn = int(parts[5]) if len(parts) > 5 else 1
+        except ValueError:
+            turn = 1
+        return cls(squares, white_turn=len(parts) <= 1 or parts[1].lower() == "w", castling=castling,
+                   en_passant=en_passant, half_moves_since_pawn=half_moves_since_pawn, turn=turn)
+
+    @property
+    def squares(self) -> bytes:
+        return self._squares
+
+    @property
+    def white_turn(self) -> bool:
+        return self._white_turn
+
+    @property
+    def castling(self) -> int:
+        """
+        Castling rights as bit mask of CASTLING
+        """
+        return self._castling
+
+    @property
+    def en_passant(self) -> int:
+        """
+        Square that can be captured en passant or -1
+        """
+        return self._en_passant
+
+    @property
+    def half_moves_since_pawn(self) -> int:
+        return self._half_moves_since_pawn
+
+    @property
+    def turn(self) -> int:
+        return self._turn
+
+    def can_castle(self, right: str) -> bool:
+        return self._castling & CASTLING[right] != 0
+
+    def piece_at(self, square: int) -> str:
+        """
+        Symbol of the piece on the square (upper case for white) or "" if it is empty
+        """
+        return _SYMBOLS[self._squares[square]]
+
+    def symbol(self, file: int, rank: int) -> str:
+        """
+        Like piece_at but with file and rank counted from 0
+        """
+        return _SYMBOLS[self._squares[rank * 8 + file]]
+
+    def count(self, piece: str) -> int:
+        return self._squares.count(_CODES[piece])
+
+    def counts(self) -> Dict[str, int]:
+        return {piece: self._squares.count(code) for piece, code in _CODES.items()}
+
+    def material(self, white: bool) -> int:
+        """
+        Sum of PIECE_VALUES of all pieces of one side
+        """
+        if white:
+            return sum(value * self._squares.count(_CODES[piece]) for piece, value in PIECE_VALUES.items())
+        return sum(value * self._squares.count(_CODES[piece.lower()]) for piece, value in PIECE_VALUES.items())
+
+    def material_balance(self) -> int:
+        """
+        Material of white minus material of black
+        """
+        return self.material(True) - self.material(False)
+
+    def piece_list(self, piece: str) -> List[int]:
+        """
+        All squares the given piece is standing on in ascending order
+        """
+        code, squares, ret = _CODES[piece], self._squares, []
+        square = squares.find(code)
+        while square >= 0:
+            ret.append(square)
+            square = squares.find(code, square + 1)
+        return ret
+
+    def bitboard(self, piece: str) -> int:
+        """
+        Bit mask of all squares the given piece is standing on. Bit i is square i
+        """
+        if self._bitboards is None:
+            self._bitboards = {x: int(self._squares.translate(table)[::-1], 2) for x, table in _BIT_TABLES.items()}
+        return self._bitboards[piece]
+
+    def occupancy(self, white: Optional[bool] = None) -> int:
+        """
+        Bit mask of all squares occupied by one side or by both if white is None
+        """
+        if white is None:
+            return self.occupancy(True) | self.occupancy(False)
+        return int(self._squares.translate(_WHITE_TABLE if white else _BLACK_TABLE)[::-1], 2)
+
+    def board_fen(self) -> str:
+        ranks = []
+        for rank in range(7, -1, -1):
+            text, empty = "", 0
+            for code in self._squares[rank * 8:rank * 8 + 8]:
+                if code == EMPTY:
+                    empty += 1
+                    continue
+                if empty > 0:
+                    text += str(empty)
+                    empty = 0
+                text += _SYMBOLS[code]
+            ranks.append(text + (str(empty) if empty > 0 else ""))
+        return "/".join(ranks)
+
+    def fen(self) -> str:
+        castling = "".join(x for x in CASTLING if self.can_castle(x)) or "-"
+        en_passant = "-" if self._en_passant < 0 else square_name(self._en_passant)
+        return f"{self.board_fen()} {'w' if self._white_turn else 'b'} {castling} {en_passant} " \
+               f"{self._half_moves_since_pawn} {self._turn}"
+
+    def _key(self):
+        return (self._squares, self._white_turn, self._castling, self._en_passant, self._half_moves_since_pawn,
+                self._turn)
+
+    def __eq__(self, other):
+        return isinstance(other, Position) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return f"{type(self).__name__}(\"{self.fen()}\")"
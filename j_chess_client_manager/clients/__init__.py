@@ -8,6 +8,8 @@ from .metrics import MetricProvider
 from .board import BoardProvider
 from .tournament import TournamentParticipator
 from .refresh import RefreshInitiator
+from .watchdog import ClockWatched
+from .snapshot import SnapshotProvider
 
 
 class ClientTypes(Enum):
@@ -47,7 +49,7 @@ class Typeable:
         return ClientTypes.Unknown
 
 
-class SuperProvider(BoardProvider, TournamentParticipator, Typeable, ABC):
+class SuperProvider(BoardProvider, TournamentParticipator, ClockWatched, SnapshotProvider, Typeable, ABC):
     pass
 
 
@@ -1,12 +1,24 @@
+import threading
 from abc import ABC
+from functools import partial
+from time import perf_counter
 from typing import Type, Any, Dict, Optional, Tuple, List, Union, Callable
 from uuid import UUID
 
 from j_chess_lib.ai import StoreAI, AI
+from j_chess_lib.ai.board import BoardState
 from j_chess_lib.ai.container import GameState
 from j_chess_lib.communication import MoveData, MatchStatusData, MatchFormatData
 
 from . import SuperProvider
+from .latency import MoveTimings
+from .move_cache import MoveCacheView, get_move_cache, cache_namespace
+from .ponder import PonderState, get_ponderer
+from .ratings import get_rating_engine
+from .validation import ValidationState, get_move_validator
+from .snapshot import ClientSnapshot
+from .observers import GameResult, game_finished
+from .watchdog import get_clock_watchdog, Search
 from j_chess_client_manager.logging import SYSTEM_LOGGER
 
 
@@ -18,6 +30,12 @@ def wrap_ai(
         def need_update(*args, **kwargs):
             pass
 
+    class _PonderAI(base_ai):
+
+        def should_stop(self) -> bool:
+            # Pondered searches are not watched by the clock watchdog
+            return False
+
     class _WrappedAI(SuperProvider, base_ai):
 
         @property
@@ -32,6 +50,76 @@ def wrap_ai(
             self._i_am_white = True
             self._your_time = -1
             self._enemy_time = -1
+            self._move_timings = MoveTimings()
+            self._search: Optional[Search] = None
+            self._matches = 0
+            self._games = 0
+            self._wins = 0
+            self._losses = 0
+            self._draws = 0
+            self._in_game = False
+            self._clock_warnings = 0
+            self._snapshot: Optional[ClientSnapshot] = None
+            move_cache = get_move_cache()
+            self._cached_moves: Optional[MoveCacheView] = \
+                move_cache.view(cache_namespace(base_ai, base_init_values)) if move_cache.enabled else None
+            ponderer = get_ponderer()
+            self._ponder: Optional[PonderState] = None
+            self._ponder_ai: Optional[AI] = None
+            self._ponder_lock = threading.Lock()
+            if ponderer.enabled:
+                self._ponder = PonderState(ponderer)
+                # Pondering searches with an instance of its own, the state of this AI only changes by its real moves
+                self._ponder_ai = _PonderAI(**base_init_values)
+            validator = get_move_validator()
+            self._validation: Optional[ValidationState] = ValidationState(validator) if validator.enabled else None
+            self._publish()
+
+        @property
+        def move_timings(self) -> MoveTimings:
+            return self._move_timings
+
+        @property
+        def move_cache(self) -> Optional[MoveCacheView]:
+            return self._cached_moves
+
+        @property
+        def ponder(self) -> Optional[PonderState]:
+            return self._ponder
+
+        @property
+        def validation(self) -> Optional[ValidationState]:
+            return self._validation
+
+        @property
+        def clock_warning(self) -> float:
+            search = self._search
+            return 0.0 if search is None else search.warning
+
+        @property
+        def snapshot(self) -> Optional[ClientSnapshot]:
+            return self._snapshot
+
+        def _publish(self):
+            # Built in the thread of the AI so readers like the metrics exporter only read a finished object
+            self._snapshot = ClientSnapshot(
+                name=self.name, tournament_code=tournament_code, own_time=self._your_time,
+                enemy_time=self._enemy_time, clock_warning=self.clock_warning, matches=self._matches,
+                games=self._games, wins=self._wins, losses=self._losses, draws=self._draws,
+                moves=self._move_timings.moves(), overhead=self._move_timings.overhead(), in_game=self._in_game,
+                clock_warnings=self._clock_warnings,
+            )
+
+        def _on_clock_warning(self, fraction: float):
+            self._publish()
+            need_update(self, clock_warning=fraction)
+
+        def should_stop(self) -> bool:
+            """
+            Can be polled by the AI during get_move. True once the clock watchdog asks the AI to stop its search
+            """
+            search = self._search
+            return search is not None and search.stop_requested
 
         @property
         def white_time(self) -> int:
@@ -48,6 +136,7 @@ def wrap_ai(
         def metrics(self) -> List[Tuple[str, Any]]:
             en_passant = self.en_passant()
             castling = self.castling()
+            position = self.position()
             own_metrics = [
                 ("Turn", str(self.turn())),
                 ("Current player", "white" if self.white_turn() else "black"),
@@ -55,9 +144,17 @@ def wrap_ai(
                 ("Castling white", f"King: {castling['w']['k']}; Queen: {castling['w']['q']}"),
                 ("Castling black", f"King: {castling['b']['k']}; Queen: {castling['b']['q']}"),
                 ("Halfmove clock", f"{self.half_moves_since_pawn()}"),
+                ("Material", f"White: {position.material(True)}; Black: {position.material(False)}; "
+                             f"Balance: {position.material_balance():+d}"),
             ]
             metrics = super().metrics()
-            return own_metrics + metrics
+            cache_metrics = [] if self._cached_moves is None else self._cached_moves.metrics()
+            ponder_metrics = [] if self._ponder is None else self._ponder.metrics()
+            validation_metrics = [] if self._validation is None else self._validation.metrics()
+            ratings = get_rating_engine()
+            rating_metrics = ratings.metrics(self.name, self._enemy_name) if ratings.enabled else []
+            return own_metrics + self._move_timings.metrics() + cache_metrics + ponder_metrics + validation_metrics + \
+                rating_metrics + metrics
 
         @property
         def white_name(self):
@@ -70,32 +167,113 @@ def wrap_ai(
         def new_match(self, match_id: UUID, enemy: str, match_format: MatchFormatData):
             self._enemy_name = enemy
             ret = super(_WrappedAI, self).new_match(match_id=match_id, enemy=enemy, match_format=match_format)
+            if self._ponder_ai is not None:
+                with self._ponder_lock:
+                    self._ponder_ai.new_match(match_id=match_id, enemy=enemy, match_format=match_format)
+            self._publish()
             need_update(self)
             return ret
 
         def finalize_match(self, match_id: UUID, status: MatchStatusData, statistics: str):
             ret = super(_WrappedAI, self).finalize_match(match_id=match_id, status=status, statistics=statistics)
+            self._matches += 1
+            self._publish()
             need_update(self)
             return ret
 
         def new_game(self, game_id: UUID, match_id: UUID, white_player: str):
             self._i_am_white = white_player == self.name
             ret = super(_WrappedAI, self).new_game(game_id=game_id, match_id=match_id, white_player=white_player)
+            if self._ponder_ai is not None:
+                # Only the start of matches and games is passed on, results are handled once by this AI
+                with self._ponder_lock:
+                    self._ponder_ai.new_game(game_id=game_id, match_id=match_id, white_player=white_player)
+            self._in_game = True
+            self._publish()
             need_update(self)
             return ret
 
         def finalize_game(self, game_id: UUID, match_id: UUID, winner: Optional[str], pgn: str):
             SYSTEM_LOGGER.info(f"Game ended. {winner} ({'you' if winner == self.name else 'not you'}) won")
             ret = super(_WrappedAI, self).finalize_game(game_id=game_id, match_id=match_id, winner=winner, pgn=pgn)
+            self._games += 1
+            self._in_game = False
+            if winner is None:
+                self._draws += 1
+            elif winner == self.name:
+                self._wins += 1
+            else:
+                self._losses += 1
+            if self._ponder is not None:
+                self._ponder.discard()
+            self._publish()
+            game_finished(GameResult.create(
+                game_id=game_id, match_id=match_id, client=self.name, opponent=self._enemy_name,
+                tournament_code=tournament_code, white=self._i_am_white, winner=winner, pgn=pgn,
+            ))
             need_update(self)
             return ret
 
+        def _ponder_search(self, game_id: UUID, match_id: UUID, fen: str, reply: MoveData) -> MoveData:
+            game_state = GameState(enemy_time=self._enemy_time, your_time=self._your_time, last_move=reply,
+                                   board_state=BoardState(fen=fen))
+            # One pondered search at a time, the pondering instance is never called from two threads
+            with self._ponder_lock:
+                return self._ponder_ai.get_move(game_id=game_id, match_id=match_id, game_state=game_state)
+
+        def _ask_again(self, spent: List[float], game_id: UUID, match_id: UUID, game_state: GameState) -> MoveData:
+            # Asked by the validation after an illegal move, the time is added to the time of the move
+            ask_start = perf_counter()
+            try:
+                return super(_WrappedAI, self).get_move(game_id=game_id, match_id=match_id, game_state=game_state)
+            finally:
+                spent.append(perf_counter() - ask_start)
+
         def get_move(self, game_id: UUID, match_id: UUID, game_state: GameState) -> MoveData:
+            start = perf_counter()
             self._fen = game_state.board_state.fen
             self._your_time = game_state.your_time
             self._enemy_time = game_state.enemy_time
-            ret = super(_WrappedAI, self).get_move(game_id=game_id, match_id=match_id, game_state=game_state)
-            need_update(self)
+            watchdog = get_clock_watchdog()
+            search = watchdog.begin(client=self, budget=game_state.your_time / 1000, on_warning=self._on_clock_warning)
+            self._search = search
+            ai_start = perf_counter()
+            try:
+                # Waiting for a pondered search leaves at least half of a known clock for searching again
+                timeout = game_state.your_time / 2000 if game_state.your_time > 0 else None
+                ret = None if self._ponder is None else self._ponder.take(self._fen, timeout=timeout)
+                # Pondered and searched moves are cached once they passed the validation
+                store = ret is not None
+                if ret is None and self._cached_moves is not None:
+                    ret = self._cached_moves.get(self._fen)
+                if ret is None:
+                    ret = super(_WrappedAI, self).get_move(game_id=game_id, match_id=match_id,
+                                                           game_state=game_state)
+                    store = True
+                ai_end = perf_counter()
+                # Retries of the validation are watched like the search itself
+                asked_again: List[float] = []
+                if self._validation is not None:
+                    ret = self._validation.validate(self._fen, ret, ask=partial(
+                        self._ask_again, asked_again, game_id, match_id, game_state))
+            finally:
+                watchdog.end(search)
+                self._search = None
+            if store and self._cached_moves is not None and ret is not None:
+                self._cached_moves.put(self._fen, ret)
+            if self._ponder is not None and ret is not None:
+                self._ponder.start(fen=self._fen, move=ret, search=partial(self._ponder_search, game_id, match_id))
+            # The move is recorded before need_update so the update already shows it
+            self._move_timings.record_move(game_id=game_id, seconds=ai_end - ai_start + sum(asked_again))
+            if search is not None and search.warning > 0:
+                self._clock_warnings += 1
+            self._publish()
+            if search is not None and search.warning > 0:
+                need_update(self, clock_warning=0.0)
+            else:
+                need_update(self)
+            overhead = (ai_start - start) + (perf_counter() - ai_end) - sum(asked_again)
+            self._move_timings.record_overhead(game_id=game_id, seconds=overhead)
             return ret
 
     return _WrappedAI(base_init_values=init_values)
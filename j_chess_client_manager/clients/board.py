@@ -1,5 +1,77 @@
 from abc import ABC, abstractmethod
-from typing import List, Tuple, Dict, Optional
+from functools import lru_cache
+from typing import List, Tuple, Dict, Optional, NamedTuple
+
+from j_chess_client_manager.chess.position import Position
+
+_EMPTY_BOARD = tuple(tuple("" for _ in range(8)) for _ in range(8))
+_EMPTY_POSITION = Position.empty()
+
+
+class ParsedFen(NamedTuple):
+    board: Tuple[Tuple[str, ...], ...]
+    turn: int
+    white_turn: bool
+    castling: str
+    en_passant: Optional[str]
+    half_moves_since_pawn: int
+    position: Position
+
+
+def _parse_board(board: str) -> Tuple[Tuple[str, ...], ...]:
+    ret: List[List[str]] = [[]]
+    for c in board:
+        if c.isdigit():
+            ret[-1].extend("" for _ in range(int(c)))
+        elif c == "/":
+            ret.append([])
+        else:
+            ret[-1].append(c)
+    return tuple(tuple(x) for x in ret)
+
+
+@lru_cache(maxsize=1024)
+def parse_fen(fen: Optional[str]) -> ParsedFen:
+    """
+    Split a fen into its parts. Every distinct fen is only parsed once, parts that are missing or invalid get the
+    same defaults the accessors of BoardProvider always returned
+
+    Parameters
+    ----------
+    fen: Optional[str]
+        Fen to parse. None or an empty string for an empty board
+
+    Returns
+    -------
+    The parsed fen. The board is a tuple of ranks from rank 8 to rank 1. The position is empty if the board of the
+    fen is invalid
+    """
+    if fen is None or len(fen) <= 0:
+        return ParsedFen(board=_EMPTY_BOARD, turn=-1, white_turn=True, castling="", en_passant="",
+                         half_moves_since_pawn=-1, position=_EMPTY_POSITION)
+    parts = fen.split(" ")
+    try:
+        turn = int(parts[-1])
+    except ValueError:
+        turn = -1
+    try:
+        half_moves_since_pawn = int(parts[4])
+    except (ValueError, IndexError):
+        half_moves_since_pawn = -1
+    en_passant = parts[3] if len(parts) > 3 else ""
+    try:
+        position = Position.from_fen(fen)
+    except ValueError:
+        position = _EMPTY_POSITION
+    return ParsedFen(
+        board=_parse_board(parts[0]),
+        turn=turn,
+        white_turn=parts[1].lower() == "w" if len(parts) > 1 else True,
+        castling=parts[2] if len(parts) > 2 else "",
+        en_passant=None if en_passant == "-" else en_passant.strip(),
+        half_moves_since_pawn=half_moves_since_pawn,
+        position=position,
+    )
 
 
 class BoardProvider(ABC):
@@ -11,62 +83,33 @@ class BoardProvider(ABC):
 
     # rnbqkbnr/pp1ppppp/8/2p5/4P3/5N2/PPPP1PPP/RNBQKB1R b KQkq - 1 2
 
-    def board(self) -> List[List[str]]:
-        fen = self.fen
-        if fen is None or len(fen) <= 0:
-            return [["" for _ in range(8)] for _ in range(8)]
-        ret: List[List[str]] = [[]]
-        board = self.fen.split(" ")[0]
-        for c in board:
-            try:
-                n = int(c)
-                for _ in range(n):
-                    ret[-1].append("")
-            except ValueError:
-                if c == "/":
-                    ret.append([])
-                else:
-                    ret[-1].append(c)
-
-        return ret
+    def parsed_fen(self) -> "ParsedFen":
+        return parse_fen(self.fen)
+
+    def position(self) -> Position:
+        return self.parsed_fen().position
+
+    def board(self) -> Tuple[Tuple[str, ...], ...]:
+        return self.parsed_fen().board
 
     def turn(self) -> int:
-        try:
-            return int(self.fen.split(" ")[-1])
-        except (ValueError, AttributeError, KeyError):
-            return -1
+        return self.parsed_fen().turn
 
     def white_turn(self) -> bool:
-        try:
-            return self.fen.split(" ")[1].lower() == "w"
-        except (ValueError, AttributeError, KeyError):
-            return True
+        return self.parsed_fen().white_turn
 
     def castling(self) -> Dict[str, Dict[str, bool]]:
-        try:
-            castling = self.fen.split(" ")[2]
-            return {
-                "w": {"k": "K" in castling, "q": "Q" in castling},
-                "b": {"k": "k" in castling, "q": "q" in castling}
-            }
-        except (ValueError, AttributeError, KeyError):
-            return {
-                "w": {"k": False, "q": False},
-                "b": {"k": False, "q": False}
-            }
+        castling = self.parsed_fen().castling
+        return {
+            "w": {"k": "K" in castling, "q": "Q" in castling},
+            "b": {"k": "k" in castling, "q": "q" in castling}
+        }
 
     def en_passant(self) -> Optional[str]:
-        try:
-            en_passant = self.fen.split(" ")[3]
-            return None if en_passant == "-" else en_passant.strip()
-        except (ValueError, AttributeError, KeyError):
-            return ""
+        return self.parsed_fen().en_passant
 
     def half_moves_since_pawn(self) -> int:
-        try:
-            return int(self.fen.split(" ")[4])
-        except (ValueError, AttributeError, KeyError):
-            return -1
+        return self.parsed_fen().half_moves_since_pawn
 
     @property
     @abstractmethod
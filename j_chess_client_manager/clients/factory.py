@@ -0,0 +1,63 @@
+from multiprocessing import Process
+from typing import Type, Any, Dict, Optional, Tuple, Union, Callable
+
+from j_chess_lib.ai import AI
+from j_chess_lib.client import Client
+from j_chess_lib.communication import Connection
+
+from . import SuperProvider
+from .ai_wrapper import wrap_ai
+from j_chess_client_manager.logging import SYSTEM_LOGGER
+
+
+THREAD_BACKEND = "thread"
+PROCESS_BACKEND = "process"
+BACKENDS = (THREAD_BACKEND, PROCESS_BACKEND)
+
+
+def start_client(
+    ai_class: Type[AI], ai_parameters: Dict[str, Any], connection_parameters: Dict[str, Any],
+    tournament_code: Optional[str] = None, need_update: Callable[[Union[AI, SuperProvider]], None] = None,
+    backend: str = THREAD_BACKEND
+) -> Tuple[Union[Client, Process], Union[AI, SuperProvider]]:
+    """
+    Connect to a server, wrap the given AI and start a client playing with it
+
+    Parameters
+    ----------
+    ai_class: Type[AI]
+        AI implementation that should be wrapped
+    ai_parameters: Dict[str, Any]
+        Parameters used to initialize the AI
+    connection_parameters: Dict[str, Any]
+        Parameters passed to the connection
+    tournament_code: Optional[str]
+        Code of the tournament the client should join. None for quick play
+    need_update: Callable[[Union[AI, SuperProvider]], None]
+        Called whenever the state of the wrapped AI changed
+    backend: str
+        "thread" to play in a thread of this process. "process" to play in a worker process so cpu heavy AIs do not
+        share one interpreter. The AI is then represented by a provider mirroring its state
+
+    Returns
+    -------
+    The started client (or worker process) and the wrapped AI (or its provider) it is playing with
+    """
+    if backend == PROCESS_BACKEND:
+        from .process import get_process_backend
+        return get_process_backend().start_client(ai_class=ai_class, ai_parameters=ai_parameters,
+                                                  connection_parameters=connection_parameters,
+                                                  tournament_code=tournament_code, need_update=need_update)
+    if backend != THREAD_BACKEND:
+        raise ValueError(f"Unknown backend \"{backend}\". Use one of {', '.join(BACKENDS)}")
+
+    connection = Connection(**connection_parameters)
+
+    ai = wrap_ai(ai_class, init_values=ai_parameters, need_update=need_update, tournament_code=tournament_code)
+    SYSTEM_LOGGER.info(f"Created connection {connection}; Created AI {ai}")
+    client = Client(connection=connection, ai=ai, tournament_code=tournament_code)
+    client.start()
+    SYSTEM_LOGGER.info(
+        f"Started client {client}{'' if tournament_code is None else f' for tournament {tournament_code}'}"
+    )
+    return client, ai
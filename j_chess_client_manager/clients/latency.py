@@ -0,0 +1,167 @@
+"""Fixed size histograms for the time AIs and the manager spend per move."""
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple, NamedTuple, Any
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.0f}us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds:.2f}s"
+
+
+class LatencyHistogram:
+    """
+    Histogram with logarithmic buckets between min_value and max_value seconds. Its size does not depend on the number
+    of recorded values, percentiles are accurate to the width of one bucket
+    """
+
+    __slots__ = ("_min_value", "_log_min", "_log_factor", "_buckets", "_count", "_total", "_max")
+
+    def __init__(self, min_value: float = 1e-6, max_value: float = 1e3, buckets_per_decade: int = 20):
+        self._min_value = min_value
+        self._log_min = math.log10(min_value)
+        self._log_factor = buckets_per_decade
+        self._buckets = [0] * (int(math.ceil((math.log10(max_value) - self._log_min) * buckets_per_decade)) + 1)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def total(self) -> float:
+        return self._total
+
+    @property
+    def max(self) -> float:
+        return self._max
+
+    @property
+    def mean(self) -> float:
+        return self._total / self._count if self._count > 0 else 0.0
+
+    def record(self, seconds: float):
+        if seconds <= self._min_value:
+            i = 0
+        else:
+            i = min(int((math.log10(seconds) - self._log_min) * self._log_factor) + 1, len(self._buckets) - 1)
+        self._buckets[i] += 1
+        self._count += 1
+        self._total += seconds
+        if seconds > self._max:
+            self._max = seconds
+
+    def percentile(self, q: float) -> float:
+        """
+        Upper bound of the bucket containing the q-th percentile (0 < q <= 100)
+        """
+        if self._count <= 0:
+            return 0.0
+        rank = q / 100 * self._count
+        seen = 0
+        # The last bucket also holds all values above max_value so its only known bound is the maximum
+        for i, n in enumerate(self._buckets[:-1]):
+            seen += n
+            if seen >= rank and n > 0:
+                return min(10 ** (self._log_min + i / self._log_factor), self._max)
+        return self._max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self._count, "sum": self._total, "mean": self.mean, "p50": self.percentile(50),
+            "p90": self.percentile(90), "p99": self.percentile(99), "max": self._max,
+        }
+
+    def describe(self) -> str:
+        if self._count <= 0:
+            return "---"
+        return f"p50 {format_duration(self.percentile(50))}; p90 {format_duration(self.percentile(90))}; " \
+               f"p99 {format_duration(self.percentile(99))}; max {format_duration(self._max)}; n {self._count}"
+
+
+class GameTiming(NamedTuple):
+    moves: int
+    total: float
+    max: float
+    overhead: float
+
+
+class MoveTimings:
+    """
+    Time used by an AI for its moves and by the wrapper around it, overall and per game. Only the newest max_games
+    games are kept
+    """
+
+    def __init__(self, max_games: int = 100):
+        self._lock = threading.Lock()
+        self._moves = LatencyHistogram()
+        self._overhead = LatencyHistogram()
+        self._games: "OrderedDict[Any, GameTiming]" = OrderedDict()
+        self._max_games = max_games
+        self._current_game: Any = None
+
+    def _update_game(self, game_id: Any, seconds: float = 0.0, overhead: float = 0.0, moves: int = 0):
+        game = self._games.pop(game_id, None)
+        if game is None:
+            game = GameTiming(moves=0, total=0.0, max=0.0, overhead=0.0)
+        self._games[game_id] = GameTiming(moves=game.moves + moves, total=game.total + seconds,
+                                          max=max(game.max, seconds), overhead=game.overhead + overhead)
+        while len(self._games) > self._max_games:
+            self._games.popitem(last=False)
+
+    def record_move(self, game_id: Any, seconds: float):
+        """
+        Record the time the AI took for a move in the given game
+        """
+        with self._lock:
+            self._moves.record(seconds)
+            self._update_game(game_id=game_id, seconds=seconds, moves=1)
+            self._current_game = game_id
+
+    def record_overhead(self, game_id: Any, seconds: float):
+        """
+        Record the time the wrapper took around a move in the given game
+        """
+        with self._lock:
+            self._overhead.record(seconds)
+            self._update_game(game_id=game_id, overhead=seconds)
+
+    def moves(self) -> Dict[str, float]:
+        with self._lock:
+            return self._moves.summary()
+
+    def overhead(self) -> Dict[str, float]:
+        with self._lock:
+            return self._overhead.summary()
+
+    def games(self) -> Dict[Any, GameTiming]:
+        """
+        Timings of the newest games ordered from old to new
+        """
+        with self._lock:
+            return dict(self._games)
+
+    def game(self, game_id: Any = None) -> Optional[GameTiming]:
+        """
+        Timing of one game. The game of the last move if game_id is None
+        """
+        with self._lock:
+            return self._games.get(self._current_game if game_id is None else game_id, None)
+
+    def metrics(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            game = self._games.get(self._current_game, None)
+            ret = [
+                ("Move time", self._moves.describe()),
+                ("Wrapper overhead", self._overhead.describe()),
+            ]
+        if game is not None:
+            ret.append(("Game move time", f"total {format_duration(game.total)}; max {format_duration(game.max)}; "
+                                          f"overhead {format_duration(game.overhead)}; moves {game.moves}"))
+        return ret
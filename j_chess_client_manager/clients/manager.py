@@ -0,0 +1,89 @@
+"""Clients of the manager, kept apart from the UI so they survive the UI being rebuilt."""
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from . import SuperProvider
+
+
+class ClientManager:
+    """
+    All clients shown by the UI and the state of the UI that has to outlive its frames. The frames are recreated
+    whenever the terminal is resized, this object lives as long as the manager runs
+    """
+
+    def __init__(self, clients: Sequence[SuperProvider] = tuple()):
+        self._lock = threading.Lock()
+        self._clients: Tuple[SuperProvider, ...] = tuple(clients)
+        self._listeners: List[Callable[[SuperProvider], None]] = []
+        self._version = 0
+        self._selected: Optional[SuperProvider] = None
+        self._widget_state: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def clients(self) -> Tuple[SuperProvider, ...]:
+        """
+        All clients in the order they were added
+        """
+        return self._clients
+
+    @property
+    def version(self) -> int:
+        """
+        Changes whenever clients were added, so views only have to be rebuilt when it differs from the shown one
+        """
+        return self._version
+
+    def __len__(self):
+        return len(self._clients)
+
+    def add_listener(self, listener: Callable[[SuperProvider], None], replay: bool = True):
+        """
+        Call the listener with every added client
+
+        Parameters
+        ----------
+        listener: Callable[[SuperProvider], None]
+            Called with every added client
+        replay: bool
+            Whether the listener is also called with the clients that were added before
+        """
+        with self._lock:
+            # Replaced instead of changed so add can iterate without holding the lock
+            self._listeners = self._listeners + [listener]
+            clients = self._clients
+        if replay:
+            for client in clients:
+                listener(client)
+
+    def add(self, client: SuperProvider):
+        with self._lock:
+            self._clients = self._clients + (client,)
+            self._version += 1
+            listeners = self._listeners
+        for listener in listeners:
+            listener(client)
+
+    @property
+    def selected(self) -> Optional[SuperProvider]:
+        """
+        Client picked in the client list
+        """
+        return self._selected
+
+    @selected.setter
+    def selected(self, value: Optional[SuperProvider]):
+        self._selected = value
+
+    def remember(self, view: str, **state):
+        """
+        Keep values of the widgets of a view so a rebuilt view starts where the old one was
+        """
+        with self._lock:
+            self._widget_state[view] = {**self._widget_state.get(view, {}), **state}
+
+    def recall(self, view: str) -> Dict[str, Any]:
+        """
+        Values of the widgets of a view that were remembered, empty if there are none
+        """
+        with self._lock:
+            return dict(self._widget_state.get(view, {}))
@@ -0,0 +1,215 @@
+"""Remember the moves AIs chose so repeated positions are answered without searching again."""
+import atexit
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from j_chess_lib.communication import MoveData
+
+from j_chess_client_manager.logging import SYSTEM_LOGGER
+
+_FILE_VERSION = 1
+
+_Move = Tuple[str, str, Optional[str]]
+
+
+def position_key(fen: str) -> str:
+    """
+    Fen without the half move clock and the move number. Positions that only differ in these get the same move
+    """
+    return " ".join(fen.split(" ")[:4])
+
+
+def cache_namespace(ai_class: type, init_values: Dict[str, Any]) -> str:
+    """
+    Namespace shared by all AIs of the same class with the same parameters apart from their name
+    """
+    parameters = ", ".join(f"{k}={v!r}" for k, v in sorted(init_values.items()) if k != "name")
+    return f"{ai_class.__module__}:{ai_class.__qualname__}({parameters})"
+
+
+class MoveCacheView:
+    """
+    The part of the cache one AI reads and writes, with the hits and misses of that AI
+    """
+
+    __slots__ = ("_cache", "_namespace", "hits", "misses")
+
+    def __init__(self, cache: "MoveCache", namespace: str):
+        self._cache = cache
+        self._namespace = namespace
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def namespace(self) -> str:
+        return self._namespace
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def get(self, fen: str) -> Optional[MoveData]:
+        ret = self._cache.get(self._namespace, fen)
+        if ret is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return ret
+
+    def put(self, fen: str, move: MoveData):
+        self._cache.put(self._namespace, fen, move)
+
+    def metrics(self):
+        return [("Move cache", f"hits {self.hits}; misses {self.misses}; hit rate {self.hit_rate:.0%}")]
+
+
+class MoveCache:
+    """
+    Moves chosen by AIs per namespace and position. The least recently used moves are dropped once max_entries
+    moves are stored. With a path the cache is read on configuration and written back at exit
+    """
+
+    def __init__(self, enabled: bool = False, max_entries: int = 100000, path: Optional[str] = None):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], _Move]" = OrderedDict()
+        self._enabled = False
+        self._max_entries = max_entries
+        self._path: Optional[str] = None
+        self._save_registered = False
+        self._forward: Optional[Callable[[str, str, _Move], None]] = None
+        self.configure(enabled=enabled, max_entries=max_entries, path=path)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._path
+
+    def configure(self, enabled: bool, max_entries: int = 100000, path: Optional[str] = None):
+        """
+        Parameters
+        ----------
+        enabled: bool
+            Whether new AIs use the cache
+        max_entries: int
+            Maximum number of stored moves of all namespaces together
+        path: Optional[str]
+            Json file the cache is loaded from and saved to at exit. None to keep it in memory
+        """
+        if max_entries < 1:
+            raise ValueError(f"The move cache needs room for at least one move not {max_entries}")
+        with self._lock:
+            self._enabled = enabled
+            self._max_entries = max_entries
+            self._trim()
+        if path is not None and path != self._path:
+            self._path = path
+            self.load()
+            if not self._save_registered:
+                atexit.register(self.save)
+                self._save_registered = True
+
+    def settings(self) -> Tuple[bool, int]:
+        return self._enabled, self._max_entries
+
+    def view(self, namespace: str) -> MoveCacheView:
+        return MoveCacheView(self, namespace)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _trim(self):
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, namespace: str, fen: str) -> Optional[MoveData]:
+        key = (namespace, position_key(fen))
+        with self._lock:
+            move = self._entries.get(key, None)
+            if move is None:
+                return None
+            self._entries.move_to_end(key)
+        return MoveData(from_value=move[0], to=move[1], promotion_unit=move[2])
+
+    def put(self, namespace: str, fen: str, move: MoveData):
+        key = (namespace, position_key(fen))
+        value = (move.from_value, move.to, move.promotion_unit)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._trim()
+            forward = self._forward
+        if forward is not None:
+            forward(namespace, key[1], value)
+
+    def moves(self, namespace: str) -> List[Tuple[str, _Move]]:
+        """
+        Moves of one namespace by position key, least recently used first
+        """
+        with self._lock:
+            return [(key, move) for (x, key), move in self._entries.items() if x == namespace]
+
+    def add_moves(self, namespace: str, moves: Iterable[Tuple[str, _Move]]):
+        """
+        Store moves of one namespace as returned by moves, e.g. the ones another process learned
+        """
+        with self._lock:
+            for key, move in moves:
+                self._entries[(namespace, key)] = tuple(move)
+                self._entries.move_to_end((namespace, key))
+            self._trim()
+
+    def forward(self, callback: Optional[Callable[[str, str, _Move], None]]):
+        """
+        Pass every stored move on to callback with its namespace and position key, None to stop
+        """
+        with self._lock:
+            self._forward = callback
+
+    def load(self):
+        if self._path is None or not os.path.exists(self._path):
+            return
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version", None) != _FILE_VERSION:
+                raise ValueError(f"Unknown version {data.get('version', None)}")
+            entries = [((str(x[0]), str(x[1])), (str(x[2]), str(x[3]), x[4])) for x in data["entries"]]
+        except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+            SYSTEM_LOGGER.error(f"Could not load the move cache \"{self._path}\": {e}")
+            return
+        with self._lock:
+            # Loaded moves count as older than the ones already in memory
+            current, self._entries = self._entries, OrderedDict(entries)
+            self._entries.update(current)
+            self._trim()
+        SYSTEM_LOGGER.info(f"Loaded {len(entries)} moves from the move cache \"{self._path}\"")
+
+    def save(self):
+        if self._path is None:
+            return
+        with self._lock:
+            entries = [[namespace, key, *move] for (namespace, key), move in self._entries.items()]
+        temporary = f"{self._path}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump({"version": _FILE_VERSION, "entries": entries}, f)
+            os.replace(temporary, self._path)
+        except OSError as e:
+            SYSTEM_LOGGER.error(f"Could not save the move cache \"{self._path}\": {e}")
+
+
+_MOVE_CACHE: Optional[MoveCache] = None
+
+
+def get_move_cache() -> MoveCache:
+    global _MOVE_CACHE
+    if _MOVE_CACHE is None:
+        _MOVE_CACHE = MoveCache()
+    return _MOVE_CACHE
@@ -0,0 +1,63 @@
+"""Let other parts of the manager react to finished games of any client."""
+import threading
+import time
+from typing import NamedTuple, Optional, Callable, List
+
+from j_chess_client_manager.logging import SYSTEM_LOGGER
+
+WIN = "win"
+LOSS = "loss"
+DRAW = "draw"
+
+
+class GameResult(NamedTuple):
+    game_id: str
+    match_id: str
+    client: str
+    opponent: Optional[str]
+    tournament_code: Optional[str]
+    white: bool
+    winner: Optional[str]
+    pgn: str
+    finished: float
+
+    @property
+    def result(self) -> str:
+        if self.winner is None:
+            return DRAW
+        return WIN if self.winner == self.client else LOSS
+
+    @classmethod
+    def create(cls, game_id, match_id, client: str, opponent: Optional[str], tournament_code: Optional[str],
+               white: bool, winner: Optional[str], pgn: str) -> "GameResult":
+        return cls(game_id=str(game_id), match_id=str(match_id), client=client, opponent=opponent,
+                   tournament_code=tournament_code, white=white, winner=winner, pgn=pgn or "", finished=time.time())
+
+
+_GAME_OBSERVERS: List[Callable[[GameResult], None]] = []
+_LOCK = threading.Lock()
+
+
+def add_game_observer(observer: Callable[[GameResult], None]):
+    """
+    Call the observer with the result of every game finished by any client, including clients in worker processes.
+    Observers are called in the thread of the client and should return quickly
+    """
+    with _LOCK:
+        _GAME_OBSERVERS.append(observer)
+
+
+def remove_game_observer(observer: Callable[[GameResult], None]):
+    with _LOCK:
+        if observer in _GAME_OBSERVERS:
+            _GAME_OBSERVERS.remove(observer)
+
+
+def game_finished(result: GameResult):
+    with _LOCK:
+        observers = list(_GAME_OBSERVERS)
+    for observer in observers:
+        try:
+            observer(result)
+        except Exception as e:
+            SYSTEM_LOGGER.error(f"Game observer {observer} failed: {type(e).__name__}: {e}")
@@ -0,0 +1,90 @@
+"""Convert raw values like the text of input fields or command line arguments to the parameters of a callable."""
+# noinspection PyUnresolvedReferences
+from inspect import Parameter, _empty, isclass, signature
+from typing import Callable, Any, Tuple, Optional, Dict
+
+
+def get_converter_by_parameter(
+    parameter: Parameter, none_const: str = "<<None>>"
+) -> Tuple[Optional[str], Callable[[Any], Any]]:
+    annotation: Any = parameter.annotation
+
+    def annotation_convert(val: str):
+        if val == none_const:
+            return None
+        return val
+
+    if annotation is _empty:
+        annotation = None
+    else:
+        if isclass(annotation):
+            annotation_class = annotation
+
+            def annotation_convert(val):
+                if val == none_const:
+                    return None
+                # noinspection PyCallingNonCallable
+                return annotation_class(val)
+
+            annotation = annotation.__name__
+        else:
+            annotation = str(annotation)
+
+    return annotation, annotation_convert
+
+
+def convert_parameters(
+    target: Callable, values: Dict[str, Any], none_const: str = "<<None>>"
+) -> Dict[str, Any]:
+    """
+    Convert raw values to the parameters of a callable like the widgets of the UI would do
+
+    Parameters
+    ----------
+    target: Callable
+        Callable whose signature is used to find the converters
+    values: Dict[str, Any]
+        Raw values by parameter name. Values that are not strings are passed on as they are
+    none_const: str
+        Value that is converted to None
+
+    Returns
+    -------
+    Converted values by parameter name
+    """
+    parameters = signature(target).parameters
+    ret = {}
+    for name, value in values.items():
+        if name not in parameters:
+            raise ValueError(f"{getattr(target, '__name__', target)} has no parameter \"{name}\"")
+        if not isinstance(value, str):
+            ret[name] = value
+            continue
+        annotation, convert = get_converter_by_parameter(parameter=parameters[name], none_const=none_const)
+        try:
+            ret[name] = convert(value)
+        except Exception as e:
+            raise ValueError(f"Could not convert \"{value}\" to {annotation} for parameter \"{name}\"") from e
+    return ret
+
+
+def check_parameters(target: Callable, values: Dict[str, Any]):
+    """
+    Check that a callable can be called with the given parameters, e.g. that no required parameter is missing
+
+    Parameters
+    ----------
+    target: Callable
+        Callable whose signature the values have to match
+    values: Dict[str, Any]
+        Converted values by parameter name
+
+    Raises
+    ------
+    ValueError
+        If a required parameter is missing or a parameter is unknown
+    """
+    try:
+        signature(target).bind(**values)
+    except TypeError as e:
+        raise ValueError(f"{getattr(target, '__name__', target)}: {e}") from e
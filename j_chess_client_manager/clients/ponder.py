@@ -0,0 +1,244 @@
+"""Search likely positions on the time of the opponent so the next get_move can be answered from that work."""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, CancelledError, TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Optional, Tuple
+
+from j_chess_lib.ai.board import BoardState
+from j_chess_lib.ai.board.utilities import get_possible_moves, is_promotion
+from j_chess_lib.communication import MoveData
+
+from j_chess_client_manager.chess import Position, IllegalMove, apply_move
+from j_chess_client_manager.chess.position import PIECE_VALUES
+from .latency import format_duration
+from j_chess_client_manager.logging import SYSTEM_LOGGER
+
+# Capturing the king ends the game so it is the most likely reply
+_CAPTURE_VALUES = {**PIECE_VALUES, "K": 100}
+
+
+def _ponder_key(fen: str) -> str:
+    # Only the board and the side to move, servers differ in how they fill castling and en passant
+    return " ".join(fen.split(" ")[:2])
+
+
+def likely_replies(fen: str, limit: int) -> List[MoveData]:
+    """
+    Moves of the side to move, captures of valuable pieces first
+
+    Parameters
+    ----------
+    fen: str
+        Position the opponent has to move in
+    limit: int
+        Maximum number of moves
+
+    Returns
+    -------
+    At most limit moves
+    """
+    board = BoardState(fen=fen).get_board()
+    white = BoardState(fen=fen).white_turn()
+    moves = sorted(get_possible_moves(board_state=board, white=white),
+                   key=lambda x: (-_CAPTURE_VALUES.get((board.get(x[1], None) or " ").upper(), -1), x))
+    ret = []
+    for origin, target in moves[:limit]:
+        promotion = None
+        if is_promotion(board_state=board, move=(origin, target)):
+            promotion = "Q" if white else "q"
+        ret.append(MoveData(from_value=f"{origin[0]}{origin[1]}", to=f"{target[0]}{target[1]}",
+                            promotion_unit=promotion))
+    return ret
+
+
+class _PonderTask:
+
+    __slots__ = ("future", "cpu")
+
+    def __init__(self):
+        self.future: Optional[Future] = None
+        self.cpu = 0.0
+
+
+class Ponderer:
+    """
+    Thread pool shared by all pondering AIs of a process. The number of workers bounds the cpu pondering can take
+    away, every worker process of the process backend has a pool of its own
+    """
+
+    def __init__(self, enabled: bool = False, workers: int = 2, replies: int = 4):
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._enabled = False
+        self._workers = workers
+        self._replies = replies
+        self.configure(enabled=enabled, workers=workers, replies=replies)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def replies(self) -> int:
+        return self._replies
+
+    def configure(self, enabled: bool, workers: int = 2, replies: int = 4):
+        """
+        Parameters
+        ----------
+        enabled: bool
+            Whether new AIs ponder
+        workers: int
+            Number of threads searching for all AIs of this process together
+        replies: int
+            Number of likely replies of the opponent searched after every move
+        """
+        if workers < 1 or replies < 1:
+            raise ValueError("Pondering needs at least one worker and one reply")
+        with self._lock:
+            if self._executor is not None and workers != self._workers:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self._enabled = enabled
+            self._workers = workers
+            self._replies = replies
+
+    def settings(self) -> Tuple[bool, int, int]:
+        return self._enabled, self._workers, self._replies
+
+    def submit(self, function: Callable, *args) -> Future:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="Ponder")
+            return self._executor.submit(function, *args)
+
+
+class PonderState:
+    """
+    Pondering of one AI. After the AI moved, the positions after the likely replies are searched in the pool of the
+    Ponderer. A search whose position comes up is used for the next move, the cpu time of all others is wasted
+    """
+
+    def __init__(self, ponderer: Ponderer):
+        self._ponderer = ponderer
+        self._lock = threading.Lock()
+        self._tasks: Dict[str, _PonderTask] = {}
+        self.hits = 0
+        self.misses = 0
+        self._used_cpu = 0.0
+        self._wasted_cpu = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    @property
+    def used_cpu(self) -> float:
+        return self._used_cpu
+
+    @property
+    def wasted_cpu(self) -> float:
+        with self._lock:
+            return self._wasted_cpu
+
+    def start(self, fen: str, move: MoveData, search: Callable[[str, MoveData], MoveData]):
+        """
+        Start pondering after the AI played a move
+
+        Parameters
+        ----------
+        fen: str
+            Position the AI moved in
+        move: MoveData
+            Move the AI played
+        search: Callable[[str, MoveData], MoveData]
+            Searches the move of the AI in a position reached by the given move of the opponent
+        """
+        self.discard()
+        try:
+            after, _ = apply_move(Position.from_fen(fen), move)
+            replies = likely_replies(after.fen(), limit=self._ponderer.replies)
+        except (IllegalMove, ValueError, KeyError) as e:
+            SYSTEM_LOGGER.debug(f"Not pondering after {move}: {e}")
+            return
+        tasks = {}
+        for reply in replies:
+            try:
+                position = apply_move(after, reply)[0].fen()
+            except IllegalMove:
+                continue
+            task = _PonderTask()
+            try:
+                task.future = self._ponderer.submit(self._run, task, search, position, reply)
+            except RuntimeError:
+                # The pool does not take new work while the interpreter shuts down
+                break
+            tasks[_ponder_key(position)] = task
+        with self._lock:
+            self._tasks = tasks
+
+    @staticmethod
+    def _run(task: _PonderTask, search: Callable[[str, MoveData], MoveData], fen: str, reply: MoveData) -> MoveData:
+        start = time.thread_time()
+        try:
+            return search(fen, reply)
+        finally:
+            task.cpu = time.thread_time() - start
+
+    def take(self, fen: str, timeout: Optional[float] = None) -> Optional[MoveData]:
+        """
+        Move for the position if it was pondered. Waits for a running search of that position at most timeout
+        seconds, a search that takes longer is a miss and left to finish in the pool. All other searches are discarded
+        """
+        with self._lock:
+            if len(self._tasks) <= 0:
+                return None
+            task = self._tasks.pop(_ponder_key(fen), None)
+        self.discard()
+        if task is None or task.future.cancel():
+            self.misses += 1
+            return None
+        try:
+            ret = task.future.result(timeout=timeout)
+        except FutureTimeout:
+            SYSTEM_LOGGER.debug(f"Pondered search did not finish within {format_duration(timeout)}")
+            task.future.add_done_callback(lambda _: self._waste(task))
+            ret = None
+        except (CancelledError, Exception) as e:
+            SYSTEM_LOGGER.debug(f"Pondering failed: {type(e).__name__}: {e}")
+            ret = None
+        if ret is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used_cpu += task.cpu
+        return ret
+
+    def discard(self):
+        """
+        Stop using all pondered searches. Searches that did not start yet are cancelled
+        """
+        with self._lock:
+            tasks, self._tasks = self._tasks, {}
+        for task in tasks.values():
+            if not task.future.cancel():
+                task.future.add_done_callback(lambda _, t=task: self._waste(t))
+
+    def _waste(self, task: _PonderTask):
+        with self._lock:
+            self._wasted_cpu += task.cpu
+
+    def metrics(self):
+        return [("Ponder", f"hits {self.hits}; misses {self.misses}; hit rate {self.hit_rate:.0%}; used cpu "
+                           f"{format_duration(self._used_cpu)}; wasted cpu {format_duration(self.wasted_cpu)}")]
+
+
+_PONDERER: Optional[Ponderer] = None
+
+
+def get_ponderer() -> Ponderer:
+    global _PONDERER
+    if _PONDERER is None:
+        _PONDERER = Ponderer()
+    return _PONDERER
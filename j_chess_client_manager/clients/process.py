@@ -0,0 +1,249 @@
+"""Run wrapped AIs in worker processes and mirror their state in the manager process."""
+import logging
+import multiprocessing
+import threading
+from logging import LogRecord
+from logging.handlers import QueueHandler
+from typing import Type, Any, Dict, Optional, Tuple, List, Callable
+
+from j_chess_lib.ai import AI
+
+from . import SuperProvider, ClientTypes
+from .snapshot import ClientSnapshot
+from .observers import add_game_observer, game_finished
+from .watchdog import get_clock_watchdog
+from .move_cache import get_move_cache, cache_namespace
+from .ponder import get_ponderer
+from .ratings import get_rating_engine
+from .validation import get_move_validator
+from j_chess_client_manager.logging import SYSTEM_LOGGER, dispatch_record, redirect_logs
+
+# Messages sent from the workers are plain tuples starting with their kind
+_STATE = 0
+_LOG = 1
+_EXIT = 2
+_GAME = 3
+_MOVE = 4
+
+_RECORD_ATTRIBUTES = (
+    "name", "levelno", "levelname", "msg", "created", "msecs", "relativeCreated", "thread", "threadName", "process",
+    "processName", "module", "funcName", "lineno", "pathname", "filename", "message",
+)
+
+
+class _PipeLogHandler(QueueHandler):
+
+    def enqueue(self, record: LogRecord) -> None:
+        # Records can carry arbitrary extras (e.g. the AI itself) that can not be sent to the manager
+        clean = logging.makeLogRecord({x: getattr(record, x, None) for x in _RECORD_ATTRIBUTES})
+        self.queue.put((_LOG, getattr(record, "code", "???"), clean))
+
+
+def _run_worker(
+    index: int, pipe, ai_class: Type[AI], ai_parameters: Dict[str, Any], connection_parameters: Dict[str, Any],
+    tournament_code: Optional[str], watchdog_settings: Tuple[Tuple[float, ...], Optional[float]],
+    move_cache_settings: Tuple[bool, int], cached_moves: List[Tuple[str, Tuple[str, str, Optional[str]]]],
+    ponder_settings: Tuple[bool, int, int], validation_settings: Tuple[bool, str, int]
+):
+    redirect_logs(_PipeLogHandler(pipe))
+    from .factory import start_client
+    get_clock_watchdog().configure(*watchdog_settings)
+    # The manager process owns the file of the move cache. Workers start with its moves of their AI and send back the
+    # moves they learn
+    move_cache = get_move_cache()
+    move_cache.configure(*move_cache_settings)
+    if move_cache.enabled:
+        move_cache.add_moves(cache_namespace(ai_class, ai_parameters), cached_moves)
+        move_cache.forward(lambda namespace, key, move: pipe.put((_MOVE, index, namespace, key, move)))
+    get_ponderer().configure(*ponder_settings)
+    get_move_validator().configure(*validation_settings)
+    # Finished games are passed on to the observers of the manager process
+    add_game_observer(lambda result: pipe.put((_GAME, index, result)))
+
+    def need_update(ai: SuperProvider, **kwargs):
+        pipe.put((
+            _STATE, index, ai.fen, ai.white_name, ai.black_name, ai.white_time, ai.black_time,
+            tuple((str(k), str(v)) for k, v in ai.metrics()), ai.clock_warning, ai.snapshot,
+        ))
+
+    error = None
+    try:
+        client, ai = start_client(ai_class=ai_class, ai_parameters=ai_parameters,
+                                  connection_parameters=connection_parameters, tournament_code=tournament_code,
+                                  need_update=need_update)
+        need_update(ai)
+        client.join()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        pipe.put((_EXIT, index, error))
+
+
+class RemoteProvider(SuperProvider):
+    """
+    State of an AI playing in a worker process. Updated by the ProcessBackend whenever the worker reports changes.
+    """
+
+    def __init__(self, name: str, tournament_code: Optional[str]):
+        self._name = name
+        self._tournament_code = tournament_code
+        self._fen: Optional[str] = None
+        self._white_name = "---"
+        self._black_name = "---"
+        self._white_time = -1
+        self._black_time = -1
+        self._metrics: List[Tuple[str, str]] = []
+        self._clock_warning = 0.0
+        self._snapshot: Optional[ClientSnapshot] = None
+        self._running = True
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def tournament_code(self) -> Optional[str]:
+        return self._tournament_code
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def get_client_type(self) -> ClientTypes:
+        return ClientTypes.AI
+
+    @property
+    def fen(self) -> Optional[str]:
+        return self._fen
+
+    @property
+    def white_name(self):
+        return self._white_name
+
+    @property
+    def black_name(self):
+        return self._black_name
+
+    @property
+    def white_time(self):
+        return self._white_time
+
+    @property
+    def black_time(self):
+        return self._black_time
+
+    @property
+    def clock_warning(self) -> float:
+        return self._clock_warning
+
+    @property
+    def snapshot(self) -> Optional[ClientSnapshot]:
+        return self._snapshot
+
+    def metrics(self) -> List[Tuple[str, Any]]:
+        # Games of workers are rated in the manager process, so the ratings are not part of the metrics of the worker
+        ratings = get_rating_engine()
+        opponent = self._black_name if self._white_name == self._name else self._white_name
+        rating_metrics = ratings.metrics(self._name, None if opponent == "---" else opponent) if ratings.enabled \
+            else []
+        return list(self._metrics) + rating_metrics + [("Process", "running" if self._running else "stopped")]
+
+    def _update(self, fen: Optional[str], white_name: str, black_name: str, white_time: int, black_time: int,
+                metrics: Tuple[Tuple[str, str], ...], clock_warning: float, snapshot: Optional[ClientSnapshot]):
+        self._fen = fen
+        self._white_name = white_name
+        self._black_name = black_name
+        self._white_time = white_time
+        self._black_time = black_time
+        self._metrics = list(metrics)
+        self._clock_warning = clock_warning
+        self._snapshot = snapshot
+        for k, v in metrics:
+            if k == "name":
+                self._name = v
+                break
+
+    def _stop(self):
+        self._running = False
+
+
+class ProcessBackend:
+    """
+    Starts every client in its own worker process. All workers report their state and logs through one queue that
+    is drained by a thread in the manager process.
+    """
+
+    def __init__(self, start_method: str = "spawn"):
+        self._context = multiprocessing.get_context(start_method)
+        self._pipe = self._context.Queue()
+        self._lock = threading.Lock()
+        self._providers: Dict[int, Tuple[RemoteProvider, Callable[[SuperProvider], None]]] = {}
+        self._listener: Optional[threading.Thread] = None
+
+    def start_client(
+        self, ai_class: Type[AI], ai_parameters: Dict[str, Any], connection_parameters: Dict[str, Any],
+        tournament_code: Optional[str] = None, need_update: Callable[[SuperProvider], None] = None
+    ) -> Tuple[multiprocessing.Process, RemoteProvider]:
+        if need_update is None:
+            def need_update(*args, **kwargs):
+                pass
+
+        with self._lock:
+            index = len(self._providers)
+            provider = RemoteProvider(name=str(ai_parameters.get("name", None) or ai_class.__name__),
+                                      tournament_code=tournament_code)
+            self._providers[index] = (provider, need_update)
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, daemon=True, name="ProcessBackendListener")
+                self._listener.start()
+
+        move_cache = get_move_cache()
+        cached_moves = move_cache.moves(cache_namespace(ai_class, ai_parameters)) if move_cache.enabled else []
+        process = self._context.Process(
+            target=_run_worker, daemon=True, name=f"ClientProcess-{index}",
+            args=(index, self._pipe, ai_class, ai_parameters, connection_parameters, tournament_code,
+                  get_clock_watchdog().settings(), move_cache.settings(), cached_moves, get_ponderer().settings(),
+                  get_move_validator().settings()),
+        )
+        process.start()
+        SYSTEM_LOGGER.info(f"Started process {process.pid} for {ai_class.__name__}"
+                           f"{'' if tournament_code is None else f' for tournament {tournament_code}'}")
+        return process, provider
+
+    def _listen(self):
+        while True:
+            message = self._pipe.get()
+            kind = message[0]
+            if kind == _LOG:
+                dispatch_record(*message[1:])
+                continue
+            if kind == _GAME:
+                game_finished(message[2])
+                continue
+            if kind == _MOVE:
+                get_move_cache().add_moves(message[2], [(message[3], message[4])])
+                continue
+            provider, need_update = self._providers[message[1]]
+            if kind == _STATE:
+                clock_warning = provider.clock_warning
+                # noinspection PyProtectedMember
+                provider._update(*message[2:])
+                if provider.clock_warning != clock_warning:
+                    need_update(provider, clock_warning=provider.clock_warning)
+                    continue
+            elif kind == _EXIT:
+                # noinspection PyProtectedMember
+                provider._stop()
+                error = message[2]
+                SYSTEM_LOGGER.info(f"Process of {provider.name} stopped{'' if error is None else f': {error}'}")
+            need_update(provider)
+
+
+_PROCESS_BACKEND: Optional[ProcessBackend] = None
+
+
+def get_process_backend() -> ProcessBackend:
+    global _PROCESS_BACKEND
+    if _PROCESS_BACKEND is None:
+        _PROCESS_BACKEND = ProcessBackend()
+    return _PROCESS_BACKEND
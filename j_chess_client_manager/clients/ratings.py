@@ -0,0 +1,384 @@
+"""Rate every client and every opponent with Elo and Glicko-2 from the games they finished."""
+import atexit
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .observers import GameResult, add_game_observer
+from j_chess_client_manager.logging import SYSTEM_LOGGER
+
+_FILE_VERSION = 1
+
+# Glicko-2 works on its own scale, ratings are shown on the Glicko scale
+_SCALE = 173.7178
+_BASE_RATING = 1500.0
+_BASE_DEVIATION = 350.0
+_BASE_VOLATILITY = 0.06
+_MAX_PHI = _BASE_DEVIATION / _SCALE
+# Games whose ids are remembered to rate a game only once when both of its players are clients of the manager
+_SEEN_GAMES = 10000
+
+
+class Rating(NamedTuple):
+    name: str
+    elo: float
+    # Glicko-2 rating and deviation on the Glicko scale
+    rating: float
+    deviation: float
+    volatility: float
+    games: int
+
+    @property
+    def interval(self) -> Tuple[float, float]:
+        """
+        95% confidence interval of the Glicko-2 rating
+        """
+        return self.rating - 1.96 * self.deviation, self.rating + 1.96 * self.deviation
+
+    def expected_score(self, opponent: "Rating") -> float:
+        """
+        Expected points against the opponent by Glicko-2, including the uncertainty of both ratings
+        """
+        phi = math.hypot(self.deviation, opponent.deviation) / _SCALE
+        return _expected(_g(phi), (self.rating - opponent.rating) / _SCALE)
+
+
+def _g(phi: float) -> float:
+    return 1.0 / math.sqrt(1.0 + 3.0 * phi * phi / (math.pi * math.pi))
+
+
+def _expected(g: float, difference: float) -> float:
+    return 1.0 / (1.0 + math.exp(-g * difference))
+
+
+def _volatility(phi: float, sigma: float, delta: float, v: float, tau: float) -> float:
+    # Illinois algorithm of step 5 of the Glicko-2 paper
+    a = math.log(sigma * sigma)
+    phi2, delta2 = phi * phi, delta * delta
+
+    def f(x: float) -> float:
+        ex = math.exp(x)
+        return ex * (delta2 - phi2 - v - ex) / (2.0 * (phi2 + v + ex) ** 2) - (x - a) / (tau * tau)
+
+    low = a
+    if delta2 > phi2 + v:
+        high = math.log(delta2 - phi2 - v)
+    else:
+        k = 1
+        while f(a - k * tau) < 0:
+            k += 1
+        high = a - k * tau
+    f_low, f_high = f(low), f(high)
+    while abs(high - low) > 1e-6:
+        new = low + (low - high) * f_low / (f_high - f_low)
+        f_new = f(new)
+        if f_new * f_high <= 0:
+            low, f_low = high, f_high
+        else:
+            f_low /= 2.0
+        high, f_high = new, f_new
+    return math.exp(low / 2.0)
+
+
+class _Player:
+
+    __slots__ = ("elo", "mu", "phi", "sigma", "period", "games")
+
+    def __init__(self, elo: float = _BASE_RATING, mu: float = 0.0, phi: float = _MAX_PHI,
+                 sigma: float = _BASE_VOLATILITY, period: Optional[int] = None, games: int = 0):
+        self.elo = elo
+        self.mu = mu
+        self.phi = phi
+        self.sigma = sigma
+        # Last rating period phi was updated for, None if the player never played
+        self.period = period
+        self.games = games
+
+    def phi_before(self, period: int) -> float:
+        # Deviation at the start of the period, it grows for every period the player did not play in
+        if self.period is None:
+            return self.phi
+        missed = max(0, period - self.period - 1)
+        return min(_MAX_PHI, math.sqrt(self.phi * self.phi + missed * self.sigma * self.sigma))
+
+
+class RatingEngine:
+    """
+    Elo and Glicko-2 ratings of all players seen in finished games. Elo is updated after every game. Glicko-2 rates
+    the games of a rating period together: all games of the running period are kept and rated at once when the first
+    game of a later period arrives, until then ratings include the running period as if it ended now
+    """
+
+    def __init__(self, enabled: bool = False, path: Optional[str] = None, period: float = 3600.0, tau: float = 0.5,
+                 k_factor: float = 32.0):
+        self._lock = threading.Lock()
+        self._enabled = False
+        self._observing = False
+        self._save_registered = False
+        self._path: Optional[str] = None
+        self._period_length = period
+        self._tau = tau
+        self._k_factor = k_factor
+        self._players: Dict[str, _Player] = {}
+        self._period: Optional[int] = None
+        self._pending: Dict[str, List[Tuple[str, float]]] = {}
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self.configure(enabled=enabled, path=path, period=period, tau=tau, k_factor=k_factor)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def path(self) -> Optional[str]:
+        return self._path
+
+    def configure(self, enabled: bool, path: Optional[str] = None, period: float = 3600.0, tau: float = 0.5,
+                  k_factor: float = 32.0):
+        """
+        Parameters
+        ----------
+        enabled: bool
+            Whether finished games are rated
+        path: Optional[str]
+            Json file the ratings are loaded from and saved to at exit. None to keep them in memory
+        period: float
+            Length of a Glicko-2 rating period in seconds
+        tau: float
+            How much the volatility may change per period, between 0.3 and 1.2
+        k_factor: float
+            Largest change of an Elo rating per game
+        """
+        if period <= 0 or tau <= 0 or k_factor <= 0:
+            raise ValueError("The rating period, tau and the k factor have to be positive")
+        with self._lock:
+            self._enabled = enabled
+            self._period_length = period
+            self._tau = tau
+            self._k_factor = k_factor
+        if enabled and not self._observing:
+            add_game_observer(self.add_result)
+            self._observing = True
+        if path is not None and path != self._path:
+            self._path = path
+            self.load()
+            if not self._save_registered:
+                atexit.register(self.save)
+                self._save_registered = True
+
+    def settings(self) -> Tuple[bool, float, float, float]:
+        return self._enabled, self._period_length, self._tau, self._k_factor
+
+    def __len__(self):
+        return len(self._players)
+
+    def _player(self, name: str) -> _Player:
+        player = self._players.get(name, None)
+        if player is None:
+            player = _Player()
+            self._players[name] = player
+        return player
+
+    def add_result(self, result: GameResult):
+        """
+        Rate a finished game of a client. Can be used as game observer
+        """
+        if not self._enabled or result.opponent is None:
+            return
+        score = 0.5 if result.winner is None else float(result.winner == result.client)
+        self.add_game(game_id=result.game_id, player=result.client, opponent=result.opponent, score=score,
+                      finished=result.finished)
+
+    def add_game(self, game_id: Optional[str], player: str, opponent: str, score: float, finished: float):
+        """
+        Rate one game
+
+        Parameters
+        ----------
+        game_id: Optional[str]
+            Id of the game, a game that was already rated is skipped. None to rate it anyway
+        player: str
+            Name of one player
+        opponent: str
+            Name of the other player
+        score: float
+            Points of player, 1 for a win, 0.5 for a draw and 0 for a loss
+        finished: float
+            Unix timestamp the game ended at, decides the rating period
+        """
+        with self._lock:
+            if game_id is not None:
+                if game_id in self._seen:
+                    return
+                self._seen[game_id] = None
+                while len(self._seen) > _SEEN_GAMES:
+                    self._seen.popitem(last=False)
+            self._add(player, opponent, score, int(finished // self._period_length))
+
+    def _add(self, name: str, opponent_name: str, score: float, period: int):
+        if self._period is None:
+            self._period = period
+        elif period > self._period:
+            self._close_period()
+            self._period = period
+        player, opponent = self._player(name), self._player(opponent_name)
+        expected = 1.0 / (1.0 + 10.0 ** ((opponent.elo - player.elo) / 400.0))
+        change = self._k_factor * (score - expected)
+        player.elo += change
+        opponent.elo -= change
+        player.games += 1
+        opponent.games += 1
+        self._pending.setdefault(name, []).append((opponent_name, score))
+        self._pending.setdefault(opponent_name, []).append((name, 1.0 - score))
+
+    def _update(self, player: _Player, games: List[Tuple[str, float]], period: int) -> Tuple[float, float, float]:
+        # Step 3 to 8 of the Glicko-2 paper for one player, opponents are rated as they were at the period start
+        phi = player.phi_before(period)
+        opponents = [self._players[x] for x, _ in games]
+        gs = [_g(x.phi_before(period)) for x in opponents]
+        es = [_expected(g, player.mu - x.mu) for g, x in zip(gs, opponents)]
+        v = 1.0 / sum(g * g * e * (1.0 - e) for g, e in zip(gs, es))
+        improvement = sum(g * (s - e) for g, e, (_, s) in zip(gs, es, games))
+        sigma = _volatility(phi, player.sigma, v * improvement, v, self._tau)
+        phi = 1.0 / math.sqrt(1.0 / (phi * phi + sigma * sigma) + 1.0 / v)
+        return player.mu + phi * phi * improvement, phi, sigma
+
+    def _close_period(self):
+        # All players of the period are updated from the ratings at its start, so the results are applied at the end
+        period = self._period
+        updates = {name: self._update(self._players[name], games, period) for name, games in self._pending.items()}
+        for name, (mu, phi, sigma) in updates.items():
+            player = self._players[name]
+            player.mu, player.phi, player.sigma, player.period = mu, phi, sigma, period
+        self._pending = {}
+
+    def _rating(self, name: str) -> Optional[Rating]:
+        player = self._players.get(name, None)
+        if player is None:
+            return None
+        games = self._pending.get(name, None)
+        if games is None:
+            mu, phi, sigma = player.mu, player.phi_before(self._period), player.sigma
+        else:
+            mu, phi, sigma = self._update(player, games, self._period)
+        return Rating(name=name, elo=player.elo, rating=_BASE_RATING + _SCALE * mu, deviation=_SCALE * phi,
+                      volatility=sigma, games=player.games)
+
+    def rating(self, name: str) -> Optional[Rating]:
+        """
+        Current rating of a player or None if it did not play yet
+        """
+        with self._lock:
+            return self._rating(name)
+
+    def ratings(self) -> List[Rating]:
+        """
+        Current ratings of all players, best first
+        """
+        with self._lock:
+            ret = [self._rating(x) for x in self._players.keys()]
+        return sorted(ret, key=lambda x: (-x.rating, x.name))
+
+    def reset(self):
+        with self._lock:
+            self._players = {}
+            self._period = None
+            self._pending = {}
+            self._seen.clear()
+
+    def rebuild(self, games: Iterable[Tuple[Optional[str], str, str, float, float]]) -> int:
+        """
+        Forget all ratings and rate the games again, e.g. from GameArchive.outcomes
+
+        Parameters
+        ----------
+        games: Iterable[Tuple[Optional[str], str, str, float, float]]
+            Game id, player, opponent, score of the player and the unix timestamp the game ended at, oldest first
+
+        Returns
+        -------
+        Number of rated games
+        """
+        count = 0
+        with self._lock:
+            self._players, self._period, self._pending = {}, None, {}
+            seen = set()
+            for game_id, player, opponent, score, finished in games:
+                if game_id is not None:
+                    if game_id in seen:
+                        continue
+                    seen.add(game_id)
+                self._add(player, opponent, score, int(finished // self._period_length))
+                count += 1
+        return count
+
+    def metrics(self, name: str, opponent: Optional[str] = None) -> List[Tuple[str, Any]]:
+        """
+        Rating of a client and of its current opponent for the metrics of the client
+        """
+        own = self.rating(name)
+        if own is None:
+            return [("Rating", "no rated games")]
+        low, high = own.interval
+        ret = [("Rating", f"Glicko-2 {own.rating:.0f} ({low:.0f}-{high:.0f}); Elo {own.elo:.0f}; "
+                          f"{own.games} games")]
+        other = None if opponent is None else self.rating(opponent)
+        if other is not None:
+            low, high = other.interval
+            ret.append(("Opponent rating", f"Glicko-2 {other.rating:.0f} ({low:.0f}-{high:.0f}); "
+                                           f"Elo {other.elo:.0f}; expected score {own.expected_score(other):.0%}"))
+        return ret
+
+    def load(self):
+        if self._path is None or not os.path.exists(self._path):
+            return
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version", None) != _FILE_VERSION:
+                raise ValueError(f"Unknown version {data.get('version', None)}")
+            players = {str(name): _Player(elo=float(x[0]), mu=float(x[1]), phi=float(x[2]), sigma=float(x[3]),
+                                          period=None if x[4] is None else int(x[4]), games=int(x[5]))
+                       for name, x in data["players"].items()}
+            pending = [(str(x[0]), str(x[1]), float(x[2])) for x in data["pending"]]
+            period = data["period"]
+        except (OSError, ValueError, KeyError, IndexError, TypeError) as e:
+            SYSTEM_LOGGER.error(f"Could not load the ratings \"{self._path}\": {e}")
+            return
+        with self._lock:
+            self._players = players
+            self._period = None if period is None else int(period)
+            self._pending = {}
+            for name, opponent, score in pending:
+                self._pending.setdefault(name, []).append((opponent, score))
+        SYSTEM_LOGGER.info(f"Loaded the ratings of {len(players)} players from \"{self._path}\"")
+
+    def save(self):
+        if self._path is None:
+            return
+        with self._lock:
+            players = {name: [round(x.elo, 3), round(x.mu, 6), round(x.phi, 6), round(x.sigma, 6), x.period, x.games]
+                       for name, x in self._players.items()}
+            pending = [[name, opponent, score] for name, games in self._pending.items() for opponent, score in games]
+            period = self._period
+        temporary = f"{self._path}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump({"version": _FILE_VERSION, "period": period, "players": players, "pending": pending}, f,
+                          separators=(",", ":"))
+            os.replace(temporary, self._path)
+        except OSError as e:
+            SYSTEM_LOGGER.error(f"Could not save the ratings \"{self._path}\": {e}")
+
+
+_RATING_ENGINE: Optional[RatingEngine] = None
+
+
+def get_rating_engine() -> RatingEngine:
+    global _RATING_ENGINE
+    if _RATING_ENGINE is None:
+        _RATING_ENGINE = RatingEngine()
+    return _RATING_ENGINE
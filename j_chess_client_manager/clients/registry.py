@@ -0,0 +1,212 @@
+"""Index of all AI classes that can be played with, including AIs of installed packages that are not imported yet."""
+import importlib
+import threading
+import weakref
+from inspect import isclass
+from typing import Dict, List, Optional, Type
+
+from j_chess_lib.ai import AI
+
+from j_chess_client_manager.logging import SYSTEM_LOGGER
+
+ENTRY_POINT_GROUP = "j_chess_client_manager.ais"
+
+
+def _playable(cls: type) -> bool:
+    return len(getattr(cls, "__abstractmethods__", ())) == 0 and not cls.__name__.startswith("_")
+
+
+def _path(cls: type) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _import(path: str) -> Type[AI]:
+    module_name, _, attribute = path.partition(":")
+    ret = importlib.import_module(module_name)
+    for part in attribute.split("."):
+        ret = getattr(ret, part)
+    if not isclass(ret) or not issubclass(ret, AI):
+        raise ValueError(f"\"{path}\" does not point to an AI class")
+    return ret
+
+
+class AIEntry:
+    """
+    One selectable AI. AIs found through entry points are only imported by load
+    """
+
+    __slots__ = ("name", "path", "_ai_class")
+
+    def __init__(self, name: str, path: str, ai_class: Optional[Type[AI]] = None):
+        self.name = name
+        self.path = path
+        self._ai_class = ai_class
+
+    @property
+    def loaded(self) -> bool:
+        return self._ai_class is not None
+
+    def load(self) -> Type[AI]:
+        if self._ai_class is None:
+            self._ai_class = _import(self.path)
+            SYSTEM_LOGGER.info(f"Imported AI \"{self.name}\" from {self.path}")
+        return self._ai_class
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r}, {self.path!r}{'' if self.loaded else ', not loaded'})"
+
+
+def _entry_points() -> List[AIEntry]:
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        try:
+            from importlib_metadata import entry_points
+        except ImportError:
+            return []
+    try:
+        found = entry_points()
+        if hasattr(found, "select"):
+            found = found.select(group=ENTRY_POINT_GROUP)
+        else:
+            found = found.get(ENTRY_POINT_GROUP, [])
+        return [AIEntry(name=x.name, path=x.value) for x in found]
+    except Exception as e:
+        SYSTEM_LOGGER.error(f"Could not read the entry points of installed AIs: {type(e).__name__}: {e}")
+        return []
+
+
+class AIRegistry:
+    """
+    Subclasses of AI are walked on every use, only classes not seen before are checked and added. Classes are seen
+    weakly so AI classes created on the fly, like the wrappers of every client, can be collected. Entry points in the
+    group "j_chess_client_manager.ais" are read once and imported when they are loaded
+    """
+
+    def __init__(self, use_entry_points: bool = True):
+        self._lock = threading.Lock()
+        self._use_entry_points = use_entry_points
+        self._entries: Dict[str, AIEntry] = {}
+        self._known: "weakref.WeakSet[type]" = weakref.WeakSet()
+        self._entry_points_read = False
+        self._sorted: Optional[List[AIEntry]] = None
+        self._packages: List[str] = []
+
+    def include(self, package: str):
+        """
+        Import a package that contains AIs the first time the registry is used instead of right away
+        """
+        with self._lock:
+            self._packages.append(package)
+
+    def _walk(self) -> List[type]:
+        # Walking the subclasses is cheap, checking and sorting them is only done for classes not seen before
+        ret, seen, stack = [], set(), list(AI.__subclasses__())
+        while len(stack) > 0:
+            cls = stack.pop()
+            if cls in seen:
+                continue
+            seen.add(cls)
+            if cls not in self._known:
+                self._known.add(cls)
+                ret.append(cls)
+            stack.extend(cls.__subclasses__())
+        return ret
+
+    def _import_packages(self):
+        packages, self._packages = self._packages, []
+        for package in packages:
+            try:
+                importlib.import_module(package)
+                SYSTEM_LOGGER.info(f"Imported \"{package}\"")
+            except ModuleNotFoundError:
+                SYSTEM_LOGGER.info(f"Package \"{package}\" could not be imported")
+
+    def _refresh(self):
+        self._import_packages()
+        if not self._entry_points_read and self._use_entry_points:
+            self._entry_points_read = True
+            for entry in _entry_points():
+                if entry.path not in self._entries:
+                    self._entries[entry.path] = entry
+                    self._sorted = None
+        for cls in self._walk():
+            if not _playable(cls):
+                continue
+            path = _path(cls)
+            entry = self._entries.get(path, None)
+            if entry is None:
+                self._entries[path] = AIEntry(name=cls.__name__, path=path, ai_class=cls)
+                self._sorted = None
+            elif not entry.loaded:
+                # The entry point was imported some other way
+                entry._ai_class = cls
+
+    def entries(self) -> List[AIEntry]:
+        """
+        All playable AIs ordered by name
+        """
+        with self._lock:
+            self._refresh()
+            if self._sorted is None:
+                self._sorted = sorted(self._entries.values(), key=lambda x: (x.name, x.path))
+            return self._sorted
+
+    def ai_classes(self) -> List[Type[AI]]:
+        """
+        Classes of all AIs that are already imported, ordered by name
+        """
+        return [x.load() for x in self.entries() if x.loaded]
+
+    def find(self, name: str) -> Type[AI]:
+        """
+        Find an AI class by the name of its class or entry point or by its import path ("package.module:Class" or
+        "package.module.Class")
+
+        Parameters
+        ----------
+        name: str
+            Name or import path of the AI class
+
+        Returns
+        -------
+        The AI class
+        """
+        if ":" in name:
+            with self._lock:
+                self._import_packages()
+            return _import(name)
+        for entry in self.entries():
+            if entry.name == name:
+                return entry.load()
+        if "." in name:
+            module_name, _, class_name = name.rpartition(".")
+            return _import(f"{module_name}:{class_name}")
+        raise ValueError(f"Could not find an AI called \"{name}\". Maybe you forgot to include the package its in?")
+
+
+_AI_REGISTRY: Optional[AIRegistry] = None
+
+
+def get_ai_registry() -> AIRegistry:
+    global _AI_REGISTRY
+    if _AI_REGISTRY is None:
+        _AI_REGISTRY = AIRegistry()
+    return _AI_REGISTRY
+
+
+def find_ai(name: str) -> Type[AI]:
+    """
+    Find an AI class either by its class name, the name of its entry point or by its import path
+    ("package.module:Class" or "package.module.Class")
+
+    Parameters
+    ----------
+    name: str
+        Name or import path of the AI class
+
+    Returns
+    -------
+    The AI class
+    """
+    return get_ai_registry().find(name)
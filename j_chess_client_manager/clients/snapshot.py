@@ -0,0 +1,32 @@
+from abc import ABC
+from typing import NamedTuple, Optional, Dict
+
+
+class ClientSnapshot(NamedTuple):
+    """
+    State of a client at one point in time. Created by the client itself so readers never have to call into it
+    """
+    name: str
+    tournament_code: Optional[str]
+    own_time: int
+    enemy_time: int
+    clock_warning: float
+    matches: int
+    games: int
+    wins: int
+    losses: int
+    draws: int
+    moves: Dict[str, float]
+    overhead: Dict[str, float]
+    in_game: bool = False
+    clock_warnings: int = 0
+
+
+class SnapshotProvider(ABC):
+
+    @property
+    def snapshot(self) -> Optional[ClientSnapshot]:
+        """
+        Latest snapshot of the client or None if it does not create any
+        """
+        return None
@@ -0,0 +1,133 @@
+"""Standings of all clients grouped by the tournament they play in."""
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .snapshot import ClientSnapshot
+
+QUICK_PLAY = "Quick play"
+
+
+class Standing(NamedTuple):
+    name: str
+    games: int
+    wins: int
+    losses: int
+    draws: int
+    in_game: bool
+    mean_move: float
+    clock_warnings: int
+
+    @property
+    def score(self) -> float:
+        return self.wins + self.draws / 2
+
+
+class TournamentSummary(NamedTuple):
+    clients: int
+    games: int
+    in_progress: int
+    clock_warnings: int
+    mean_move: float
+
+
+class _Tournament:
+
+    def __init__(self):
+        self.standings: Dict[int, Standing] = {}
+        self.version = 0
+        self.games = 0
+        self.in_progress = 0
+        self.clock_warnings = 0
+        self.moves = 0
+        self.move_time = 0.0
+        self.sorted: Optional[Tuple[int, List[Standing]]] = None
+
+    def apply(self, standing: Standing, moves: int, move_time: float, sign: int):
+        self.games += sign * standing.games
+        self.in_progress += sign * int(standing.in_game)
+        self.clock_warnings += sign * standing.clock_warnings
+        self.moves += sign * moves
+        self.move_time += sign * move_time
+
+
+class TournamentStandings:
+    """
+    Groups clients by tournament code. Every update only changes the row of the updated client and the totals of its
+    tournament, standings are sorted again only when they are read after a change
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tournaments: Dict[str, _Tournament] = {}
+        # Per client the snapshot that was applied and the tournament it was applied to
+        self._applied: Dict[int, Tuple[ClientSnapshot, str]] = {}
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """
+        Changes whenever any standing changed
+        """
+        return self._version
+
+    def update(self, client: Any, *args, **kwargs):
+        """
+        Take over the latest snapshot of the client. Can be used as listener of the redraw scheduler
+        """
+        snapshot: Optional[ClientSnapshot] = getattr(client, "snapshot", None)
+        if snapshot is None:
+            return
+        key = id(client)
+        with self._lock:
+            previous = self._applied.get(key, None)
+            if previous is not None and previous[0] is snapshot:
+                return
+            code = snapshot.tournament_code or QUICK_PLAY
+            tournament = self._tournaments.setdefault(code, _Tournament())
+            if previous is not None:
+                old_snapshot, old_code = previous
+                old_tournament = self._tournaments[old_code]
+                old_tournament.apply(old_tournament.standings.pop(key), moves=old_snapshot.moves["count"],
+                                     move_time=old_snapshot.moves["sum"], sign=-1)
+                old_tournament.version += 1
+            standing = Standing(name=snapshot.name, games=snapshot.games, wins=snapshot.wins,
+                                losses=snapshot.losses, draws=snapshot.draws, in_game=snapshot.in_game,
+                                mean_move=snapshot.moves["mean"], clock_warnings=snapshot.clock_warnings)
+            tournament.standings[key] = standing
+            tournament.apply(standing, moves=snapshot.moves["count"], move_time=snapshot.moves["sum"], sign=1)
+            tournament.version += 1
+            self._applied[key] = (snapshot, code)
+            self._version += 1
+
+    def tournaments(self) -> List[str]:
+        with self._lock:
+            return sorted(self._tournaments.keys())
+
+    def tournament_version(self, code: str) -> int:
+        with self._lock:
+            tournament = self._tournaments.get(code, None)
+            return -1 if tournament is None else tournament.version
+
+    def standings(self, code: str) -> List[Standing]:
+        """
+        Clients of the tournament ordered by score
+        """
+        with self._lock:
+            tournament = self._tournaments.get(code, None)
+            if tournament is None:
+                return []
+            if tournament.sorted is None or tournament.sorted[0] != tournament.version:
+                tournament.sorted = (tournament.version, sorted(tournament.standings.values(),
+                                                                key=lambda x: (-x.score, -x.wins, x.name)))
+            return tournament.sorted[1]
+
+    def summary(self, code: str) -> TournamentSummary:
+        with self._lock:
+            tournament = self._tournaments.get(code, None)
+            if tournament is None:
+                return TournamentSummary(clients=0, games=0, in_progress=0, clock_warnings=0, mean_move=0.0)
+            return TournamentSummary(
+                clients=len(tournament.standings), games=tournament.games, in_progress=tournament.in_progress,
+                clock_warnings=tournament.clock_warnings,
+                mean_move=tournament.move_time / tournament.moves if tournament.moves > 0 else 0.0,
+            )
@@ -0,0 +1,177 @@
+"""Check the moves of AIs before they are sent, so an illegal move does not lose the game at the server."""
+import threading
+from time import perf_counter
+from typing import Callable, List, Optional, Tuple
+
+from j_chess_lib.communication import MoveData
+
+from j_chess_client_manager.chess import Position, check_move, legal_moves
+from j_chess_client_manager.chess.position import PIECE_VALUES
+from .latency import LatencyHistogram
+from j_chess_client_manager.logging import SYSTEM_LOGGER
+
+# Ask the AI again for a move and pick a legal one if it keeps playing illegal moves
+RETRY = "retry"
+# Pick a legal move right away
+LEGAL = "legal"
+POLICIES = (RETRY, LEGAL)
+
+
+def pick_legal_move(position: Position) -> Optional[MoveData]:
+    """
+    Legal move of the side to move, the capture of the most valuable piece if there is one. None if there is no move
+    """
+    moves = legal_moves(position)
+    if len(moves) <= 0:
+        return None
+    move = max(moves, key=lambda x: (PIECE_VALUES.get(position.piece_at(x.target).upper(), -1), x.promotion == "Q"))
+    promotion = None if move.promotion is None else (move.promotion if position.white_turn else move.promotion.lower())
+    return MoveData(from_value=move.from_value, to=move.to, promotion_unit=promotion)
+
+
+def _describe(move: Optional[MoveData]) -> str:
+    if move is None:
+        return "no move"
+    return f"{move.from_value}{move.to}{move.promotion_unit or ''}"
+
+
+class MoveValidator:
+    """
+    Settings of the validation shared by all AIs
+    """
+
+    def __init__(self, enabled: bool = False, policy: str = RETRY, retries: int = 1):
+        self._lock = threading.Lock()
+        self._enabled = False
+        self._policy = RETRY
+        self._retries = retries
+        self.configure(enabled=enabled, policy=policy, retries=retries)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def policy(self) -> str:
+        return self._policy
+
+    @property
+    def retries(self) -> int:
+        return self._retries
+
+    def configure(self, enabled: bool, policy: str = RETRY, retries: int = 1):
+        """
+        Parameters
+        ----------
+        enabled: bool
+            Whether new AIs validate their moves
+        policy: str
+            RETRY to ask the AI again, LEGAL to replace an illegal move with a legal one right away
+        retries: int
+            Number of times the AI is asked again with RETRY before a legal move is picked
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown validation policy \"{policy}\". Choose from {', '.join(POLICIES)}")
+        if retries < 0:
+            raise ValueError(f"The number of retries can not be negative not {retries}")
+        with self._lock:
+            self._enabled = enabled
+            self._policy = policy
+            self._retries = retries
+
+    def settings(self) -> Tuple[bool, str, int]:
+        return self._enabled, self._policy, self._retries
+
+
+class ValidationState:
+    """
+    Validation of the moves of one AI with the time the checks and picking legal moves took
+    """
+
+    def __init__(self, validator: MoveValidator):
+        self._validator = validator
+        self._timings = LatencyHistogram(min_value=1e-7, max_value=10)
+        self._pick_timings = LatencyHistogram(min_value=1e-7, max_value=10)
+        self.illegal = 0
+        self.retried = 0
+        self.replaced = 0
+
+    @property
+    def timings(self) -> LatencyHistogram:
+        return self._timings
+
+    @property
+    def pick_timings(self) -> LatencyHistogram:
+        return self._pick_timings
+
+    def _check(self, position: Position, move: Optional[MoveData]) -> Optional[str]:
+        start = perf_counter()
+        try:
+            if move is None:
+                return "No move"
+            return check_move(position, move.from_value, move.to, move.promotion_unit)
+        finally:
+            self._timings.record(perf_counter() - start)
+
+    def validate(self, fen: str, move: Optional[MoveData], ask: Callable[[], MoveData]) -> Optional[MoveData]:
+        """
+        Legal move to send instead of the move of the AI
+
+        Parameters
+        ----------
+        fen: str
+            Position the AI moves in
+        move: Optional[MoveData]
+            Move the AI chose
+        ask: Callable[[], MoveData]
+            Asks the AI for a move again
+
+        Returns
+        -------
+        The move if it is legal, else a move chosen by the policy. The move itself if the position can not be read
+        """
+        try:
+            position = Position.from_fen(fen)
+        except (ValueError, TypeError) as e:
+            SYSTEM_LOGGER.warning(f"Can not validate moves in \"{fen}\": {e}")
+            return move
+        problem = self._check(position, move)
+        if problem is None:
+            return move
+        self.illegal += 1
+        SYSTEM_LOGGER.warning(f"AI played the illegal move {_describe(move)} in \"{fen}\": {problem}")
+        _enabled, policy, retries = self._validator.settings()
+        if policy == RETRY:
+            for _ in range(retries):
+                self.retried += 1
+                try:
+                    move = ask()
+                except Exception as e:
+                    SYSTEM_LOGGER.warning(f"AI failed when asked again: {type(e).__name__}: {e}")
+                    break
+                problem = self._check(position, move)
+                if problem is None:
+                    return move
+                SYSTEM_LOGGER.warning(f"AI played the illegal move {_describe(move)} again: {problem}")
+        start = perf_counter()
+        ret = pick_legal_move(position)
+        self._pick_timings.record(perf_counter() - start)
+        if ret is not None:
+            self.replaced += 1
+            SYSTEM_LOGGER.warning(f"Playing the legal move {_describe(ret)} instead")
+            return ret
+        return move
+
+    def metrics(self) -> List[Tuple[str, str]]:
+        return [("Move validation", f"illegal {self.illegal}; retried {self.retried}; replaced {self.replaced}"),
+                ("Validation time", self._timings.describe()), ("Legal move pick time", self._pick_timings.describe())]
+
+
+_MOVE_VALIDATOR: Optional[MoveValidator] = None
+
+
+def get_move_validator() -> MoveValidator:
+    global _MOVE_VALIDATOR
+    if _MOVE_VALIDATOR is None:
+        _MOVE_VALIDATOR = MoveValidator()
+    return _MOVE_VALIDATOR
@@ -0,0 +1,145 @@
+"""Watch running get_move calls against the clock of their AI."""
+import threading
+import time
+from abc import ABC
+from typing import Any, Callable, Optional, Sequence, Set, Tuple
+
+from j_chess_client_manager.logging import SYSTEM_LOGGER
+
+
+class ClockWatched(ABC):
+
+    @property
+    def clock_warning(self) -> float:
+        """
+        Highest fraction of the remaining clock the running move has used up. 0 if there is no warning
+        """
+        return 0.0
+
+
+class Search:
+    """
+    One running get_move call
+    """
+
+    __slots__ = ("client", "start", "budget", "warning", "_next", "_stop", "_on_warning")
+
+    def __init__(self, client: Any, budget: float, on_warning: Callable[[float], None]):
+        self.client = client
+        self.start = time.monotonic()
+        self.budget = budget
+        self.warning = 0.0
+        self._next = 0
+        self._stop = threading.Event()
+        self._on_warning = on_warning
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    @property
+    def stop_requested(self) -> bool:
+        return self._stop.is_set()
+
+    def check(self, fractions: Tuple[float, ...], stop_fraction: Optional[float]):
+        used = self.elapsed / self.budget
+        name = getattr(self.client, "name", type(self.client).__name__)
+        if self._next < len(fractions) and used >= fractions[self._next]:
+            while self._next < len(fractions) and used >= fractions[self._next]:
+                self.warning = fractions[self._next]
+                self._next += 1
+            SYSTEM_LOGGER.warning(f"{name} used {self.warning:.0%} of its remaining clock of {self.budget:.2f}s "
+                                  f"for the current move")
+            self._on_warning(self.warning)
+        if stop_fraction is not None and used >= stop_fraction and not self._stop.is_set():
+            SYSTEM_LOGGER.warning(f"{name} is asked to stop its search after {self.elapsed:.2f}s")
+            self._stop.set()
+
+
+class ClockWatchdog:
+    """
+    Checks all running get_move calls in one thread. When a call used up one of the given fractions of the remaining
+    clock a warning is logged and the client is notified. Once stop_fraction is used up the call is asked to stop,
+    AIs can poll this cooperatively
+    """
+
+    def __init__(self, fractions: Sequence[float] = (0.5, 0.9), stop_fraction: Optional[float] = None,
+                 poll_interval: float = 0.02):
+        self._lock = threading.Lock()
+        self._searches: Set[Search] = set()
+        self._fractions: Tuple[float, ...] = ()
+        self._stop_fraction: Optional[float] = None
+        self._poll_interval = poll_interval
+        self._thread: Optional[threading.Thread] = None
+        self.configure(fractions=fractions, stop_fraction=stop_fraction)
+
+    def configure(self, fractions: Sequence[float], stop_fraction: Optional[float] = None):
+        """
+        Parameters
+        ----------
+        fractions: Sequence[float]
+            Fractions of the remaining clock (between 0 and 1) at which a warning is given
+        stop_fraction: Optional[float]
+            Fraction of the remaining clock after which the AI is asked to stop. None to never ask
+        """
+        if any(not 0 < x <= 1 for x in fractions) or (stop_fraction is not None and not 0 < stop_fraction <= 1):
+            raise ValueError("Fractions of the clock have to be between 0 and 1")
+        self._fractions = tuple(sorted(set(fractions)))
+        self._stop_fraction = stop_fraction
+
+    def settings(self) -> Tuple[Tuple[float, ...], Optional[float]]:
+        return self._fractions, self._stop_fraction
+
+    def begin(self, client: Any, budget: float, on_warning: Callable[[float], None] = None) -> Optional[Search]:
+        """
+        Start watching a get_move call
+
+        Parameters
+        ----------
+        client: Any
+            Client making the move. Only used for the warnings
+        budget: float
+            Remaining clock in seconds
+        on_warning: Callable[[float], None]
+            Called from the watchdog thread with the fraction whenever a warning is given
+
+        Returns
+        -------
+        The watched search or None if the budget is unknown
+        """
+        if budget <= 0:
+            return None
+        if on_warning is None:
+            def on_warning(*args, **kwargs):
+                pass
+        search = Search(client=client, budget=budget, on_warning=on_warning)
+        with self._lock:
+            self._searches.add(search)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="ClockWatchdog")
+                self._thread.start()
+        return search
+
+    def end(self, search: Optional[Search]):
+        if search is None:
+            return
+        with self._lock:
+            self._searches.discard(search)
+
+    def _run(self):
+        while True:
+            time.sleep(self._poll_interval)
+            with self._lock:
+                searches = list(self._searches)
+            for search in searches:
+                search.check(fractions=self._fractions, stop_fraction=self._stop_fraction)
+
+
+_CLOCK_WATCHDOG: Optional[ClockWatchdog] = None
+
+
+def get_clock_watchdog() -> ClockWatchdog:
+    global _CLOCK_WATCHDOG
+    if _CLOCK_WATCHDOG is None:
+        _CLOCK_WATCHDOG = ClockWatchdog()
+    return _CLOCK_WATCHDOG
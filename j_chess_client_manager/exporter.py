@@ -0,0 +1,160 @@
+"""Serve metrics of all managed clients in the Prometheus text format."""
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+from typing import List, Optional, Dict, Tuple, Iterable
+
+from j_chess_client_manager.clients import SuperProvider
+from j_chess_client_manager.clients.snapshot import ClientSnapshot
+from j_chess_client_manager.logging import SYSTEM_LOGGER, log_counts
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+_QUANTILES = (("0.5", "p50"), ("0.9", "p90"), ("0.99", "p99"), ("1", "max"))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f"{k}=\"{_escape(str(v))}\"" for k, v in labels.items()) + "}"
+
+
+class _Family:
+
+    def __init__(self, name: str, kind: str, description: str):
+        self._name = name
+        self._lines = [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+
+    def add(self, value: float, suffix: str = "", **labels: str):
+        self._lines.append(f"{self._name}{suffix}{_labels(**labels) if len(labels) > 0 else ''} {value}")
+
+    def add_summary(self, summary: Dict[str, float], **labels: str):
+        for quantile, key in _QUANTILES:
+            self.add(summary[key], quantile=quantile, **labels)
+        self.add(summary["sum"], suffix="_sum", **labels)
+        self.add(summary["count"], suffix="_count", **labels)
+
+    def lines(self) -> List[str]:
+        return self._lines
+
+
+def render_metrics(snapshots: Iterable[Tuple[int, ClientSnapshot]], frame_times: Optional[Dict[str, float]] = None,
+                   redraws: Optional[Dict[str, int]] = None) -> str:
+    """
+    Render snapshots of clients and the manager in the Prometheus text format
+
+    Parameters
+    ----------
+    snapshots: Iterable[Tuple[int, ClientSnapshot]]
+        Snapshots of the clients with the index identifying the client
+    frame_times: Optional[Dict[str, float]]
+        Summary of the time the UI took per frame. None in headless mode
+    redraws: Optional[Dict[str, int]]
+        Statistics of the redraw scheduler. None in headless mode
+
+    Returns
+    -------
+    The metrics
+    """
+    moves = _Family("jchess_move_seconds", "summary", "Time the AI took to calculate a move")
+    overhead = _Family("jchess_wrapper_overhead_seconds", "summary", "Time the manager spent around a move")
+    clock = _Family("jchess_clock_seconds", "gauge", "Remaining clock at the last move")
+    clock_warning = _Family("jchess_clock_warning_ratio", "gauge",
+                            "Fraction of the clock the running move used up when a warning was given")
+    matches = _Family("jchess_matches_total", "counter", "Finished matches")
+    games = _Family("jchess_games_total", "counter", "Finished games by result")
+    families = [moves, overhead, clock, clock_warning, matches, games]
+
+    for index, snapshot in snapshots:
+        labels = {"client": str(index), "name": snapshot.name, "tournament": snapshot.tournament_code or ""}
+        moves.add_summary(snapshot.moves, **labels)
+        overhead.add_summary(snapshot.overhead, **labels)
+        clock.add(snapshot.own_time / 1000, side="own", **labels)
+        clock.add(snapshot.enemy_time / 1000, side="enemy", **labels)
+        clock_warning.add(snapshot.clock_warning, **labels)
+        matches.add(snapshot.matches, **labels)
+        for result, value in (("win", snapshot.wins), ("loss", snapshot.losses), ("draw", snapshot.draws)):
+            games.add(value, result=result, **labels)
+
+    logs = _Family("jchess_log_records_total", "counter", "Logged records per code")
+    for code, count in sorted(log_counts().items()):
+        logs.add(count, code=code)
+    families.append(logs)
+
+    if frame_times is not None:
+        frames = _Family("jchess_frame_seconds", "summary", "Time the UI took to draw a frame")
+        frames.add_summary(frame_times)
+        families.append(frames)
+    if redraws is not None:
+        for key, value in sorted(redraws.items()):
+            family = _Family(f"jchess_redraw_{key}_total", "counter", f"Number of {key} of the redraw scheduler")
+            family.add(value)
+            families.append(family)
+
+    return "\n".join(line for family in families for line in family.lines()) + "\n"
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class MetricsExporter:
+    """
+    Serves /metrics on a local port. Only the snapshots the clients published themselves are read, so scraping never
+    waits for a client
+    """
+
+    def __init__(self, address: str = "127.0.0.1", port: int = 9464, scheduler=None):
+        self._address = address
+        self._port = port
+        self._scheduler = scheduler
+        self._lock = threading.Lock()
+        self._clients: List[SuperProvider] = []
+        self._server: Optional[HTTPServer] = None
+
+    @property
+    def port(self) -> int:
+        return self._port if self._server is None else self._server.server_address[1]
+
+    def add_client(self, client: SuperProvider):
+        with self._lock:
+            self._clients.append(client)
+
+    def render(self) -> str:
+        with self._lock:
+            clients = list(self._clients)
+        snapshots = [(i, x.snapshot) for i, x in enumerate(clients) if x.snapshot is not None]
+        if self._scheduler is None:
+            return render_metrics(snapshots)
+        return render_metrics(snapshots, frame_times=self._scheduler.frame_times(),
+                              redraws=self._scheduler.statistics())
+
+    def start(self):
+        exporter = self
+
+        class _Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = _ThreadingHTTPServer((self._address, self._port), _Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="MetricsExporter").start()
+        SYSTEM_LOGGER.info(f"Serving metrics on http://{self._address}:{self.port}/metrics")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,340 @@
+"""Local stand-in for a J-Chess server to test and load-test the manager without the real one."""
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Any
+from uuid import uuid4
+
+from xsdata.formats.dataclass.parsers import XmlParser
+from xsdata.formats.dataclass.serializers import XmlSerializer
+from xsdata.formats.dataclass.serializers.config import SerializerConfig
+
+from j_chess_lib.communication import JchessMessage, JchessMessageType, MoveData, MatchStatusData, MatchFormatData
+from j_chess_lib.communication.schema import (
+    LoginReplyMessage, MatchFoundMessage, MatchOverMessage, GameStartMessage, GameOverMessage, AwaitMoveMessage,
+    TimeControlData, MatchTypeValue, MatchTypeScore,
+)
+
+from j_chess_client_manager.chess.moves import IllegalMove, apply_move
+from j_chess_client_manager.chess.position import Position
+from j_chess_client_manager.clients.latency import LatencyHistogram
+from j_chess_client_manager.logging import SYSTEM_LOGGER
+
+START_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+QUICK_PLAY_LOBBY = ""
+
+_PREFIX_BYTES = 4
+_ENDIAN_TYPE = "big"
+
+
+class _PlayerGone(Exception):
+
+    def __init__(self, player: "_Player", reason: str):
+        super().__init__(f"{player.name} is gone: {reason}")
+        self.player = player
+
+
+class _Player:
+    """
+    Connection to one client. Only used by one thread at a time, first to log in and then by its current match
+    """
+
+    def __init__(self, sock: socket.socket, address: Any):
+        self.sock = sock
+        self.address = address
+        self.name = "?"
+        self.tournament_code: Optional[str] = None
+        self.player_id = str(uuid4())
+        self._parser = XmlParser()
+        self._serializer = XmlSerializer(config=SerializerConfig(pretty_print=False))
+
+    def _recv_exact(self, length: int) -> bytes:
+        data = bytearray()
+        while len(data) < length:
+            chunk = self.sock.recv(length - len(data))
+            if len(chunk) <= 0:
+                raise _PlayerGone(self, "Connection closed")
+            data += chunk
+        return bytes(data)
+
+    def send(self, message: JchessMessage):
+        message.player_id = self.player_id
+        raw = self._serializer.render(message).encode("utf-8")
+        try:
+            self.sock.sendall(len(raw).to_bytes(_PREFIX_BYTES, _ENDIAN_TYPE) + raw)
+        except OSError as e:
+            raise _PlayerGone(self, str(e)) from e
+
+    def recv(self, timeout: Optional[float] = None) -> JchessMessage:
+        try:
+            self.sock.settimeout(timeout)
+            length = int.from_bytes(self._recv_exact(_PREFIX_BYTES), _ENDIAN_TYPE)
+            raw = self._recv_exact(length).decode("utf-8")
+        except socket.timeout as e:
+            raise _PlayerGone(self, "Timed out") from e
+        except OSError as e:
+            raise _PlayerGone(self, str(e)) from e
+        try:
+            return self._parser.from_string(raw, JchessMessage)
+        except Exception as e:
+            raise _PlayerGone(self, f"Sent an unreadable message: {e}") from e
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class FakeServer:
+    """
+    Speaks the J-Chess protocol on a local port. Every two clients logged in with the same tournament code (or both
+    without one) are paired into a match, after the match both are paired again so clients play until they are
+    stopped. Moves are only checked for moving an own piece, a game ends when a king is captured, a clock runs out,
+    a client fails to answer or after max_plies half moves as draw
+    """
+
+    def __init__(self, address: str = "127.0.0.1", port: int = 0, games_per_match: int = 2, max_plies: int = 80,
+                 move_delay: float = 0.0, time_per_side: int = 60000, time_per_side_increment: int = 0,
+                 answer_grace: float = 5.0):
+        """
+        Parameters
+        ----------
+        address: str
+            Address to listen on
+        port: int
+            Port to listen on. 0 picks a free port, see FakeServer.port
+        games_per_match: int
+            Games of every match, the clients swap colors after each game
+        max_plies: int
+            Half moves after which a game is a draw
+        move_delay: float
+            Seconds the server waits before asking for the next move. Sets the pacing of the matches
+        time_per_side: int
+            Clock of each side in milliseconds
+        time_per_side_increment: int
+            Milliseconds added to the clock after every move
+        answer_grace: float
+            Seconds a client may answer after its clock ran out before it is disconnected
+        """
+        self._address = address
+        self._port = port
+        self._games_per_match = games_per_match
+        self._max_plies = max_plies
+        self._move_delay = move_delay
+        self._time_per_side = time_per_side
+        self._time_per_side_increment = time_per_side_increment
+        self._answer_grace = answer_grace
+        self._lock = threading.Lock()
+        self._socket: Optional[socket.socket] = None
+        self._stopped = threading.Event()
+        self._players: List[_Player] = []
+        self._waiting: Dict[str, _Player] = {}
+        self._move_latency = LatencyHistogram()
+        self._statistics: Dict[str, int] = {"connections": 0, "logins": 0, "disconnects": 0, "matches": 0,
+                                            "running_matches": 0, "games": 0, "moves": 0}
+
+    @property
+    def address(self) -> str:
+        return self._address
+
+    @property
+    def port(self) -> int:
+        return self._port if self._socket is None else self._socket.getsockname()[1]
+
+    @property
+    def connection_parameters(self) -> Dict[str, Any]:
+        """
+        Parameters for j_chess_lib.communication.Connection to reach this server
+        """
+        return {"address": self._address, "port": self.port}
+
+    def start(self) -> "FakeServer":
+        self._socket = socket.create_server((self._address, self._port), backlog=1024)
+        threading.Thread(target=self._accept, daemon=True, name="FakeServer").start()
+        SYSTEM_LOGGER.info(f"Fake J-Chess server listening on {self._address}:{self.port}")
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._socket is not None:
+            self._socket.close()
+        with self._lock:
+            players, self._players = self._players, []
+            self._waiting.clear()
+        for player in players:
+            player.close()
+
+    def __enter__(self) -> "FakeServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def statistics(self) -> Dict[str, Any]:
+        """
+        Counters of the server and the time clients took to answer a move request, including the network
+        """
+        with self._lock:
+            return {**self._statistics, "move_latency": self._move_latency.summary()}
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._statistics[key] += amount
+
+    def _accept(self):
+        while not self._stopped.is_set():
+            try:
+                sock, address = self._socket.accept()
+            except OSError:
+                break
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            player = _Player(sock=sock, address=address)
+            with self._lock:
+                self._players.append(player)
+                self._statistics["connections"] += 1
+            threading.Thread(target=self._login, args=(player,), daemon=True, name="FakeServerLogin").start()
+
+    def _login(self, player: _Player):
+        try:
+            message = player.recv()
+            if message.message_type != JchessMessageType.LOGIN or message.login is None:
+                raise _PlayerGone(player, f"Expected a login not {message.message_type}")
+            player.name = message.login.name or "?"
+            player.tournament_code = message.login.tournament_code
+            player.send(JchessMessage(message_type=JchessMessageType.LOGIN_REPLY,
+                                      login_reply=LoginReplyMessage(new_id=player.player_id)))
+        except _PlayerGone as e:
+            self._drop(player, str(e))
+            return
+        self._count("logins")
+        self._enter_lobby(player)
+
+    def _drop(self, player: _Player, reason: str):
+        if not self._stopped.is_set():
+            SYSTEM_LOGGER.info(f"Fake server dropped {player.name}: {reason}")
+        player.close()
+        with self._lock:
+            if player in self._players:
+                self._players.remove(player)
+                self._statistics["disconnects"] += 1
+
+    def _enter_lobby(self, player: _Player):
+        code = player.tournament_code or QUICK_PLAY_LOBBY
+        with self._lock:
+            if self._stopped.is_set():
+                return
+            opponent = self._waiting.pop(code, None)
+            if opponent is None:
+                self._waiting[code] = player
+                return
+            self._statistics["matches"] += 1
+            self._statistics["running_matches"] += 1
+        threading.Thread(target=self._run_match, args=(opponent, player), daemon=True,
+                         name="FakeServerMatch").start()
+
+    def _run_match(self, first: _Player, second: _Player):
+        players = (first, second)
+        survivors = list(players)
+        try:
+            self._play_match(first, second)
+        except _PlayerGone as e:
+            survivors.remove(e.player)
+            self._drop(e.player, str(e))
+            for survivor in survivors:
+                try:
+                    self._finish_aborted(survivor, first=first, second=second)
+                except _PlayerGone as e2:
+                    survivors.remove(e2.player)
+                    self._drop(e2.player, str(e2))
+        finally:
+            self._count("running_matches", -1)
+        for player in survivors:
+            self._enter_lobby(player)
+
+    def _match_format(self) -> MatchFormatData:
+        return MatchFormatData(
+            match_type_value=MatchTypeValue.SCORE, match_type_data=MatchTypeScore(amount_to_play=self._games_per_match),
+            time_per_side=self._time_per_side, time_per_side_increment=self._time_per_side_increment,
+            time_per_side_per_move=0,
+        )
+
+    def _play_match(self, first: _Player, second: _Player):
+        match_id = str(uuid4())
+        match_format = self._match_format()
+        for player, enemy in ((first, second), (second, first)):
+            player.send(JchessMessage(message_type=JchessMessageType.MATCH_FOUND, match_found=MatchFoundMessage(
+                match_id=match_id, enemy_name=enemy.name, match_format=match_format)))
+        scores = {first: 0, second: 0}
+        for game in range(self._games_per_match):
+            white, black = (first, second) if game % 2 == 0 else (second, first)
+            winner = self._play_game(white=white, black=black)
+            if winner is None:
+                scores[first] += 1
+                scores[second] += 1
+            else:
+                scores[winner] += 2
+        status = MatchStatusData(name_player1=first.name, name_player2=second.name, score_player1=scores[first],
+                                 score_player2=scores[second])
+        for player in (first, second):
+            player.send(JchessMessage(message_type=JchessMessageType.MATCH_OVER, match_over=MatchOverMessage(
+                match_status=status, match_format=match_format, statistics="")))
+
+    def _finish_aborted(self, survivor: _Player, first: _Player, second: _Player):
+        survivor.send(JchessMessage(message_type=JchessMessageType.GAME_OVER, game_over=GameOverMessage(
+            winner=survivor.name, is_draw=False, pgn="")))
+        status = MatchStatusData(name_player1=first.name, name_player2=second.name,
+                                 score_player1=int(survivor is first), score_player2=int(survivor is second))
+        survivor.send(JchessMessage(message_type=JchessMessageType.MATCH_OVER, match_over=MatchOverMessage(
+            match_status=status, match_format=self._match_format(), statistics="")))
+
+    def _play_game(self, white: _Player, black: _Player) -> Optional[_Player]:
+        for player in (white, black):
+            player.send(JchessMessage(message_type=JchessMessageType.GAME_START,
+                                      game_start=GameStartMessage(name_white=white.name)))
+        position = Position.from_fen(START_FEN)
+        clocks = {white: self._time_per_side, black: self._time_per_side}
+        last_move: Optional[MoveData] = None
+        moves: List[str] = []
+        winner: Optional[_Player] = None
+        plies = 0
+        while plies < self._max_plies:
+            mover, enemy = (white, black) if position.white_turn else (black, white)
+            if self._move_delay > 0:
+                time.sleep(self._move_delay)
+            mover.send(JchessMessage(message_type=JchessMessageType.AWAIT_MOVE, await_move=AwaitMoveMessage(
+                position=position.fen(), last_move=last_move,
+                time_control=TimeControlData(your_time_in_ms=clocks[mover], enemy_time_in_ms=clocks[enemy]))))
+            start = time.perf_counter()
+            message = mover.recv(timeout=clocks[mover] / 1000 + self._answer_grace)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._move_latency.record(elapsed)
+                self._statistics["moves"] += 1
+            clocks[mover] -= int(elapsed * 1000)
+            if clocks[mover] < 0:
+                winner = enemy
+                break
+            clocks[mover] += self._time_per_side_increment
+            if message.message_type != JchessMessageType.MOVE or message.move is None or message.move.move is None:
+                winner = enemy
+                break
+            last_move = message.move.move
+            try:
+                position, captured = apply_move(position, last_move)
+            except IllegalMove as e:
+                SYSTEM_LOGGER.info(f"Fake server: {mover.name} made an illegal move: {e}")
+                winner = enemy
+                break
+            moves.append(f"{last_move.from_value}{'-' if captured == '' else 'x'}{last_move.to}")
+            plies += 1
+            if captured in ("K", "k"):
+                winner = mover
+                break
+        pgn = " ".join(f"{i // 2 + 1}. {x}" if i % 2 == 0 else x for i, x in enumerate(moves))
+        result = "1/2-1/2" if winner is None else ("1-0" if winner is white else "0-1")
+        for player in (white, black):
+            player.send(JchessMessage(message_type=JchessMessageType.GAME_OVER, game_over=GameOverMessage(
+                winner=None if winner is None else winner.name, is_draw=winner is None, pgn=f"{pgn} {result}")))
+        self._count("games")
+        return winner
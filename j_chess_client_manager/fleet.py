@@ -0,0 +1,176 @@
+"""Describe many clients in one file and start them at once."""
+import json
+import os
+from typing import Type, Any, Dict, Optional, List, NamedTuple, Tuple, Union, Callable
+from uuid import UUID, uuid4
+
+from j_chess_lib.ai import AI
+
+from j_chess_client_manager.clients import SuperProvider
+from j_chess_client_manager.clients.factory import THREAD_BACKEND, BACKENDS, start_client
+from j_chess_client_manager.logging import SYSTEM_LOGGER
+
+GENERATE_TOURNAMENT_CODE = "generate"
+REPLICA_PLACEHOLDER = "{replica}"
+
+
+class FleetError(ValueError):
+
+    def __init__(self, path: str, problems: List[str]):
+        super().__init__(f"Fleet file \"{path}\" is invalid:\n" + "\n".join(f"  - {x}" for x in problems))
+        self._problems = problems
+
+    @property
+    def problems(self) -> List[str]:
+        return self._problems
+
+
+class FleetClient(NamedTuple):
+    ai_class: Type[AI]
+    ai_parameters: Dict[str, Any]
+    connection_parameters: Dict[str, Any]
+    tournament_code: Optional[str]
+    replicas: int
+    backend: str = THREAD_BACKEND
+
+    def replica_parameters(self, replica: int) -> Dict[str, Any]:
+        return {
+            k: v.replace(REPLICA_PLACEHOLDER, str(replica)) if isinstance(v, str) else v
+            for k, v in self.ai_parameters.items()
+        }
+
+
+def _read_file(path: str) -> Dict[str, Any]:
+    if os.path.splitext(path)[1].lower() == ".toml":
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ImportError("Reading toml fleet files needs python 3.11 or the package \"tomli\"")
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _tournament_code(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    if value == GENERATE_TOURNAMENT_CODE:
+        return str(uuid4())
+    if UUID(value).version != 4:
+        raise ValueError(f"Tournament code \"{value}\" is no uuid4")
+    return value
+
+
+def load_fleet(path: str) -> List[FleetClient]:
+    """
+    Read and validate a fleet file. All entries are checked before anything is started.
+
+    The file is json or toml (.toml) and looks like this::
+
+        {
+            "connection": {"address": "localhost", "port": 5123},
+            "clients": [
+                {
+                    "ai": "to.your.package:YourAI",
+                    "parameters": {"name": "YourBot-{replica}"},
+                    "connection": {"port": 5124},
+                    "tournament_code": "generate",
+                    "replicas": 10,
+                    "backend": "process"
+                }
+            ]
+        }
+
+    The top level connection and backend are the default for all clients. "{replica}" in string parameters is
+    replaced by the number of the replica. The tournament code "generate" creates a new code shared by all replicas
+    of the entry. The backend is "thread" (default) or "process" to run every replica in its own worker process.
+
+    Parameters
+    ----------
+    path: str
+        Path to the fleet file
+
+    Returns
+    -------
+    Validated clients of the fleet
+    """
+    from j_chess_lib.communication import Connection
+    from j_chess_client_manager.clients.parameters import convert_parameters, check_parameters
+    from j_chess_client_manager.clients.registry import find_ai
+
+    try:
+        data = _read_file(path)
+    except (OSError, ValueError) as e:
+        raise FleetError(path=path, problems=[f"{type(e).__name__}: {e}"]) from e
+
+    if not isinstance(data, dict) or not isinstance(data.get("clients", None), list):
+        raise FleetError(path=path, problems=["The file needs a list called \"clients\""])
+
+    default_connection = data.get("connection", {})
+    default_backend = data.get("backend", THREAD_BACKEND)
+    problems: List[str] = []
+    ret: List[FleetClient] = []
+
+    for i, entry in enumerate(data["clients"]):
+        prefix = f"Client {i}"
+        if not isinstance(entry, dict) or "ai" not in entry:
+            problems.append(f"{prefix}: Needs at least the entry \"ai\"")
+            continue
+        try:
+            ai_class = find_ai(str(entry["ai"]))
+            prefix = f"Client {i} ({ai_class.__name__})"
+            ai_parameters = convert_parameters(ai_class, entry.get("parameters", {}))
+            connection_parameters = convert_parameters(Connection, {**default_connection,
+                                                                    **entry.get("connection", {})})
+            check_parameters(ai_class, ai_parameters)
+            check_parameters(Connection, connection_parameters)
+            tournament_code = _tournament_code(entry.get("tournament_code", None))
+            replicas = int(entry.get("replicas", 1))
+            if replicas < 1:
+                raise ValueError(f"Needs at least one replica not {replicas}")
+            backend = str(entry.get("backend", default_backend))
+            if backend not in BACKENDS:
+                raise ValueError(f"Unknown backend \"{backend}\". Use one of {', '.join(BACKENDS)}")
+        except (ValueError, TypeError, ImportError, AttributeError) as e:
+            problems.append(f"{prefix}: {e}")
+            continue
+        ret.append(FleetClient(ai_class=ai_class, ai_parameters=ai_parameters,
+                               connection_parameters=connection_parameters, tournament_code=tournament_code,
+                               replicas=replicas, backend=backend))
+
+    if len(problems) > 0:
+        raise FleetError(path=path, problems=problems)
+
+    SYSTEM_LOGGER.info(f"Loaded fleet \"{path}\" with {sum(x.replicas for x in ret)} clients")
+    return ret
+
+
+def start_fleet(
+    fleet: List[FleetClient], need_update: Callable[[Union[AI, SuperProvider]], None] = None
+) -> List[Tuple[Any, Union[AI, SuperProvider]]]:
+    """
+    Start all clients of a fleet
+
+    Parameters
+    ----------
+    fleet: List[FleetClient]
+        Clients loaded by load_fleet
+    need_update: Callable[[Union[AI, SuperProvider]], None]
+        Called whenever the state of a wrapped AI changed
+
+    Returns
+    -------
+    All started clients with the wrapped AI they are playing with
+    """
+    ret = []
+    for entry in fleet:
+        for replica in range(entry.replicas):
+            ret.append(start_client(ai_class=entry.ai_class, ai_parameters=entry.replica_parameters(replica),
+                                    connection_parameters=entry.connection_parameters,
+                                    tournament_code=entry.tournament_code, need_update=need_update,
+                                    backend=entry.backend))
+    return ret
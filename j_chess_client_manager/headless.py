@@ -0,0 +1,128 @@
+"""Run clients without the terminal UI."""
+import logging
+import sys
+from typing import Sequence, List, Dict, Optional, Callable
+
+from j_chess_lib.client import Client
+
+from j_chess_client_manager.clients import SuperProvider
+from j_chess_client_manager.clients.factory import THREAD_BACKEND
+from j_chess_client_manager.fleet import FleetClient, start_fleet
+from j_chess_client_manager.logging import SYSTEM_LOGGER, LOG_FORMAT, LOG_DATE_FORMAT, redirect_logs
+
+
+def setup_headless_logging(log_file: Optional[str] = None):
+    """
+    Redirect all logs to stdout or to a file
+
+    Parameters
+    ----------
+    log_file: Optional[str]
+        File the logs are appended to. None to log to stdout
+    """
+    handler = logging.StreamHandler(stream=sys.stdout) if log_file is None else logging.FileHandler(log_file)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT, "{"))
+    redirect_logs(handler)
+
+
+def parse_key_values(values: Sequence[str]) -> Dict[str, str]:
+    ret = {}
+    for value in values:
+        key, sep, raw = value.partition("=")
+        if len(sep) <= 0 or len(key) <= 0:
+            raise ValueError(f"\"{value}\" is not of the form KEY=VALUE")
+        ret[key.strip()] = raw
+    return ret
+
+
+def wait_for_clients(clients: Sequence[Client], poll_interval: float = 1.0) -> int:
+    """
+    Block until all clients stopped playing
+
+    Parameters
+    ----------
+    clients: Sequence[Client]
+        Clients to wait for
+    poll_interval: float
+        Seconds between checks so an interrupt is handled in time
+
+    Returns
+    -------
+    Exit code for the application
+    """
+    try:
+        for client in clients:
+            while client.is_alive():
+                client.join(timeout=poll_interval)
+    except KeyboardInterrupt:
+        SYSTEM_LOGGER.info(f"Interrupted. Stopping {sum(x.is_alive() for x in clients)} running clients")
+        return 1
+    SYSTEM_LOGGER.info(f"All {len(clients)} clients stopped")
+    return 0
+
+
+def fleet_from_arguments(
+    ai_name: str, ai_parameters: Sequence[str] = tuple(), connection_parameters: Sequence[str] = tuple(),
+    tournament_code: Optional[str] = None, count: int = 1, backend: str = THREAD_BACKEND
+) -> List[FleetClient]:
+    """
+    Build a fleet of equal clients from command line arguments
+
+    Parameters
+    ----------
+    ai_name: str
+        Name or import path of the AI class to play with
+    ai_parameters: Sequence[str]
+        Parameters for the AI in the form KEY=VALUE
+    connection_parameters: Sequence[str]
+        Parameters for the connection in the form KEY=VALUE
+    tournament_code: Optional[str]
+        Code of the tournament to join. None for quick play
+    count: int
+        Number of clients to start
+    backend: str
+        Backend the clients are played in
+
+    Returns
+    -------
+    Fleet with one entry
+    """
+    from j_chess_lib.communication import Connection
+    from j_chess_client_manager.clients.parameters import convert_parameters, check_parameters
+    from j_chess_client_manager.clients.registry import find_ai
+
+    ai_class = find_ai(ai_name)
+    converted_ai_parameters = convert_parameters(ai_class, parse_key_values(ai_parameters))
+    converted_connection_parameters = convert_parameters(Connection, parse_key_values(connection_parameters))
+    check_parameters(ai_class, converted_ai_parameters)
+    check_parameters(Connection, converted_connection_parameters)
+    return [FleetClient(
+        ai_class=ai_class,
+        ai_parameters=converted_ai_parameters,
+        connection_parameters=converted_connection_parameters,
+        tournament_code=tournament_code,
+        replicas=count,
+        backend=backend,
+    )]
+
+
+def run_headless(fleet: List[FleetClient], on_client_added: Callable[[SuperProvider], None] = None) -> int:
+    """
+    Start clients without any UI and wait for them to finish
+
+    Parameters
+    ----------
+    fleet: List[FleetClient]
+        Clients to start
+    on_client_added: Callable[[SuperProvider], None]
+        Called with every started client
+
+    Returns
+    -------
+    Exit code for the application
+    """
+    started = start_fleet(fleet)
+    if on_client_added is not None:
+        for _client, ai in started:
+            on_client_added(ai)
+    return wait_for_clients([client for client, _ai in started])
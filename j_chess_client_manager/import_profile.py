@@ -0,0 +1,151 @@
+"""Measure the time spent importing modules, e.g. to see what the manager spends its start on."""
+import sys
+import threading
+import time
+from importlib.abc import MetaPathFinder
+from typing import Dict, List, NamedTuple, Optional
+
+
+class ImportTime(NamedTuple):
+    name: str
+    # Seconds spent executing the module itself
+    self_time: float
+    # Seconds including the modules it imported
+    cumulative: float
+    depth: int
+
+
+class _TimedLoader:
+    # Stands in for the real loader while the module executes and hands it back afterwards
+
+    def __init__(self, profiler: "ImportProfiler", loader):
+        self._profiler = profiler
+        self._loader = loader
+
+    def __getattr__(self, item):
+        return getattr(self._loader, item)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        spec = module.__spec__
+        self._profiler._enter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(spec.name)
+            spec.loader = self._loader
+            if getattr(module, "__loader__", None) is self:
+                module.__loader__ = self._loader
+
+
+class ImportProfiler(MetaPathFinder):
+    """
+    Times every module imported between start and stop, by the thread that started the profiler. Modules that were
+    imported before the start are not seen
+    """
+
+    def __init__(self):
+        self._thread: Optional[int] = None
+        self._stack: List[List[float]] = []
+        self._times: List[ImportTime] = []
+        self._finding = set()
+        self._start = 0.0
+        self._end: Optional[float] = None
+
+    def start(self) -> "ImportProfiler":
+        self._thread = threading.get_ident()
+        self._start = time.perf_counter()
+        self._end = None
+        sys.meta_path.insert(0, self)
+        return self
+
+    def stop(self) -> "ImportProfiler":
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+            self._end = time.perf_counter()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def find_spec(self, fullname, path, target=None):
+        if threading.get_ident() != self._thread or fullname in self._finding:
+            return None
+        self._finding.add(fullname)
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding.discard(fullname)
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(self, spec.loader)
+        return spec
+
+    def _enter(self):
+        # [start, time of the imported children]
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def _leave(self, name: str):
+        start, children = self._stack.pop()
+        cumulative = time.perf_counter() - start
+        self._times.append(ImportTime(name=name, self_time=cumulative - children, cumulative=cumulative,
+                                      depth=len(self._stack)))
+        if len(self._stack) > 0:
+            self._stack[-1][1] += cumulative
+
+    def times(self) -> List[ImportTime]:
+        """
+        Import times in the order the imports finished
+        """
+        return list(self._times)
+
+    def total(self) -> float:
+        """
+        Seconds between start and stop, imports or not
+        """
+        return (time.perf_counter() if self._end is None else self._end) - self._start
+
+    def packages(self) -> Dict[str, float]:
+        """
+        Seconds spent executing the modules of every top level package
+        """
+        ret: Dict[str, float] = {}
+        for entry in self._times:
+            package = entry.name.partition(".")[0]
+            ret[package] = ret.get(package, 0.0) + entry.self_time
+        return ret
+
+    def report(self, limit: int = 25) -> str:
+        """
+        Readable breakdown of the import times, slowest first
+
+        Parameters
+        ----------
+        limit: int
+            Maximum number of modules listed
+
+        Returns
+        -------
+        The breakdown with one line per module and per package
+        """
+        total = self.total()
+        imports = sum(x.self_time for x in self._times)
+        lines = [f"Startup took {total * 1000:.1f}ms, {imports * 1000:.1f}ms of it importing {len(self._times)} "
+                 f"modules", "", f"{'self [ms]':>10s} {'cumulative [ms]':>16s}  module"]
+        for entry in sorted(self._times, key=lambda x: x.cumulative, reverse=True)[:limit]:
+            lines.append(f"{entry.self_time * 1000:10.1f} {entry.cumulative * 1000:16.1f}  {entry.name}")
+        lines.extend(["", f"{'self [ms]':>10s}  package"])
+        for package, seconds in sorted(self.packages().items(), key=lambda x: x[1], reverse=True):
+            lines.append(f"{seconds * 1000:10.1f}  {package}")
+        return "\n".join(lines)
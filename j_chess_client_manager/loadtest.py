@@ -0,0 +1,298 @@
+"""Load-test the manager by letting many wrapped AIs play against the bundled fake server."""
+import _thread
+import argparse
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type
+
+from j_chess_lib.ai import AI
+
+from j_chess_client_manager.clients import SuperProvider
+from j_chess_client_manager.clients.factory import THREAD_BACKEND, BACKENDS
+from j_chess_client_manager.clients.latency import format_duration
+from j_chess_client_manager.fake_server import FakeServer
+from j_chess_client_manager.fleet import FleetClient, start_fleet
+from j_chess_client_manager.logging import SYSTEM_LOGGER
+
+
+def resident_memory() -> int:
+    """
+    Resident memory of this process in bytes. Falls back to the peak if the current value is unknown
+    """
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return 0
+
+
+def _format_bytes(value: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if abs(value) < 1024:
+            return f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}GiB"
+
+
+class LoadTestReport(NamedTuple):
+    clients: int
+    seconds: float
+    moves: int
+    games: int
+    matches: int
+    disconnects: int
+    move_latency: Dict[str, float]
+    client_moves: int
+    mean_overhead: float
+    frame_times: Optional[Dict[str, float]]
+    memory_start: int
+    memory_end: int
+    # Checks of moves done by clients in threads of the manager and their total and longest time in seconds
+    validation: Optional[Tuple[int, float, float]] = None
+
+    @property
+    def moves_per_second(self) -> float:
+        return self.moves / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def memory_growth(self) -> int:
+        return self.memory_end - self.memory_start
+
+    def describe(self) -> str:
+        lines = [
+            f"Clients:            {self.clients} for {self.seconds:.1f}s",
+            f"Server:             {self.moves} moves, {self.games} games, {self.matches} matches, "
+            f"{self.disconnects} disconnects",
+            f"Throughput:         {self.moves_per_second:.1f} moves/s",
+            f"Move round trip:    mean {format_duration(self.move_latency['mean'])}, "
+            f"p50 {format_duration(self.move_latency['p50'])}, p99 {format_duration(self.move_latency['p99'])}, "
+            f"max {format_duration(self.move_latency['max'])}",
+            f"Wrapper overhead:   mean {format_duration(self.mean_overhead)} over {self.client_moves} moves",
+        ]
+        if self.frame_times is not None:
+            lines.append(f"UI frame time:      mean {format_duration(self.frame_times['mean'])}, "
+                         f"p99 {format_duration(self.frame_times['p99'])}, max "
+                         f"{format_duration(self.frame_times['max'])} over {int(self.frame_times['count'])} frames")
+        if self.validation is not None and self.validation[0] > 0:
+            checks, total, longest = self.validation
+            lines.append(f"Move validation:    mean {format_duration(total / checks)}, max {format_duration(longest)} "
+                         f"over {checks} checks")
+        lines.append(f"Memory:             {_format_bytes(self.memory_start)} -> {_format_bytes(self.memory_end)} "
+                     f"({'+' if self.memory_growth >= 0 else ''}{_format_bytes(self.memory_growth)})")
+        return "\n".join(lines)
+
+
+class LoadTest:
+    """
+    Starts a fake server and clients playing against it. The clients are started like a fleet, so they are wrapped
+    and reported exactly like clients playing on a real server
+    """
+
+    def __init__(self, server: FakeServer, ai_class: Type[AI], clients: int = 100,
+                 ai_parameters: Optional[Dict[str, Any]] = None, tournament_code: Optional[str] = None,
+                 backend: str = THREAD_BACKEND):
+        if clients < 2:
+            raise ValueError(f"A load test needs at least two clients not {clients}")
+        self._server = server
+        self._fleet = FleetClient(
+            ai_class=ai_class, ai_parameters={"name": "LoadTest-{replica}", **(ai_parameters or {})},
+            connection_parameters={}, tournament_code=tournament_code, replicas=clients, backend=backend,
+        )
+        self._clients: List[SuperProvider] = []
+        self._start: Optional[float] = None
+        self._memory_start = 0
+
+    @property
+    def server(self) -> FakeServer:
+        return self._server
+
+    @property
+    def clients(self) -> List[SuperProvider]:
+        return self._clients
+
+    def start(self, need_update=None) -> List[SuperProvider]:
+        """
+        Start the server and all clients
+
+        Parameters
+        ----------
+        need_update: Callable[[Union[AI, SuperProvider]], None]
+            Called whenever the state of a client changed, e.g. RedrawScheduler.notify
+
+        Returns
+        -------
+        The started clients
+        """
+        self._memory_start = resident_memory()
+        self._server.start()
+        fleet = [self._fleet._replace(connection_parameters=self._server.connection_parameters)]
+        self._clients = [ai for _client, ai in start_fleet(fleet=fleet, need_update=need_update)]
+        self._start = time.monotonic()
+        return self._clients
+
+    def report(self, frame_times: Optional[Dict[str, float]] = None) -> LoadTestReport:
+        statistics = self._server.statistics()
+        snapshots = [x.snapshot for x in self._clients if x.snapshot is not None]
+        client_moves = sum(x.overhead["count"] for x in snapshots)
+        overhead = sum(x.overhead["sum"] for x in snapshots)
+        validations = [x.validation.timings for x in self._clients if getattr(x, "validation", None) is not None]
+        validation = None if len(validations) <= 0 else \
+            (sum(x.count for x in validations), sum(x.total for x in validations), max(x.max for x in validations))
+        return LoadTestReport(
+            clients=len(self._clients), seconds=0.0 if self._start is None else time.monotonic() - self._start,
+            moves=statistics["moves"], games=statistics["games"], matches=statistics["matches"],
+            disconnects=statistics["disconnects"], move_latency=statistics["move_latency"],
+            client_moves=int(client_moves), mean_overhead=overhead / client_moves if client_moves > 0 else 0.0,
+            frame_times=frame_times, memory_start=self._memory_start, memory_end=resident_memory(),
+            validation=validation,
+        )
+
+    def stop(self):
+        self._server.stop()
+
+
+def _run_headless(load_test: LoadTest, duration: float, interval: float) -> LoadTestReport:
+    load_test.start()
+    end = time.monotonic() + duration
+    last_moves, last_time = 0, time.monotonic()
+    try:
+        while time.monotonic() < end:
+            time.sleep(max(0.0, min(interval, end - time.monotonic())))
+            report = load_test.report()
+            now = time.monotonic()
+            print(f"[{report.seconds:6.1f}s] {(report.moves - last_moves) / (now - last_time):8.1f} moves/s, "
+                  f"{report.games} games, memory {_format_bytes(report.memory_end)}", flush=True)
+            last_moves, last_time = report.moves, now
+    except KeyboardInterrupt:
+        pass
+    return load_test.report()
+
+
+def _run_with_ui(load_test: LoadTest, duration: float, scheduler, theme: str) -> LoadTestReport:
+    from asciimatics.screen import Screen
+    from asciimatics.exceptions import ResizeScreenError
+    from j_chess_client_manager.clients.standings import TournamentStandings
+    from j_chess_client_manager.ui import run_function_creator, create_client_manager
+
+    standings = TournamentStandings()
+    scheduler.add_listener(standings.update)
+    manager = create_client_manager(scheduler=scheduler, standings=standings,
+                                    clients=load_test.start(need_update=scheduler.notify))
+    timer = threading.Timer(duration, _thread.interrupt_main)
+    timer.daemon = True
+    timer.start()
+    last_scene = None
+    try:
+        while True:
+            try:
+                Screen.wrapper(run_function_creator(start_scene=last_scene, scheduler=scheduler, standings=standings,
+                                                    manager=manager, theme=theme), catch_interrupt=False)
+                break
+            except ResizeScreenError as e:
+                last_scene = e.scene
+    except KeyboardInterrupt:
+        pass
+    timer.cancel()
+    return load_test.report(frame_times=scheduler.frame_times())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="j_chess_loadtest",
+                                     description="Let many clients play against a local fake J-Chess server and "
+                                                 "report the throughput and resource use of the manager")
+    parser.add_argument("--clients", dest="clients", type=int, required=False, default=100,
+                        help="Number of clients started [Default: 100]")
+    parser.add_argument("--duration", dest="duration", type=float, required=False, default=30,
+                        help="Seconds the test runs [Default: 30]")
+    parser.add_argument("--ai", dest="ai", type=str, required=False, default="Random",
+                        help="Name or import path of the AI the clients play with [Default: \"Random\"]")
+    parser.add_argument("--ai-parameter", dest="ai_parameters", type=str, nargs="+", required=False,
+                        default=tuple(), metavar="KEY=VALUE", help="Parameters passed to the AI")
+    parser.add_argument("--backend", dest="backend", choices=BACKENDS, required=False, default=THREAD_BACKEND,
+                        help=f"Backend the clients are played in [Default: \"{THREAD_BACKEND}\"]")
+    parser.add_argument("--move-delay", dest="move_delay", type=float, required=False, default=0.0,
+                        help="Seconds the server waits before asking for a move [Default: 0]")
+    parser.add_argument("--max-plies", dest="max_plies", type=int, required=False, default=80,
+                        help="Half moves after which a game is a draw [Default: 80]")
+    parser.add_argument("--games-per-match", dest="games_per_match", type=int, required=False, default=2,
+                        help="Games per match [Default: 2]")
+    parser.add_argument("--time-per-side", dest="time_per_side", type=int, required=False, default=60000,
+                        help="Clock of each side in milliseconds [Default: 60000]")
+    parser.add_argument("--port", dest="port", type=int, required=False, default=0,
+                        help="Port of the fake server [Default: any free port]")
+    parser.add_argument("--move-cache", dest="move_cache", action="store_true",
+                        help="Let the clients use the move cache")
+    parser.add_argument("--ponder", dest="ponder", action="store_true",
+                        help="Let the clients ponder on the time of their opponent")
+    parser.add_argument("--validate-moves", dest="validate_moves", action="store_true",
+                        help="Let the clients check their moves before sending them")
+    parser.add_argument("--ui", dest="ui", action="store_true",
+                        help="Show the manager while the test runs to also measure the frame time of the UI")
+    parser.add_argument("--max-fps", dest="max_fps", type=float, required=False, default=10,
+                        help="Maximum number of repaints per second of the UI [Default: 10]")
+    parser.add_argument("--report-interval", dest="report_interval", type=float, required=False, default=5,
+                        help="Seconds between progress reports without UI [Default: 5]")
+    parser.add_argument("--log-file", dest="log_file", type=str, required=False, default=os.devnull,
+                        help="File the logs of the clients are written to [Default: discarded]")
+    args = parser.parse_args(argv)
+
+    from j_chess_client_manager import log_versions
+    from j_chess_client_manager.headless import parse_key_values, setup_headless_logging
+    from j_chess_client_manager.clients.parameters import convert_parameters
+    from j_chess_client_manager.clients.registry import find_ai
+
+    try:
+        ai_class = find_ai(args.ai)
+        ai_parameters = convert_parameters(ai_class, parse_key_values(args.ai_parameters))
+        load_test = LoadTest(
+            server=FakeServer(port=args.port, games_per_match=args.games_per_match, max_plies=args.max_plies,
+                              move_delay=args.move_delay, time_per_side=args.time_per_side),
+            ai_class=ai_class, clients=args.clients, ai_parameters=ai_parameters, backend=args.backend,
+        )
+        scheduler = None
+        if args.ui:
+            from j_chess_client_manager.ui.scheduler import RedrawScheduler
+            scheduler = RedrawScheduler(max_fps=args.max_fps)
+    except (ValueError, ImportError) as e:
+        parser.error(str(e))
+        return 2
+
+    if args.move_cache:
+        from j_chess_client_manager.clients.move_cache import get_move_cache
+        get_move_cache().configure(enabled=True)
+    if args.ponder:
+        from j_chess_client_manager.clients.ponder import get_ponderer
+        get_ponderer().configure(enabled=True)
+    if args.validate_moves:
+        from j_chess_client_manager.clients.validation import get_move_validator
+        get_move_validator().configure(enabled=True)
+    if not args.ui:
+        setup_headless_logging(log_file=args.log_file)
+    log_versions()
+    SYSTEM_LOGGER.info(f"Load test with {args.clients} clients of {ai_class.__name__} for {args.duration}s")
+    try:
+        if args.ui:
+            from asciimatics.widgets.utilities import THEMES
+            report = _run_with_ui(load_test, duration=args.duration, scheduler=scheduler,
+                                  theme=list(THEMES.keys())[0])
+        else:
+            report = _run_headless(load_test, duration=args.duration, interval=args.report_interval)
+    except OSError as e:
+        SYSTEM_LOGGER.error(f"Could not run the load test: {e}")
+        load_test.stop()
+        return 2
+    # The server is left running, closing it would make every client thread report its lost connection
+    print(report.describe())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,10 +2,15 @@ import logging
 from logging import LogRecord
 from logging.handlers import QueueHandler
 import queue
-from typing import Tuple
+import threading
+from collections import Counter
+from typing import Tuple, Optional, List, Dict
 
 from j_chess_lib import logger as _lib_logger
 
+from .sink import RotatingLogSink
+from .store import LogStore
+
 _lib_logger.handlers = []
 
 
@@ -15,11 +20,84 @@ class _CustomQueueHandler(QueueHandler):
         super().__init__(log_queue)
         self._code = code
 
+    @property
+    def code(self) -> str:
+        return self._code
+
     def enqueue(self, record: LogRecord) -> None:
         self.queue.put((self._code, record))
+        _emitted(self._code, record)
+
+
+class _CodeForwardingHandler(logging.Handler):
+
+    def __init__(self, code: str, target: logging.Handler):
+        super().__init__()
+        self._code = code
+        self._target = target
+
+    @property
+    def code(self) -> str:
+        return self._code
+
+    def emit(self, record: LogRecord) -> None:
+        record.code = self._code
+        self._target.handle(record)
+        _emitted(self._code, record)
 
 
 LOG_QUEUE = queue.Queue()
+LOG_STORE = LogStore()
+LOG_FORMAT = '{asctime} [{code:^4s}-{levelname:^8s}] - {message}'
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_LOG_TARGET: Optional[logging.Handler] = None
+_LOG_SINKS: List[RotatingLogSink] = []
+_LOG_COUNTS: Counter = Counter()
+_LOG_COUNTS_LOCK = threading.Lock()
+
+
+def log_counts() -> Dict[str, int]:
+    """
+    Number of records logged per code since the start, regardless of where they were sent to
+    """
+    with _LOG_COUNTS_LOCK:
+        return dict(_LOG_COUNTS)
+
+
+def _emitted(code: str, record: LogRecord):
+    with _LOG_COUNTS_LOCK:
+        _LOG_COUNTS[code] += 1
+    for sink in _LOG_SINKS:
+        sink.put(code, record)
+
+
+def add_log_sink(directory: str, max_bytes: int = 64 * 1024 * 1024, max_segments: int = 16) -> RotatingLogSink:
+    """
+    Additionally write all logs to rotating segments on disk so they survive the manager.
+    They can be read with the viewer in j_chess_client_manager.logging.viewer
+
+    Parameters
+    ----------
+    directory: str
+        Directory the segments are written to. Created if it does not exist
+    max_bytes: int
+        Size of a segment after which a new one is started
+    max_segments: int
+        Number of segments kept. The oldest ones are deleted
+
+    Returns
+    -------
+    The new sink
+    """
+    sink = RotatingLogSink(directory=directory, max_bytes=max_bytes, max_segments=max_segments)
+    # Records logged before the sink existed and not yet displayed are written too
+    with LOG_QUEUE.mutex:
+        pending = list(LOG_QUEUE.queue)
+    for code, record in pending:
+        sink.put(code, record)
+    _LOG_SINKS.append(sink)
+    return sink
 
 
 def get_log_handler(code: str) -> logging.Handler:
@@ -35,11 +113,64 @@ def get_log_handler(code: str) -> logging.Handler:
     -------
     New handler
     """
-    new_handler = _CustomQueueHandler(code=code, log_queue=LOG_QUEUE)
+    if _LOG_TARGET is None:
+        new_handler = _CustomQueueHandler(code=code, log_queue=LOG_QUEUE)
+    else:
+        new_handler = _CodeForwardingHandler(code=code, target=_LOG_TARGET)
     new_handler.setLevel(logging.INFO)
     return new_handler
 
 
+def dispatch_record(code: str, record: LogRecord):
+    """
+    Pass on a record that was created elsewhere, e.g. in a worker process, as if it was logged by a handler with the
+    given code
+
+    Parameters
+    ----------
+    code: str
+        Symbols to identify the origin of the record
+    record: LogRecord
+        Record to pass on
+    """
+    if _LOG_TARGET is None:
+        LOG_QUEUE.put((code, record))
+    else:
+        record.code = code
+        _LOG_TARGET.handle(record)
+    _emitted(code, record)
+
+
+def redirect_logs(target: logging.Handler):
+    """
+    Send all logs to the given handler instead of the log queue displayed in the UI.
+    Handlers that were already created by get_log_handler are replaced on their loggers and records still waiting
+    in the log queue are passed on.
+
+    Parameters
+    ----------
+    target: logging.Handler
+        Handler that should receive all records. Its formatter gets the attribute "code" of every record
+    """
+    global _LOG_TARGET
+    _LOG_TARGET = target
+    for logger in [logging.getLogger(x) for x in list(logging.Logger.manager.loggerDict.keys())]:
+        if not isinstance(logger, logging.Logger):
+            continue
+        for handler in list(logger.handlers):
+            if isinstance(handler, (_CustomQueueHandler, _CodeForwardingHandler)):
+                logger.removeHandler(handler)
+                logger.addHandler(get_log_handler(handler.code))
+                logger.propagate = False
+    while not LOG_QUEUE.empty():
+        try:
+            code, record = LOG_QUEUE.get_nowait()
+        except queue.Empty:
+            break
+        record.code = code
+        target.handle(record)
+
+
 _lib_logger.addHandler(get_log_handler("LIB"))
 _lib_logger.setLevel(logging.DEBUG)
 
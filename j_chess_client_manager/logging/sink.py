@@ -0,0 +1,113 @@
+import atexit
+import json
+import os
+import queue
+import re
+import threading
+from logging import LogRecord
+from typing import Optional, List, Tuple, IO
+
+SEGMENT_PATTERN = re.compile(r"^log-(\d+)\.ndjson$")
+
+
+def segment_name(index: int) -> str:
+    return f"log-{index:06d}.ndjson"
+
+
+def list_segments(directory: str) -> List[Tuple[int, str]]:
+    """
+    All log segments in a directory as (index, path) ordered from old to new
+    """
+    ret = []
+    for name in os.listdir(directory):
+        match = SEGMENT_PATTERN.match(name)
+        if match is not None:
+            ret.append((int(match.group(1)), os.path.join(directory, name)))
+    return sorted(ret)
+
+
+def record_to_json(code: str, record: LogRecord) -> str:
+    message = getattr(record, "message", None)
+    if message is None:
+        message = record.getMessage()
+    return json.dumps({"t": record.created, "c": code, "l": record.levelname, "n": record.name, "m": message},
+                      ensure_ascii=False, separators=(",", ":"))
+
+
+class RotatingLogSink:
+    """
+    Writes log records as newline delimited json into a directory of segments. Records are handed to a writer thread
+    that writes them in batches. A new segment is started when the current one exceeds max_bytes and the oldest
+    segments are deleted when there are more than max_segments.
+    """
+
+    _STOP = object()
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024, max_segments: int = 16,
+                 batch_size: int = 512):
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._max_segments = max_segments
+        self._batch_size = batch_size
+        self._queue: queue.Queue = queue.Queue()
+        segments = list_segments(directory)
+        self._index = segments[-1][0] + 1 if len(segments) > 0 else 0
+        self._file: Optional[IO[bytes]] = None
+        self._written = 0
+        self._thread = threading.Thread(target=self._run, daemon=True, name="LogSinkWriter")
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def written(self) -> int:
+        return self._written
+
+    def put(self, code: str, record: LogRecord):
+        self._queue.put((code, record))
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+    def _open_segment(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = open(os.path.join(self._directory, segment_name(self._index)), "ab")
+        self._index += 1
+        segments = list_segments(self._directory)
+        for _, path in segments[:max(0, len(segments) - self._max_segments)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _write(self, batch: List[Tuple[str, LogRecord]]):
+        data = "".join(f"{record_to_json(code, record)}\n" for code, record in batch).encode("utf-8")
+        if self._file is None or self._file.tell() + len(data) > self._max_bytes:
+            self._open_segment()
+        self._file.write(data)
+        self._file.flush()
+        self._written += len(batch)
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is self._STOP:
+                stop = True
+                batch = batch[:-1]
+            if len(batch) > 0:
+                self._write(batch)
+        if self._file is not None:
+            self._file.close()
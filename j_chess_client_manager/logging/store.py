@@ -0,0 +1,197 @@
+import heapq
+import queue
+import threading
+import time
+from collections import deque, Counter
+from itertools import islice
+from logging import LogRecord
+from operator import itemgetter
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+_Entry = Tuple[int, str, LogRecord]
+
+
+class LogStore:
+    """
+    Ring buffer for log records with secondary indexes per code and per level. Appending, evicting and reading the
+    newest records do not depend on the number of stored records.
+    """
+
+    def __init__(self, capacity: int = 100000, max_age: Optional[float] = None):
+        if capacity < 1:
+            raise ValueError(f"Capacity has to be at least 1 not {capacity}")
+        self._capacity = capacity
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._records: Deque[_Entry] = deque()
+        self._by_code: Dict[str, Deque[_Entry]] = {}
+        self._by_level: Dict[int, Deque[_Entry]] = {}
+        self._received: Counter = Counter()
+        self._next_seq = 0
+        self._evicted = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def max_age(self) -> Optional[float]:
+        return self._max_age
+
+    @property
+    def evicted(self) -> int:
+        return self._evicted
+
+    @property
+    def last_seq(self) -> int:
+        """
+        Sequence number of the newest record. Changes whenever a record was added
+        """
+        return self._next_seq - 1
+
+    def configure(self, capacity: Optional[int] = None, max_age: Optional[float] = None):
+        """
+        Change the retention of the store. Records exceeding the new limits are evicted right away
+
+        Parameters
+        ----------
+        capacity: Optional[int]
+            Maximum number of stored records. None to keep the current one
+        max_age: Optional[float]
+            Maximum age of stored records in seconds. None to keep records regardless of their age
+        """
+        with self._lock:
+            if capacity is not None:
+                if capacity < 1:
+                    raise ValueError(f"Capacity has to be at least 1 not {capacity}")
+                self._capacity = capacity
+            self._max_age = max_age
+            self._evict()
+
+    def __len__(self):
+        return len(self._records)
+
+    def append(self, code: str, record: LogRecord):
+        with self._lock:
+            entry = (self._next_seq, code, record)
+            self._next_seq += 1
+            self._records.append(entry)
+            self._by_code.setdefault(code, deque()).append(entry)
+            self._by_level.setdefault(record.levelno, deque()).append(entry)
+            self._received[code] += 1
+            self._evict()
+
+    def drain(self, log_queue: queue.Queue) -> int:
+        """
+        Move all records waiting in the queue to the store
+
+        Returns
+        -------
+        Number of records added
+        """
+        count = 0
+        while True:
+            try:
+                code, record = log_queue.get_nowait()
+            except queue.Empty:
+                return count
+            self.append(code=code, record=record)
+            count += 1
+
+    def _evict(self):
+        records = self._records
+        oldest = None if self._max_age is None else time.time() - self._max_age
+        while len(records) > 0 and (len(records) > self._capacity or
+                                    (oldest is not None and records[0][2].created < oldest)):
+            entry = records.popleft()
+            _, code, record = entry
+            # Records are evicted in the order they were added so they are also the oldest in their indexes
+            by_code = self._by_code[code]
+            by_code.popleft()
+            if len(by_code) <= 0:
+                del self._by_code[code]
+            by_level = self._by_level[record.levelno]
+            by_level.popleft()
+            if len(by_level) <= 0:
+                del self._by_level[record.levelno]
+            self._evicted += 1
+
+    def tail(self, n: int, *codes: str, level: Optional[int] = None) -> List[Tuple[str, LogRecord]]:
+        """
+        Get the newest records
+
+        Parameters
+        ----------
+        n: int
+            Maximum number of records
+        codes: str
+            Only return records of these codes. All records if none given
+        level: Optional[int]
+            Only return records of exactly this level
+
+        Returns
+        -------
+        Up to n records as (code, record) ordered from old to new
+        """
+        return [(code, record) for _, code, record in self.tail_entries(n, *codes, level=level)]
+
+    def tail_entries(self, n: int, *codes: str, level: Optional[int] = None) -> List[_Entry]:
+        """
+        Like tail but every record comes with its sequence number that identifies it in the store
+
+        Parameters
+        ----------
+        n: int
+            Maximum number of records
+        codes: str
+            Only return records of these codes. All records if none given
+        level: Optional[int]
+            Only return records of exactly this level
+
+        Returns
+        -------
+        Up to n records as (sequence number, code, record) ordered from old to new
+        """
+        if n <= 0:
+            return []
+        with self._lock:
+            if len(codes) > 0:
+                sources = [self._by_code[x] for x in set(codes) if x in self._by_code]
+            elif level is not None:
+                sources = [self._by_level.get(level, deque())]
+                level = None
+            else:
+                sources = [self._records]
+            if len(sources) == 1:
+                entries = reversed(sources[0])
+            else:
+                entries = heapq.merge(*(reversed(x) for x in sources), key=itemgetter(0), reverse=True)
+            if level is not None:
+                entries = (x for x in entries if x[2].levelno == level)
+            ret = list(islice(entries, n))
+        ret.reverse()
+        return ret
+
+    def count(self, *codes: str, level: Optional[int] = None) -> int:
+        """
+        Number of stored records of the given codes or level. All stored records if nothing is given
+        """
+        if len(codes) > 0:
+            return sum(len(self._by_code.get(x, ())) for x in set(codes))
+        if level is not None:
+            return len(self._by_level.get(level, ()))
+        return len(self._records)
+
+    def received(self, code: Optional[str] = None) -> int:
+        """
+        Number of records ever added for a code, including evicted ones. All codes if None
+        """
+        if code is None:
+            return sum(self._received.values())
+        return self._received[code]
+
+    def codes(self) -> Set[str]:
+        return set(self._by_code.keys())
+
+    def levels(self) -> Set[int]:
+        return set(self._by_level.keys())
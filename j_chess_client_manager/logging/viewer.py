@@ -0,0 +1,190 @@
+"""Page through log segments written by the rotating log sink without loading them into memory."""
+import argparse
+import json
+import mmap
+import sys
+from array import array
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Iterator
+
+from j_chess_client_manager.logging.sink import list_segments
+
+
+class LogSegment:
+    """
+    One memory mapped segment. The offsets of its lines are indexed on first access, the lines themselves are only
+    read when requested
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._offsets: Optional[array] = None
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _index(self) -> array:
+        if self._offsets is None:
+            self._file = open(self._path, "rb")
+            offsets = array("Q", [0])
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can not be mapped
+                self._map = None
+            if self._map is not None:
+                # Only complete lines are indexed so a partially written last line is ignored
+                find, pos = self._map.find, 0
+                while True:
+                    pos = find(b"\n", pos)
+                    if pos < 0:
+                        break
+                    pos += 1
+                    offsets.append(pos)
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self):
+        return len(self._index()) - 1
+
+    def raw(self, i: int) -> bytes:
+        offsets = self._index()
+        return self._map[offsets[i]:offsets[i + 1] - 1]
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._offsets = None
+
+
+class LogArchive:
+    """
+    All segments of a sink directory as one sequence of records ordered from old to new. Only the segments that are
+    actually accessed get indexed, so reading the newest records of a large archive stays cheap
+    """
+
+    def __init__(self, directory: str):
+        self._segments = [LogSegment(path) for _, path in list_segments(directory)]
+
+    def __len__(self):
+        return sum(len(x) for x in self._segments)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        for segment in self._segments:
+            segment.close()
+
+    def _iter_raw(self, start: int) -> Iterator[bytes]:
+        for segment in self._segments:
+            length = len(segment)
+            if start >= length:
+                start -= length
+                continue
+            for i in range(start, length):
+                yield segment.raw(i)
+            start = 0
+
+    def _iter_raw_reversed(self) -> Iterator[bytes]:
+        for segment in reversed(self._segments):
+            for i in range(len(segment) - 1, -1, -1):
+                yield segment.raw(i)
+
+    def page(self, start: int, count: int, *codes: str) -> List[Dict[str, Any]]:
+        """
+        Records starting at the given position
+
+        Parameters
+        ----------
+        start: int
+            Position of the first record. When filtering by codes the position counts only matching records
+        count: int
+            Maximum number of records
+        codes: str
+            Only return records of these codes. All records if none given
+
+        Returns
+        -------
+        Up to count records ordered from old to new
+        """
+        ret = []
+        if count <= 0:
+            return ret
+        if len(codes) <= 0:
+            entries = (json.loads(x) for x in self._iter_raw(start))
+        else:
+            entries = (x for x in (json.loads(x) for x in self._iter_raw(0)) if x["c"] in codes)
+            for _ in zip(range(start), entries):
+                pass
+        for entry in entries:
+            ret.append(entry)
+            if len(ret) >= count:
+                break
+        return ret
+
+    def tail(self, count: int, *codes: str) -> List[Dict[str, Any]]:
+        """
+        The newest records. Only the segments needed to find them are read
+
+        Returns
+        -------
+        Up to count records ordered from old to new
+        """
+        ret = []
+        if count <= 0:
+            return ret
+        for raw in self._iter_raw_reversed():
+            entry = json.loads(raw)
+            if len(codes) <= 0 or entry["c"] in codes:
+                ret.append(entry)
+                if len(ret) >= count:
+                    break
+        ret.reverse()
+        return ret
+
+
+def format_entry(entry: Dict[str, Any]) -> str:
+    asctime = datetime.fromtimestamp(entry["t"]).strftime("%Y-%m-%d %H:%M:%S")
+    return f"{asctime} [{entry['c']:^4s}-{entry['l']:^8s}] - {entry['m']}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="j_chess_log_viewer",
+                                     description="Page through logs written by j_chess_client_manager --log-dir")
+    parser.add_argument("directory", type=str, help="Directory the log segments were written to")
+    parser.add_argument("--start", dest="start", type=int, required=False, default=None,
+                        help="Position of the first record shown. Shows the newest records if not set")
+    parser.add_argument("--count", dest="count", type=int, required=False, default=50,
+                        help="Number of records shown [Default: 50]")
+    parser.add_argument("--code", dest="codes", type=str, nargs="+", required=False, default=tuple(),
+                        help="Only show records of these codes")
+    parser.add_argument("--total", dest="total", action="store_true", help="Print the number of stored records")
+
+    args = parser.parse_args(argv)
+
+    with LogArchive(args.directory) as archive:
+        if args.total:
+            print(len(archive))
+            return 0
+        if args.start is None:
+            entries = archive.tail(args.count, *args.codes)
+        else:
+            entries = archive.page(args.start, args.count, *args.codes)
+        for entry in entries:
+            print(format_entry(entry))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
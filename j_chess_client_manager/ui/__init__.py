@@ -1,34 +1,87 @@
-from typing import Callable, Any, List, Optional
+from typing import Callable, Any, List, Sequence
 
-from asciimatics.exceptions import StopApplication, ResizeScreenError
 from asciimatics.scene import Scene
 from asciimatics.screen import Screen
-from asciimatics.effects import Print, BannerText
-from asciimatics.renderers import StaticRenderer, ColourImageFile
 
 from j_chess_client_manager.ui.frames.main_frame import MainFrame
-from j_chess_client_manager.ui.frames.client_view import ClientView
+from j_chess_client_manager.ui.frames.tournament_frame import TournamentFrame
+from j_chess_client_manager.ui.widgets.chessboard import AUTO
+from j_chess_client_manager.clients.standings import TournamentStandings
+from j_chess_client_manager.clients import SuperProvider
+from j_chess_client_manager.clients.manager import ClientManager
+from j_chess_client_manager.ui.scheduler import RedrawScheduler
 
 
-def setup_scenes(screen: Screen, theme: str) -> List[Scene]:
+class LazyScene(Scene):
+    """
+    Scene whose effects are only created when it is shown for the first time, so the modules they need are only
+    imported if the scene is used
+    """
+
+    def __init__(self, create_effects: Callable[[], list], duration: int = -1, clear: bool = True, name: str = None):
+        super().__init__([], duration=duration, clear=clear, name=name)
+        self._create_effects = create_effects
+
+    def reset(self, old_scene=None, screen=None):
+        if self._create_effects is not None:
+            create_effects, self._create_effects = self._create_effects, None
+            for effect in create_effects():
+                self.add_effect(effect, reset=False)
+        super().reset(old_scene=old_scene, screen=screen)
+
+
+def setup_scenes(
+    screen: Screen, theme: str, scheduler: RedrawScheduler, standings: TournamentStandings, manager: ClientManager,
+    piece_style: str = AUTO
+) -> List[Scene]:
     scenes = []
 
-    mf = MainFrame(screen=screen, theme=theme)
+    scheduler.attach(screen)
+    mf = MainFrame(screen=screen, scheduler=scheduler, manager=manager, theme=theme, piece_style=piece_style)
+
+    def client_view():
+        # Adding clients needs the AI registry, the client factory and the clipboard
+        from j_chess_client_manager.ui.frames.client_view import ClientView
+        return [ClientView(screen=screen, ai_adder=manager.add, need_update=scheduler.notify, theme=theme)]
 
     scenes.append(
         Scene([mf], -1, name="Main")
     )
     scenes.append(
-        Scene([ClientView(screen=screen, ai_adder=mf.add_ai, theme=theme)], -1, name="Add Client")
+        LazyScene(client_view, -1, name="Add Client")
+    )
+    scenes.append(
+        Scene([TournamentFrame(screen=screen, scheduler=scheduler, standings=standings, manager=manager, theme=theme)],
+              -1, name="Tournaments")
     )
 
     return scenes
 
 
-def run_function_creator(start_scene: Any, theme: str = "default") -> Callable[[Screen], None]:
+def create_client_manager(
+    scheduler: RedrawScheduler, standings: TournamentStandings, clients: Sequence[SuperProvider] = tuple(),
+    on_client_added: Callable[[SuperProvider], None] = None
+) -> ClientManager:
+    """
+    Client manager for the UI. It has to be created once and passed to every run_function_creator, so clients are
+    kept when the UI is rebuilt after a resize
+    """
+    manager = ClientManager(clients=clients)
+    manager.add_listener(standings.update)
+    manager.add_listener(lambda _: scheduler.notify_clients_changed(), replay=False)
+    if on_client_added is not None:
+        manager.add_listener(on_client_added)
+    return manager
+
+
+def run_function_creator(
+    start_scene: Any, scheduler: RedrawScheduler, standings: TournamentStandings, manager: ClientManager,
+    theme: str = "default", piece_style: str = AUTO
+) -> Callable[[Screen], None]:
 
     def run(screen: Screen):
-        scenes = setup_scenes(screen=screen, theme=theme)
+        scenes = setup_scenes(screen=screen, theme=theme, scheduler=scheduler, standings=standings, manager=manager,
+                              piece_style=piece_style)
 
         screen.play(scenes, stop_on_resize=True, repeat=False, start_scene=start_scene)
 
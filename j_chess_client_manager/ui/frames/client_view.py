@@ -3,19 +3,17 @@ import inspect
 from typing import Dict, Callable, Any
 from uuid import uuid4, UUID
 
-import pyperclip
 from asciimatics.exceptions import NextScene, ResizeScreenError, StopApplication, InvalidFields, Highlander
-from asciimatics.screen import Screen
 from asciimatics.widgets import (
     Frame, Layout, Text, TextBox, Button, DropdownList, RadioButtons, Label, Divider, PopUpDialog, CheckBox
 )
 from j_chess_lib.ai import AI, StoreAI, DumbAI
 from j_chess_lib.ai.Sample import SampleAI
-from j_chess_lib.client import Client
 from j_chess_lib.communication import Connection
 
-from j_chess_client_manager.ui.utilities import get_widget_by_parameter, get_all_ais
-from j_chess_client_manager.clients.ai_wrapper import wrap_ai
+from j_chess_client_manager.ui.utilities import get_widget_by_parameter
+from j_chess_client_manager.clients.registry import get_ai_registry
+from j_chess_client_manager.clients.factory import start_client, THREAD_BACKEND, PROCESS_BACKEND
 from j_chess_client_manager.clients import SuperProvider
 from j_chess_client_manager.ui.widgets.log import LogList
 from j_chess_client_manager.logging import SYSTEM_LOGGER
@@ -32,11 +30,13 @@ PORT_VALIDATOR = r"^([0-9]{1,4}|[1-5][0-9]{4}|6[0-4][0-9]{3}|65[0-4][0-9]{2}|655
 
 class ClientView(Frame):
 
-    def __init__(self, screen, ai_adder: Callable[[SuperProvider], None], theme: str = "green"):
+    def __init__(self, screen, ai_adder: Callable[[SuperProvider], None], need_update: Callable[[SuperProvider], None],
+                 theme: str = "green"):
         height = min(max(screen.height * 2 // 3, 30), screen.height)
         width = min(max(screen.width * 2 // 3, 100), screen.width)
         super(ClientView, self).__init__(screen, height, width, hover_focus=True, title=f"Add new client +🤖")
         self._ai_adder = ai_adder
+        self._need_update = need_update
         self._convertors: Dict[str, Callable[[Any], Any]] = {}
 
         self.set_theme(theme=theme)
@@ -88,6 +88,9 @@ class ClientView(Frame):
             self._type_layout.add_widget(widget)
 
         self._type_layout.add_widget(Divider())
+        self._type_layout.add_widget(CheckBox(text="Play in its own process (for cpu heavy AIs)",
+                                              label="Process", name="Client__Own_process"))
+        self._type_layout.add_widget(Divider())
 
         tournament_selector = [None]
 
@@ -99,6 +102,7 @@ class ClientView(Frame):
                 return
             elif selected_tournament == 1:
                 _tournament_code = str(uuid4())
+                import pyperclip
                 try:
                     pyperclip.copy(_tournament_code)
                     self.scene.add_effect(PopUpDialog(
@@ -147,7 +151,7 @@ class ClientView(Frame):
         self._tournament_selection_layout.add_widget(tournament_selector[0])
         self._tournament_selection_layout.add_widget(Divider())
 
-        available_ais = get_all_ais()
+        available_ais = get_ai_registry().entries()
         # SYSTEM_LOGGER.info(f"Found {len(available_ais)} AI classes")
 
         if len(available_ais) > 0:
@@ -157,7 +161,18 @@ class ClientView(Frame):
             def setup_components():
                 self._component_layout.clear_widgets()
 
-                selected_ai = ai_selector[0].value
+                selected_entry = ai_selector[0].value
+                selected_ai = None
+                if selected_entry is not None:
+                    try:
+                        selected_ai = selected_entry.load()
+                    except Exception as e:
+                        SYSTEM_LOGGER.error(f"Could not import AI \"{selected_entry.name}\": {type(e).__name__}: {e}")
+                        self._component_layout.add_widget(Label(f"Could not import {selected_entry.path}:\n"
+                                                                f"{type(e).__name__}: {e}", height=2))
+                        self._ok_button.disabled = True
+                        self.fix()
+                        return
                 if selected_ai is None:
                     self._component_layout.add_widget(Label("Please select your AI-Class above"))
                     self._ok_button.disabled = True
@@ -177,7 +192,7 @@ class ClientView(Frame):
 
                 self.fix()
 
-            ai_selector[0] = DropdownList([("Select Here", None)] + [(x.__name__, x) for x in available_ais],
+            ai_selector[0] = DropdownList([("Select Here", None)] + [(x.name, x) for x in available_ais],
                                           label="Select your AI", name="AI__class", on_change=setup_components)
             setup_components()
 
@@ -217,32 +232,24 @@ class ClientView(Frame):
             k[len(connection_prefix):]: self._convertors[k](v) for k, v in self.data.items() if
             str(k).startswith(connection_prefix)
         }
-        ai_class = self.data["AI__class"]
+        ai_class = self.data["AI__class"].load()
         ai_parameter = {
             k[len(ai_class.__name__) + 2:]: self._convertors[k](v) for k, v in self.data.items() if
             str(k).startswith(ai_class.__name__)
         }
-        connection = Connection(**connection_parameters)
 
         tournament_code = None if \
             self.data["Client__Tournament_selection"] <= 0 else \
             self.data["Client__Tournament_code"]
 
-        ai = wrap_ai(ai_class, init_values=ai_parameter, need_update=self._invalidate_frame,
-                     tournament_code=tournament_code)
-        SYSTEM_LOGGER.info(f"Created connection {connection}; Created AI {ai}")
-        client = Client(connection=connection, ai=ai, tournament_code=tournament_code)
-        client.start()
-        SYSTEM_LOGGER.info(
-            f"Started client {client}{'' if tournament_code is None else f' for tournament {tournament_code}'}"
-        )
+        backend = PROCESS_BACKEND if self.data.get("Client__Own_process", False) else THREAD_BACKEND
+
+        client, ai = start_client(ai_class=ai_class, ai_parameters=ai_parameter,
+                                  connection_parameters=connection_parameters, tournament_code=tournament_code,
+                                  need_update=self._need_update, backend=backend)
         self._ai_adder(ai)
         # raise Exception(f"{pformat(connection_parameters)}\n{ai_class}\n{pformat(ai_parameter)}")
 
-    def _invalidate_frame(self, *args, **kwargs):
-        screen: Screen = self.screen
-        screen.force_update()
-
     def _ok(self):
         self.save()
         try:
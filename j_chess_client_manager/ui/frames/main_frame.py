@@ -1,4 +1,5 @@
 import queue
+from time import perf_counter
 from typing import List, Tuple, Optional
 
 from asciimatics.exceptions import NextScene, StopApplication
@@ -7,13 +8,16 @@ from asciimatics.widgets import (
 )
 from asciimatics.parsers import AnsiTerminalParser
 
-from j_chess_client_manager.ui.widgets.chessboard import ChessBoard
+from j_chess_client_manager.ui.widgets.chessboard import ChessBoard, AUTO
 from j_chess_client_manager.ui.widgets.log import LogList
 from j_chess_client_manager.clients import SuperProvider
+from j_chess_client_manager.clients.manager import ClientManager
+from j_chess_client_manager.ui.scheduler import RedrawScheduler
 
 
 class MainFrame(Frame):
-    def __init__(self, screen, theme: str = "default"):
+    def __init__(self, screen, scheduler: RedrawScheduler, manager: ClientManager, theme: str = "default",
+                 piece_style: str = AUTO):
         super(MainFrame, self).__init__(screen=screen, height=screen.height, width=screen.width,
                                         on_load=self._on_load,
                                         hover_focus=True,
@@ -22,11 +26,11 @@ class MainFrame(Frame):
                                         title="♛ J-Chess Client-Manager 🤖")
 
         self.set_theme(theme=theme)
-
-        self._ais: List[SuperProvider] = [
-            # wrap_ai(base_ai=SampleAI, init_values={"white_name": "Gray"}),
-            # wrap_ai(base_ai=SampleAI, init_values={})
-        ]
+        self._scheduler = scheduler
+        # The clients live in the manager, this frame is rebuilt on every resize
+        self._manager = manager
+        self._shown_version = -1
+        selected = manager.selected
 
         # Initialize widgets
         self._ai_list = ListBox(
@@ -36,7 +40,7 @@ class MainFrame(Frame):
             add_scroll_bar=True,
             on_change=self._on_pick,
             on_select=self._edit)
-        self._chessboard = ChessBoard()
+        self._chessboard = ChessBoard(piece_style=piece_style)
         self._edit_button = Button("Edit", self._edit)
         self._delete_button = Button("Delete", self._delete)
         self._metrics = MultiColumnListBox(
@@ -54,7 +58,7 @@ class MainFrame(Frame):
         # Add widgets to layout
         main_layout = Layout([49, 1, 100, 1, 49], fill_frame=True)
         log_layout = Layout([100], fill_frame=False)
-        button_layout = Layout([1, 1, 1, 1], fill_frame=False)
+        button_layout = Layout([1, 1, 1, 1, 1], fill_frame=False)
         self.add_layout(main_layout)
         self.add_layout(log_layout)
         self.add_layout(button_layout)
@@ -76,17 +80,17 @@ class MainFrame(Frame):
         button_layout.add_widget(Divider(), 1)
         button_layout.add_widget(Divider(), 2)
         button_layout.add_widget(Divider(), 3)
+        button_layout.add_widget(Divider(), 4)
         button_layout.add_widget(Button("Add", self._add), 0)
         button_layout.add_widget(self._edit_button, 1)
         button_layout.add_widget(self._delete_button, 2)
-        button_layout.add_widget(Button("Quit", self._quit), 3)
+        button_layout.add_widget(Button("Tournaments", self._tournaments), 3)
+        button_layout.add_widget(Button("Quit", self._quit), 4)
         self.fix()
-        self._on_pick()
-        self._set_ais()
-
-    def add_ai(self, new_ai: SuperProvider):
-        self._ais.append(new_ai)
         self._set_ais()
+        if selected in manager.clients:
+            self._ai_list.value = selected
+        self._on_pick()
 
     def _set_ais(self):
         def get_name(_x):
@@ -99,8 +103,12 @@ class MainFrame(Frame):
                 return f" [{_x.tournament_code}]" if _x.tournament_code else ""
             except AttributeError:
                 return ""
+        def get_clock_warning(_x: SuperProvider):
+            return f" [clock {_x.clock_warning:.0%}]" if _x.clock_warning > 0 else ""
+        self._shown_version = self._manager.version
         self._ai_list.options = [
-            (f"{x.get_client_type().fixed_represent()} {get_name(x)}{get_tournament_code(x)}", x) for x in self._ais
+            (f"{x.get_client_type().fixed_represent()} {get_name(x)}{get_tournament_code(x)}{get_clock_warning(x)}", x)
+            for x in self._manager.clients
         ]
 
     @property
@@ -115,18 +123,32 @@ class MainFrame(Frame):
         self._edit_button.disabled = True
         self._delete_button.disabled = val is None
 
-        self._set_metrics([] if val is None else [(tuple(str(y) for y in x), i) for i, x in enumerate(val.metrics())])
+        self._manager.selected = val
+        self._scheduler.watch(val)
         self._chessboard.data_provider = val
 
     def _update(self, frame_no):
+        start = perf_counter()
+        if self._scheduler.take_clients_changed() or self._manager.version != self._shown_version:
+            self._set_ais()
+        if self._scheduler.take_visible_changed():
+            val: SuperProvider = self.current_client
+            self._set_metrics([] if val is None else [(tuple(str(y) for y in x), i)
+                                                      for i, x in enumerate(val.metrics())])
         super()._update(frame_no)
+        self._scheduler.record_frame(perf_counter() - start)
 
     def _on_load(self, new_value=None):
-        pass
+        # Other scenes might have changed which clients are watched
+        self._scheduler.watch(self.current_client)
 
     def _add(self):
         raise NextScene("Add Client")
 
+    @staticmethod
+    def _tournaments():
+        raise NextScene("Tournaments")
+
     def _edit(self):
         pass
 
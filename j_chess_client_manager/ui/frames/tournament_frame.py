@@ -0,0 +1,119 @@
+from typing import Optional
+
+from asciimatics.exceptions import NextScene
+from asciimatics.widgets import Frame, ListBox, Widget, Button, Layout, Divider, MultiColumnListBox, Label, \
+    VerticalDivider
+
+from j_chess_client_manager.clients.latency import format_duration
+from j_chess_client_manager.clients.manager import ClientManager
+from j_chess_client_manager.clients.standings import TournamentStandings
+from j_chess_client_manager.ui.scheduler import RedrawScheduler
+
+
+class TournamentFrame(Frame):
+    """
+    Standings of all clients of one tournament. The lists are only rebuilt when the standings changed
+    """
+
+    def __init__(self, screen, scheduler: RedrawScheduler, standings: TournamentStandings, manager: ClientManager,
+                 theme: str = "default"):
+        super(TournamentFrame, self).__init__(screen=screen, height=screen.height, width=screen.width,
+                                              on_load=self._on_load,
+                                              hover_focus=True,
+                                              can_scroll=False,
+                                              has_border=True,
+                                              title="🏆 Tournaments")
+
+        self.set_theme(theme=theme)
+        self._scheduler = scheduler
+        self._standings = standings
+        self._manager = manager
+        self._shown_version = -1
+        # Nothing is shown yet, so even "no tournament" has to be shown on the first update
+        self._shown_tournament_version = -2
+        self._shown_tournament: Optional[str] = None
+
+        self._tournament_list = ListBox(
+            Widget.FILL_FRAME,
+            options=[],
+            name="Tournaments",
+            add_scroll_bar=True,
+            on_change=self._on_pick)
+        self._summary = Label("")
+        self._table = MultiColumnListBox(
+            Widget.FILL_FRAME,
+            columns=["<4", "<0", ">7", ">7", ">7", ">7", ">7", ">8", ">12", ">8"],
+            titles=["#", "Client", "Score", "Games", "Wins", "Losses", "Draws", "Playing", "Move time", "Clock"],
+            add_scroll_bar=True,
+            options=[],
+        )
+
+        main_layout = Layout([25, 1, 74], fill_frame=True)
+        button_layout = Layout([1, 1, 1, 1], fill_frame=False)
+        self.add_layout(main_layout)
+        self.add_layout(button_layout)
+
+        main_layout.add_widget(Label("Tournaments"), 0)
+        main_layout.add_widget(Divider(), 0)
+        main_layout.add_widget(self._tournament_list, 0)
+        main_layout.add_widget(VerticalDivider(), 1)
+        main_layout.add_widget(self._summary, 2)
+        main_layout.add_widget(Divider(), 2)
+        main_layout.add_widget(self._table, 2)
+
+        for i in range(4):
+            button_layout.add_widget(Divider(), i)
+        button_layout.add_widget(Button("Back", self._back), 3)
+        self.fix()
+
+    def _on_load(self, new_value=None):
+        self._scheduler.watch(RedrawScheduler.ALL_CLIENTS)
+
+    def _on_pick(self):
+        self._shown_tournament_version = -2
+        if self._tournament_list.value is not None:
+            self._manager.remember("Tournaments", tournament=self._tournament_list.value)
+
+    def _set_tournaments(self):
+        value = self._tournament_list.value
+        if value is None:
+            # The frame was rebuilt, e.g. after a resize
+            value = self._manager.recall("Tournaments").get("tournament", None)
+        tournaments = self._standings.tournaments()
+        self._tournament_list.options = [(x, x) for x in tournaments]
+        if value in tournaments:
+            self._tournament_list.value = value
+        elif len(tournaments) > 0:
+            self._tournament_list.value = tournaments[0]
+
+    def _set_standings(self, code: Optional[str]):
+        if code is None:
+            self._summary.text = "No client is playing yet"
+            self._table.options = []
+            return
+        summary = self._standings.summary(code)
+        self._summary.text = f"{code}: {summary.clients} clients; {summary.games} games; " \
+                             f"{summary.in_progress} in progress; {summary.clock_warnings} moves in time trouble; " \
+                             f"average move {format_duration(summary.mean_move)}"
+        self._table.options = [
+            ([str(i + 1), x.name, f"{x.score:g}", str(x.games), str(x.wins), str(x.losses), str(x.draws),
+              "yes" if x.in_game else "", format_duration(x.mean_move), str(x.clock_warnings)], i)
+            for i, x in enumerate(self._standings.standings(code))
+        ]
+
+    def _update(self, frame_no):
+        version = self._standings.version
+        if version != self._shown_version:
+            self._shown_version = version
+            self._set_tournaments()
+        code = self._tournament_list.value
+        tournament_version = -1 if code is None else self._standings.tournament_version(code)
+        if code != self._shown_tournament or tournament_version != self._shown_tournament_version:
+            self._shown_tournament = code
+            self._shown_tournament_version = tournament_version
+            self._set_standings(code)
+        super()._update(frame_no)
+
+    @staticmethod
+    def _back():
+        raise NextScene("Main")
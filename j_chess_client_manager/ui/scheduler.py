@@ -0,0 +1,138 @@
+import threading
+import time
+from typing import Optional, Any, Dict, List, Callable
+
+from asciimatics.screen import Screen
+
+from j_chess_client_manager.clients.latency import LatencyHistogram
+
+
+class RedrawScheduler:
+    """
+    Collects update notifications of all clients and repaints the screen at most max_fps times per second. Only
+    changes of the visible client or of the client list lead to a repaint.
+    """
+
+    ALL_CLIENTS = object()
+
+    def __init__(self, max_fps: float = 10):
+        if max_fps <= 0:
+            raise ValueError(f"The screen needs a positive number of frames per second not {max_fps}")
+        self._interval = 1 / max_fps
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._screen: Optional[Screen] = None
+        self._visible: Any = None
+        self._visible_changed = False
+        self._clients_changed = False
+        self._notifications = 0
+        self._repaints = 0
+        self._thread: Optional[threading.Thread] = None
+        self._frame_times = LatencyHistogram()
+        self._listeners: List[Callable[..., None]] = []
+
+    @property
+    def notifications(self) -> int:
+        return self._notifications
+
+    @property
+    def repaints(self) -> int:
+        return self._repaints
+
+    def statistics(self) -> Dict[str, int]:
+        return {"notifications": self._notifications, "repaints": self._repaints}
+
+    def record_frame(self, seconds: float):
+        """
+        Record the time the UI took to draw one frame
+        """
+        with self._lock:
+            self._frame_times.record(seconds)
+
+    def frame_times(self) -> Dict[str, float]:
+        with self._lock:
+            return self._frame_times.summary()
+
+    def attach(self, screen: Screen):
+        """
+        Set the screen that is repainted. Has to be called again when the screen was recreated
+        """
+        with self._lock:
+            self._screen = screen
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name="RedrawScheduler")
+                self._thread.start()
+
+    def add_listener(self, listener: Callable[..., None]):
+        """
+        Call the listener with the arguments of every notification, e.g. to keep aggregates up to date
+        """
+        with self._lock:
+            # Replaced instead of changed so notify can iterate without holding the lock
+            self._listeners = self._listeners + [listener]
+
+    def watch(self, client: Any):
+        """
+        Set the client that is currently visible. Changes of other clients do not lead to a repaint.
+        ALL_CLIENTS to repaint on changes of any client
+        """
+        with self._lock:
+            self._visible = client
+            self._visible_changed = True
+
+    def notify(self, client: Any, *args, **kwargs):
+        """
+        Called by clients whenever their state changed. Can be used as need_update of the wrapped AIs.
+        Changes of the clock warning of any client lead to a repaint of the client list
+        """
+        with self._lock:
+            listeners = self._listeners
+            self._notifications += 1
+        for listener in listeners:
+            listener(client, *args, **kwargs)
+        with self._lock:
+            if "clock_warning" in kwargs:
+                self._clients_changed = True
+            elif client is not self._visible and self._visible is not self.ALL_CLIENTS:
+                return
+            self._visible_changed = True
+        self._wake.set()
+
+    def notify_clients_changed(self):
+        """
+        Called whenever clients were added or removed
+        """
+        with self._lock:
+            self._notifications += 1
+            self._clients_changed = True
+        self._wake.set()
+
+    def take_visible_changed(self) -> bool:
+        """
+        Returns whether the visible client changed since the last call
+        """
+        with self._lock:
+            ret = self._visible_changed
+            self._visible_changed = False
+            return ret
+
+    def take_clients_changed(self) -> bool:
+        """
+        Returns whether clients were added or removed since the last call
+        """
+        with self._lock:
+            ret = self._clients_changed
+            self._clients_changed = False
+            return ret
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                screen = self._screen
+            if screen is not None:
+                screen.force_update()
+                self._repaints += 1
+            # Notifications arriving while sleeping are coalesced into the next repaint
+            time.sleep(self._interval)
@@ -1,18 +1,26 @@
 # noinspection PyUnresolvedReferences
-from inspect import Parameter, _empty, isclass
+from inspect import Parameter, _empty
 from typing import Callable, Any, Tuple, List, Type, Set
 
 from asciimatics.widgets import Text, Widget
 from j_chess_lib.ai import AI
 
+from j_chess_client_manager.clients.parameters import get_converter_by_parameter, convert_parameters
+from j_chess_client_manager.clients.registry import get_ai_registry, find_ai
+
+# convert_parameters and find_ai moved to the clients package and stay importable from here
+__all__ = ["all_subclasses", "get_all_ais", "get_widget_by_parameter", "convert_parameters", "find_ai"]
+
 
 def all_subclasses(cls) -> Set[Type[AI]]:
     return set(cls.__subclasses__()).union([s for c in cls.__subclasses__() for s in all_subclasses(c)])
 
 
 def get_all_ais() -> List[Type[AI]]:
-    return sorted([x for x in all_subclasses(AI) if len(x.__abstractmethods__) == 0 and not x.__name__.startswith("_")],
-                  key=lambda x: x.__name__)
+    """
+    All imported AI classes ordered by name. Use the AI registry to also see AIs of entry points that are not imported
+    """
+    return get_ai_registry().ai_classes()
 
 
 def get_widget_by_parameter(
@@ -20,28 +28,7 @@ def get_widget_by_parameter(
 ) -> Tuple[Widget, Callable[[Any], Any]]:
     name = parameter.name
     default = none_const if parameter.default is _empty or parameter.default is None else str(parameter.default)
-    annotation: Any = parameter.annotation
-
-    def annotation_convert(val: str):
-        if val == none_const:
-            return None
-        return val
-
-    if annotation is _empty:
-        annotation = None
-    else:
-        if isclass(annotation):
-            annotation_class = annotation
-
-            def annotation_convert(val):
-                if val == none_const:
-                    return None
-                # noinspection PyCallingNonCallable
-                return annotation_class(val)
-
-            annotation = annotation.__name__
-        else:
-            annotation = str(annotation)
+    annotation, annotation_convert = get_converter_by_parameter(parameter=parameter, none_const=none_const)
 
     def validator(val: str):
         try:
@@ -1,35 +1,76 @@
-from typing import List, Tuple, Union, Optional
+from typing import Tuple, Union, Optional, NamedTuple, Dict
 
 from asciimatics.constants import (
     COLOUR_GREEN, COLOUR_CYAN, COLOUR_BLACK, COLOUR_WHITE, COLOUR_BLUE, COLOUR_RED, COLOUR_YELLOW, COLOUR_MAGENTA,
     A_NORMAL, A_BOLD, A_UNDERLINE, A_REVERSE
 )
+from asciimatics.screen import Canvas
 from asciimatics.widgets import Widget, Frame
 
+from j_chess_client_manager.chess.pieces import clear_path_cache, piece_type
 # noinspection PyProtectedMember
 from j_chess_client_manager.clients import SuperProvider, _NoneProvider
 from j_chess_client_manager.logging import SYSTEM_LOGGER
 
 _none_provider = _NoneProvider()
 
+# How pieces are drawn. AUTO draws shapes when the tiles are large enough and glyphs or letters otherwise
+AUTO = "auto"
+SHAPES = "shapes"
+GLYPHS = "glyphs"
+LETTERS = "letters"
+PIECE_STYLES = (AUTO, SHAPES, GLYPHS, LETTERS)
+# Smallest tile a shape is recognizable in
+_MIN_SHAPE_W, _MIN_SHAPE_H = 6, 3
+# Tile size of the last board drawn. A resize builds a new board, so the size is not kept per board
+_last_tile_size: Optional[Tuple[int, int]] = None
+
+
+class _Geometry(NamedTuple):
+    board_w: int
+    board_h: int
+    tile_w: int
+    tile_h: int
+    offset_x: int
+    offset_y: int
+    dx: int
+    dy: int
+
 
 class ChessBoard(Widget):
 
-    def __init__(self, w_h_factor: float = 2):
+    def __init__(self, w_h_factor: float = 2, piece_style: str = AUTO):
         super().__init__("Chessboard", tab_stop=False)
+        if piece_style not in PIECE_STYLES:
+            raise ValueError(f"Unknown piece style \"{piece_style}\". Choose from {', '.join(PIECE_STYLES)}")
         self.disabled = True
         self._w_h_factor = w_h_factor
+        self._piece_style = piece_style
         self._provider: Optional[SuperProvider] = None
-        self._empty_board: List[List[str]] = [["" for _ in range(8)] for _ in range(8)]
-
-    def _draw_square(self, frame: Frame, x: int, y: int, w: int, h: int, colour: int, bg: int):
-        self._draw_path(frame=frame, path=[[(x, y), (x + w, y), (x + w, y + h), (x, y + h)]], colour=colour, bg=bg)
+        self._geometries: Dict[Tuple[int, int, int], _Geometry] = {}
+        # Off-screen copy of the board. Only tiles whose piece changed are repainted into it
+        self._board_canvas: Optional[Canvas] = None
+        self._board_geometry: Optional[_Geometry] = None
+        self._board_screen = None
+        self._drawn_squares: Optional[bytes] = None
+        self._tiles_redrawn = 0
 
-    def _draw_path(self, frame: Frame, path: List[List[Tuple[int, int]]], colour: int, bg: int):
-        _x = self._x
-        _y = self._y
-        path = [[(x + _x, y + _y) for x, y in p] for p in path]
-        frame.canvas.fill_polygon(path, colour=colour, bg=bg)
+    @property
+    def tiles_redrawn(self) -> int:
+        """
+        Number of tiles repainted in the last update
+        """
+        return self._tiles_redrawn
+
+    def invalidate(self):
+        """
+        Repaint the whole board on the next update
+        """
+        self._drawn_squares = None
+
+    @staticmethod
+    def _fill_square(canvas: Canvas, x: int, y: int, w: int, h: int, colour: int, bg: int):
+        canvas.fill_polygon([[(x, y), (x + w, y), (x + w, y + h), (x, y + h)]], colour=colour, bg=bg)
 
     @property
     def data_provider(self) -> Optional[SuperProvider]:
@@ -39,6 +80,8 @@ class ChessBoard(Widget):
 
     @data_provider.setter
     def data_provider(self, value: SuperProvider):
+        if value is not self._provider:
+            self.invalidate()
         self._provider = value
 
     def update(self, frame_no):
@@ -52,13 +95,16 @@ class ChessBoard(Widget):
         white_text = f"{self.data_provider.white_name} {self.data_provider.white_time}s"
         black_text = f"{self.data_provider.black_name} {self.data_provider.black_time}s"
         mid_text = f"Turn: {self.data_provider.turn()}"
+        white_turn = self.data_provider.white_turn()
+        # The clock of the player to move is highlighted when the clock watchdog warned about it
+        clock_colour = COLOUR_RED if self.data_provider.clock_warning > 0 else colour
         frame.canvas.paint(
             white_text, self._x + margin, self._y,
-            colour, attr_active_player if self.data_provider.white_turn() else A_NORMAL, background
+            clock_colour if white_turn else colour, attr_active_player if white_turn else A_NORMAL, background
         )
         frame.canvas.paint(
             black_text, self._x + self.width - margin - len(black_text), self._y,
-            colour, attr_active_player if not self.data_provider.white_turn() else A_NORMAL, background
+            colour if white_turn else clock_colour, attr_active_player if not white_turn else A_NORMAL, background
         )
         frame.canvas.paint(
             mid_text, self._x + (self.width // 2) - (len(mid_text) // 2), self._y,
@@ -66,14 +112,11 @@ class ChessBoard(Widget):
         )
         return 1
 
-    def _draw_chess_board(self, frame: Frame, colour_black: int = COLOUR_BLUE, colour_white: int = COLOUR_CYAN,
-                          y_off: int = 0):
-
-        current_board = None if self.data_provider is None else self.data_provider.board()
-        if current_board is None:
-            current_board = self._empty_board
-
-        w, h = self.width, self._h - y_off
+    def _geometry(self, w: int, h: int, y_off: int) -> _Geometry:
+        key = (w, h, y_off)
+        geometry = self._geometries.get(key, None)
+        if geometry is not None:
+            return geometry
 
         board_h = h
         board_w = board_h * self._w_h_factor
@@ -88,8 +131,8 @@ class ChessBoard(Widget):
             dx = 1
             dy = int(1 / self._w_h_factor)
 
-        tile_w = (board_w - 2 * dx) // 8
-        tile_h = (board_h - 2 * dy) // 8
+        tile_w = int((board_w - 2 * dx) // 8)
+        tile_h = int((board_h - 2 * dy) // 8)
 
         board_w = tile_w * 8
         board_h = tile_h * 8
@@ -97,27 +140,87 @@ class ChessBoard(Widget):
         offset_x = (w - board_w) // 2
         offset_y = (h - board_h) // 2 + y_off
 
-        self._draw_square(frame=frame, x=offset_x - dx, y=offset_y - dy, w=board_w + 2 * dx, h=board_h + 2 * dy,
-                          colour=COLOUR_GREEN, bg=COLOUR_BLACK)
-
-        for x in range(8):
-            for y in range(8):
-                tile_colour = colour_white if (x + y) % 2 == 0 else colour_black
-                _x, _y = offset_x + (x * tile_w), offset_y + y * tile_h
-                self._draw_square(frame=frame, x=_x, y=_y, w=tile_w, h=tile_h, colour=tile_colour, bg=COLOUR_GREEN)
-                frame.canvas.paint(
-                    f"{chr(97 + x)}{8-y}", self._x + _x, self._y + _y, COLOUR_RED, A_BOLD, tile_colour
+        geometry = _Geometry(board_w=board_w, board_h=board_h, tile_w=tile_w, tile_h=tile_h, offset_x=offset_x,
+                             offset_y=offset_y, dx=dx, dy=dy)
+        self._geometries[key] = geometry
+        return geometry
+
+    def _style(self, geometry: _Geometry, unicode_aware: bool) -> str:
+        if self._piece_style != AUTO:
+            return self._piece_style
+        if geometry.tile_w >= _MIN_SHAPE_W and geometry.tile_h >= _MIN_SHAPE_H:
+            return SHAPES
+        return GLYPHS if unicode_aware else LETTERS
+
+    def _draw_tile(self, canvas: Canvas, geometry: _Geometry, x: int, y: int, piece: str, colour_black: int,
+                   colour_white: int, style: str = LETTERS):
+        tile_w, tile_h = geometry.tile_w, geometry.tile_h
+        tile_colour = colour_white if (x + y) % 2 == 0 else colour_black
+        _x, _y = geometry.dx + x * tile_w, geometry.dy + y * tile_h
+        self._fill_square(canvas=canvas, x=_x, y=_y, w=tile_w, h=tile_h, colour=tile_colour, bg=COLOUR_GREEN)
+        kind = piece_type(piece) if len(piece) == 1 else None
+        if kind is not None:
+            white = piece.isupper()
+            piece_colour = COLOUR_WHITE if white else COLOUR_BLACK
+            if style == SHAPES:
+                canvas.fill_polygon(kind.path(tile_w, tile_h, _x, _y), colour=piece_colour, bg=tile_colour)
+            else:
+                canvas.paint(
+                    kind.glyph(white) if style == GLYPHS else piece.upper(), _x + tile_w // 2, _y + tile_h // 2,
+                    piece_colour, A_BOLD, tile_colour
                 )
-                piece: str = current_board[y][x]
-                if len(piece) == 1:
-                    frame.canvas.paint(
-                        piece.upper(), self._x + _x + tile_w//2, self._y + _y + tile_h//2,
-                        COLOUR_BLACK if piece.islower() else COLOUR_WHITE, A_BOLD, tile_colour
-                    )
+        # Painted last so a piece never hides the name of its square
+        canvas.paint(f"{chr(97 + x)}{8-y}", _x, _y, COLOUR_RED, A_BOLD, tile_colour)
+
+    def _draw_chess_board(self, frame: Frame, colour_black: int = COLOUR_BLUE, colour_white: int = COLOUR_CYAN,
+                          y_off: int = 0):
+
+        position = self.data_provider.position()
+        geometry = self._geometry(w=self.width, h=self._h - y_off, y_off=y_off)
+        if geometry.tile_w <= 0 or geometry.tile_h <= 0:
+            self._tiles_redrawn = 0
+            return
+        dx, dy = geometry.dx, geometry.dy
+
+        if self._board_canvas is None or self._board_geometry != geometry or self._board_screen is not frame.screen:
+            global _last_tile_size
+            if _last_tile_size is not None and _last_tile_size != (geometry.tile_w, geometry.tile_h):
+                # The paths of the old tile size are not used again after a resize
+                clear_path_cache()
+            _last_tile_size = (geometry.tile_w, geometry.tile_h)
+            self._board_canvas = Canvas(frame.screen, geometry.board_h + 2 * dy, geometry.board_w + 2 * dx, 0, 0)
+            self._board_geometry = geometry
+            self._board_screen = frame.screen
+            self._drawn_squares = None
+
+        canvas = self._board_canvas
+        squares = position.squares
+        drawn = self._drawn_squares
+        if drawn is None:
+            self._fill_square(canvas=canvas, x=0, y=0, w=geometry.board_w + 2 * dx, h=geometry.board_h + 2 * dy,
+                              colour=COLOUR_GREEN, bg=COLOUR_BLACK)
+        redrawn = 0
+        style = self._style(geometry, unicode_aware=frame.screen.unicode_aware)
+        for square in range(64):
+            if drawn is not None and drawn[square] == squares[square]:
+                continue
+            x, y = square % 8, 7 - square // 8
+            self._draw_tile(canvas=canvas, geometry=geometry, x=x, y=y, piece=position.piece_at(square),
+                            colour_black=colour_black, colour_white=colour_white, style=style)
+            redrawn += 1
+        self._drawn_squares = squares
+        self._tiles_redrawn = redrawn
+
+        # The frame is cleared before every update so the off-screen board is copied over every time
+        x, y = self._x + geometry.offset_x - dx, self._y + geometry.offset_y - dy
+        # noinspection PyProtectedMember
+        frame.canvas.block_transfer(canvas._buffer, x, y - frame.canvas.start_line)
 
         frame.canvas.paint(
-            "Board: {}x{}; Tile: {}x{}".format(board_w, board_h, tile_w, tile_h),
-            self._x + offset_x - dx, self._y + offset_y - dy, COLOUR_BLACK, A_NORMAL, COLOUR_GREEN
+            "Board: {}x{}; Tile: {}x{}; Redrawn: {}".format(
+                geometry.board_w, geometry.board_h, geometry.tile_w, geometry.tile_h, redrawn
+            ),
+            x, y, COLOUR_BLACK, A_NORMAL, COLOUR_GREEN
         )
 
     def reset(self):
@@ -1,5 +1,4 @@
-import queue
-from typing import List, Tuple, Set
+from typing import List, Tuple, Set, Dict
 import logging
 import time
 
@@ -10,26 +9,19 @@ from asciimatics.constants import (
 )
 from asciimatics.widgets.utilities import _split_text
 
-from j_chess_client_manager.logging import LOG_QUEUE
+from j_chess_client_manager.logging import LOG_QUEUE, LOG_STORE
 
 
-_LOG_LIST: List[Tuple[str, logging.LogRecord]] = []
+def _update_log_list() -> int:
+    return LOG_STORE.drain(LOG_QUEUE)
 
 
-def _update_log_list():
-    while not LOG_QUEUE.empty():
-        try:
-            _LOG_LIST.append(LOG_QUEUE.get())
-        except queue.Empty:
-            break
+def _get_logs(n: int, *codes: str) -> List[Tuple[int, str, logging.LogRecord]]:
+    return LOG_STORE.tail_entries(n, *codes)
 
-def _get_logs(*codes: str) -> List[Tuple[str, logging.LogRecord]]:
-    if codes is None or len(codes) <= 0:
-        return _LOG_LIST
-    return [x for x in _LOG_LIST if x[0] in codes]
 
 def _get_codes() -> Set[str]:
-    return {x[0] for x in _LOG_LIST}
+    return LOG_STORE.codes()
 
 
 class LogList(Widget):
@@ -39,6 +31,14 @@ class LogList(Widget):
         self._height = height
         self._fmt = '{time} [{code:^4s}-{levelname:^8s}] - {message}'
         self.date_fmt = "%Y-%m-%d %H:%M:%S"
+        self._log_offset = 4
+        # Formatted and clipped lines by sequence number of their record. Only valid for _line_width
+        self._line_cache: Dict[int, str] = {}
+        self._line_width = -1
+        self._shown_seq = -1
+        self._shown_lines: List[str] = []
+        self._title = ""
+        self._formatted = 0
 
     @property
     def height(self):
@@ -48,21 +48,47 @@ class LogList(Widget):
     def height(self, value: int):
         self._height = value
 
+    @property
+    def formatted_lines(self) -> int:
+        """
+        Number of lines formatted since this widget was created
+        """
+        return self._formatted
+
+    def _format(self, code: str, record: logging.LogRecord, width: int) -> str:
+        self._formatted += 1
+        t = time.strftime(self.date_fmt, time.localtime(record.created))
+        return _split_text(self._fmt.format(time=t, code=code, levelname=record.levelname, message=record.message),
+                           width=width, height=1, unicode_aware=True)[0]
+
+    def _refresh_lines(self):
+        width = self.width - self._log_offset
+        if width != self._line_width:
+            self._line_cache = {}
+            self._line_width = width
+        elif LOG_STORE.last_seq == self._shown_seq and len(self._shown_lines) == min(self._height - 1,
+                                                                                    len(LOG_STORE)):
+            # Nothing new arrived and the size is the same so the last lines are still valid
+            return
+
+        cache = {}
+        for seq, code, record in _get_logs(self._height - 1):
+            line = self._line_cache.get(seq, None)
+            cache[seq] = self._format(code=code, record=record, width=width) if line is None else line
+        self._line_cache = cache
+        self._shown_lines = list(cache.values())
+        self._shown_seq = LOG_STORE.last_seq
+        evicted = LOG_STORE.evicted
+        self._title = f"Logs [{len(LOG_STORE)}{f', {evicted} dropped' if evicted > 0 else ''}]"
+
     def update(self, frame_no):
         _update_log_list()
+        self._refresh_lines()
         frame: Frame = self.frame
-        print_logs = _get_logs()
         (colour, attr, background) = frame.palette["label"]
-        frame.canvas.paint(f"Logs [{len(print_logs)}]", self._x, self._y, colour, A_UNDERLINE, background)
-        print_records = print_logs[-(self._height - 1):]
-        log_offset = 4
-
-        for i, (code, record) in enumerate(print_records):
-            record: logging.LogRecord
-            t = time.strftime(self.date_fmt, time.localtime(record.created))
-            line = _split_text(self._fmt.format(time=t, code=code, levelname=record.levelname, message=record.message),
-                               width=self.width - log_offset, height=1, unicode_aware=True)[0]
-            frame.canvas.paint(line, self._x + log_offset, self._y + i + 1, colour, A_NORMAL, background)
+        frame.canvas.paint(self._title, self._x, self._y, colour, A_UNDERLINE, background)
+        for i, line in enumerate(self._shown_lines):
+            frame.canvas.paint(line, self._x + self._log_offset, self._y + i + 1, colour, A_NORMAL, background)
 
     def reset(self):
         pass
@@ -36,6 +36,10 @@ setup(
     entry_points={
         'console_scripts': [
             'j_chess_client_manager=j_chess_client_manager.__main__:main',
+            'j_chess_log_viewer=j_chess_client_manager.logging.viewer:main',
+            'j_chess_archive=j_chess_client_manager.archive:main',
+            'j_chess_loadtest=j_chess_client_manager.loadtest:main',
+            'j_chess_arena=j_chess_client_manager.arena:main',
         ],
     },
     install_requires=requirements,
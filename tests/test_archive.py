@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.archive`."""
+
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+
+from j_chess_client_manager.archive import GameArchive, main
+from j_chess_client_manager.clients.observers import GameResult, add_game_observer, remove_game_observer, \
+    game_finished
+
+
+def _game(i: int, client: str = "Bot", winner: str = "Bot", white: bool = True, tournament: str = None):
+    return GameResult.create(game_id=f"game-{i}", match_id="match", client=client, opponent="Enemy",
+                             tournament_code=tournament, white=white, winner=winner, pgn=f"1. e4 {i}")
+
+
+class TestGameArchive(unittest.TestCase):
+    """Tests for the game archive."""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        self._archive = GameArchive(os.path.join(self._directory.name, "games.sqlite"), batch_size=7)
+
+    def tearDown(self):
+        self._archive.close()
+        self._directory.cleanup()
+
+    def test_000_query(self):
+        """Games are written in batches and found by their attributes."""
+        for i in range(30):
+            self._archive.add(_game(i, winner="Enemy" if i % 3 == 0 else "Bot", white=i % 2 == 0,
+                                    tournament="T" if i < 20 else None))
+        self._archive.add(_game(30, winner=None))
+        self._archive.flush()
+        self.assertEqual(31, self._archive.count())
+        self.assertEqual(10, self._archive.count(result="loss"))
+        self.assertEqual(1, self._archive.count(result="draw"))
+        losses = self._archive.query(client="Bot", result="loss", white=False, tournament_code="T")
+        self.assertEqual(["game-15", "game-9", "game-3"], [x.game_id for x in losses])
+        self.assertEqual("1. e4 15", losses[0].pgn)
+        self.assertEqual(2, len(self._archive.query(limit=2)))
+
+    def test_001_observer(self):
+        """The archive receives finished games as observer."""
+        add_game_observer(self._archive.add)
+        try:
+            game_finished(_game(0))
+            game_finished(_game(0))
+        finally:
+            remove_game_observer(self._archive.add)
+        self._archive.flush()
+        self.assertEqual(1, self._archive.count(client="Bot", result="win"))
+
+    def test_002_main(self):
+        """The command line queries an existing archive without changing it and refuses missing files."""
+        for i in range(3):
+            self._archive.add(_game(i))
+        self._archive.close()
+        path = self._archive.path
+        modified = os.path.getmtime(path)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(0, main([path, "--count"]))
+        self.assertEqual("3", output.getvalue().strip())
+        self.assertEqual(modified, os.path.getmtime(path))
+        with self.assertRaises(ValueError):
+            GameArchive(path, read_only=True).add(_game(4))
+        typo = os.path.join(self._directory.name, "typo.db")
+        with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+            main([typo, "--count"])
+        self.assertFalse(os.path.exists(typo))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.arena`."""
+
+import threading
+import unittest
+from itertools import combinations
+
+from j_chess_lib.ai import AI
+from j_chess_lib.ai.examples import Random
+from j_chess_lib.communication import MoveData
+
+from j_chess_client_manager.arena import Arena, ArenaPlayer, Referee, RefereeSettings, round_robin_rounds, \
+    swiss_pairs, SWISS, WHITE_WINS, BLACK_WINS
+
+
+class _Scripted(AI):
+    # Plays the given moves in order, one list per color
+
+    def __init__(self, name: str = "Scripted", white=("f2f3", "g2g4"), black=("e7e5", "d8h4")):
+        super().__init__(name=name)
+        self._moves = {True: list(white), False: list(black)}
+        self._white = False
+        self.results = []
+
+    def new_match(self, match_id, enemy, match_format):
+        pass
+
+    def new_game(self, game_id, match_id, white_player):
+        self._white = white_player == self.name
+        self._played = 0
+
+    def get_move(self, game_id, match_id, game_state) -> MoveData:
+        move = self._moves[self._white][self._played]
+        self._played += 1
+        return MoveData(from_value=move[:2], to=move[2:4])
+
+    def finalize_game(self, game_id, match_id, winner, pgn):
+        self.results.append(winner)
+
+    def finalize_match(self, match_id, status, statistics):
+        pass
+
+
+class _Broken(AI):
+    # Can not even be created
+
+    def __init__(self, name: str = "Broken"):
+        raise RuntimeError("Broken on purpose")
+
+
+class _Hanging(Random):
+    # Never answers
+
+    def get_move(self, game_id, match_id, game_state) -> MoveData:
+        threading.Event().wait()
+
+
+class TestArena(unittest.TestCase):
+    """Tests for the local arena and its referee."""
+
+    def test_000_round_robin(self):
+        """Every player meets every other player exactly once and nobody plays twice in a round."""
+        for players in (2, 5, 6):
+            rounds = round_robin_rounds(players)
+            pairs = [tuple(sorted(x)) for r in rounds for x in r]
+            self.assertEqual(sorted(combinations(range(players), 2)), sorted(pairs))
+            for r in rounds:
+                seated = [x for pair in r for x in pair]
+                self.assertEqual(len(seated), len(set(seated)))
+
+    def test_001_swiss(self):
+        """Swiss pairing avoids rematches and gives the bye to the lowest player without one."""
+        pairs, bye = swiss_pairs([2, 1, 1, 0, 0], met={0: {1}, 1: {0}}, byes=set())
+        self.assertEqual(4, bye)
+        self.assertNotIn((0, 1), pairs)
+        self.assertEqual([0, 1, 2, 3], sorted(x for pair in pairs for x in pair))
+        _pairs, bye = swiss_pairs([2, 1, 1, 0, 0], met={}, byes={4})
+        self.assertEqual(3, bye)
+
+    def test_002_checkmate(self):
+        """The referee ends a game on mate, tells both AIs and writes the pgn."""
+        white, black = _Scripted(name="a"), _Scripted(name="b")
+        record = Referee().play_game(white=("a", white), black=("b", black))
+        self.assertEqual(BLACK_WINS, record.result)
+        self.assertEqual("checkmate", record.termination)
+        self.assertEqual(4, record.plies)
+        self.assertIn("1. f3 e5 2. g4 Qh4# 0-1", record.pgn)
+        self.assertEqual(["b"], white.results)
+        self.assertEqual(["b"], black.results)
+
+    def test_003_illegal_move(self):
+        """Illegal moves lose the game."""
+        white, black = _Scripted(name="a", white=("e2e5",)), _Scripted(name="b")
+        record = Referee().play_game(white=("a", white), black=("b", black))
+        self.assertEqual(("illegal move", BLACK_WINS), (record.termination, record.result))
+        white, black = _Scripted(name="a", white=("e2e4", "d1h5")), _Scripted(name="b", black=("e7e5",))
+        record = Referee().play_game(white=("a", white), black=("b", black))
+        self.assertEqual(("error", WHITE_WINS), (record.termination, record.result))
+
+    def test_004_tournament(self):
+        """A tournament plays all matches and the standings add up."""
+        players = [ArenaPlayer(name=f"Random-{i}", ai_class=Random) for i in range(3)]
+        arena = Arena(players=players, settings=RefereeSettings(max_plies=20), games_per_match=2, workers=0)
+        results = arena.run()
+        self.assertEqual(6, len(results.records))
+        self.assertEqual(6, sum(x.score for x in results.standings()))
+        self.assertTrue(all(x.games == 4 for x in results.standings()))
+        self.assertEqual(6, results.pgn().count("[Event "))
+
+        results = Arena(players=players + [ArenaPlayer(name="Random-3", ai_class=Random)],
+                        settings=RefereeSettings(max_plies=10), games_per_match=1, workers=0).run(schedule=SWISS)
+        self.assertEqual(4, len(results.records))
+        self.assertRaises(ValueError, Arena, players=players[:1])
+        self.assertRaises(ValueError, Arena, players=players + players[:1])
+
+    def test_005_forfeit(self):
+        """AIs that can not be created or do not answer before their clock runs out forfeit their matches."""
+        settings = RefereeSettings(time_per_side=200, max_plies=20)
+        records = Referee(settings).play_match(ArenaPlayer(name="a", ai_class=_Broken),
+                                               ArenaPlayer(name="b", ai_class=Random), games=2)
+        self.assertEqual([("error", 0.0, 1.0)] * 2, [(x.termination, x.score("a"), x.score("b")) for x in records])
+        referee = Referee(settings)
+        records = referee.play_match(ArenaPlayer(name="a", ai_class=_Hanging),
+                                     ArenaPlayer(name="b", ai_class=Random), games=3)
+        self.assertEqual(["time forfeit"] * 3, [x.termination for x in records])
+        self.assertEqual(3, sum(x.score("b") for x in records))
+        self.assertEqual(1, referee.abandoned)
+
+    def test_006_workers(self):
+        """Worker processes play the tournament and are replaced when an AI hangs in one of them."""
+        players = [ArenaPlayer(name=f"Random-{i}", ai_class=Random) for i in range(2)] + [
+            ArenaPlayer(name="Broken", ai_class=_Broken), ArenaPlayer(name="Hanging", ai_class=_Hanging)]
+        arena = Arena(players=players, settings=RefereeSettings(time_per_side=200, max_plies=20), games_per_match=2,
+                      workers=2)
+        with self.assertLogs("Backend-System", level="WARNING") as logs:
+            results = arena.run()
+        self.assertEqual(12, len(results.records))
+        standings = {x.name: x for x in results.standings()}
+        self.assertEqual(0, standings["Broken"].score)
+        self.assertEqual(2, standings["Hanging"].score)
+        self.assertEqual(10, standings["Random-0"].score + standings["Random-1"].score)
+        self.assertEqual(4, sum(1 for x in results.records if x.termination == "time forfeit"))
+        self.assertTrue(any("Replacing the worker processes" in x for x in logs.output))
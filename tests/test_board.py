@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.clients.board`."""
+
+import unittest
+
+from j_chess_client_manager.clients.board import BoardProvider, parse_fen
+
+
+class _Provider(BoardProvider):
+
+    def __init__(self, fen):
+        self._fen = fen
+
+    @property
+    def fen(self):
+        return self._fen
+
+    white_name = black_name = white_time = black_time = None
+
+
+class TestBoardProvider(unittest.TestCase):
+    """Tests for the parsed fen accessors."""
+
+    def test_000_accessors(self):
+        """All accessors read the parts of the fen."""
+        provider = _Provider("rnbqkbnr/pp1ppppp/8/2p5/4P3/5N2/PPPP1PPP/RNBQKB1R b Kq e3 1 2")
+        board = provider.board()
+        self.assertEqual(8, len(board))
+        self.assertTrue(all(len(x) == 8 for x in board))
+        self.assertEqual(("", "", "p", "", "", "", "", ""), board[3])
+        self.assertEqual(2, provider.turn())
+        self.assertFalse(provider.white_turn())
+        self.assertEqual({"w": {"k": True, "q": False}, "b": {"k": False, "q": True}}, provider.castling())
+        self.assertEqual("e3", provider.en_passant())
+        self.assertEqual(1, provider.half_moves_since_pawn())
+
+    def test_001_defaults(self):
+        """Missing or invalid parts fall back to defaults."""
+        provider = _Provider(None)
+        self.assertEqual([[""] * 8] * 8, [list(x) for x in provider.board()])
+        self.assertEqual(-1, provider.turn())
+        self.assertTrue(provider.white_turn())
+        self.assertEqual({"w": {"k": False, "q": False}, "b": {"k": False, "q": False}}, provider.castling())
+        self.assertEqual(-1, provider.half_moves_since_pawn())
+        self.assertIsNone(_Provider("8/8/8/8/8/8/8/8 w - - x y").en_passant())
+        self.assertEqual(-1, _Provider("8/8/8/8/8/8/8/8 w - - x y").turn())
+
+    def test_002_parsed_once(self):
+        """The same fen is only parsed once."""
+        fen = "8/8/8/8/8/8/8/4K2k w - - 0 40"
+        self.assertIs(parse_fen(fen), _Provider(fen).parsed_fen())
+
+
+if __name__ == '__main__':
+    unittest.main()
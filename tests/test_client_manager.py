@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.clients.manager`."""
+
+import unittest
+from unittest import mock
+
+from j_chess_client_manager.clients import _NoneProvider
+from j_chess_client_manager.clients.manager import ClientManager
+from j_chess_client_manager.clients.standings import TournamentStandings
+from j_chess_client_manager.ui import setup_scenes, create_client_manager
+from j_chess_client_manager.ui.scheduler import RedrawScheduler
+
+
+def _screen(height: int, width: int):
+    return mock.MagicMock(height=height, width=width, colours=8, unicode_aware=True)
+
+
+class TestClientManager(unittest.TestCase):
+    """Tests for keeping clients apart from the UI."""
+
+    def test_000_listeners(self):
+        """Listeners see every added client and optionally the ones added before."""
+        first, second = _NoneProvider(), _NoneProvider()
+        manager = ClientManager(clients=[first])
+        replayed, added = [], []
+        manager.add_listener(replayed.append)
+        manager.add_listener(added.append, replay=False)
+        manager.add(second)
+        self.assertEqual([first, second], replayed)
+        self.assertEqual([second], added)
+        self.assertEqual((first, second), manager.clients)
+        self.assertEqual(1, manager.version)
+
+    def test_001_widget_state(self):
+        """Remembered widget values are merged per view."""
+        manager = ClientManager()
+        self.assertEqual({}, manager.recall("Tournaments"))
+        manager.remember("Tournaments", tournament="a", other=1)
+        manager.remember("Tournaments", tournament="b")
+        self.assertEqual({"tournament": "b", "other": 1}, manager.recall("Tournaments"))
+
+    def test_002_resize(self):
+        """Rebuilding the scenes after a resize keeps added clients and the picked client."""
+        scheduler, standings = RedrawScheduler(), TournamentStandings()
+        manager = create_client_manager(scheduler=scheduler, standings=standings, clients=[_NoneProvider()])
+        scenes = setup_scenes(screen=_screen(40, 140), theme="default", scheduler=scheduler, standings=standings,
+                              manager=manager)
+        added = _NoneProvider()
+        manager.add(added)
+        self.assertTrue(scheduler.take_clients_changed())
+        main_frame = scenes[0].effects[0]
+        main_frame._set_ais()
+        main_frame._ai_list.value = added
+        self.assertIs(added, manager.selected)
+
+        scenes = setup_scenes(screen=_screen(30, 100), theme="default", scheduler=scheduler, standings=standings,
+                              manager=manager)
+        main_frame = scenes[0].effects[0]
+        self.assertEqual(2, len(main_frame._ai_list.options))
+        self.assertIs(added, main_frame.current_client)
+        # The form to add clients is only created when it is shown
+        self.assertEqual([], scenes[1].effects)
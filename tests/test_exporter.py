@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.exporter`."""
+
+import unittest
+from urllib.request import urlopen
+
+from j_chess_client_manager.clients import _NoneProvider
+from j_chess_client_manager.clients.latency import LatencyHistogram
+from j_chess_client_manager.clients.snapshot import ClientSnapshot
+from j_chess_client_manager.exporter import MetricsExporter, render_metrics
+from j_chess_client_manager.logging import SYSTEM_LOGGER
+
+
+def _snapshot(name: str) -> ClientSnapshot:
+    moves = LatencyHistogram()
+    moves.record(0.5)
+    return ClientSnapshot(name=name, tournament_code=None, own_time=30000, enemy_time=20000, clock_warning=0.0,
+                          matches=1, games=3, wins=2, losses=0, draws=1, moves=moves.summary(),
+                          overhead=LatencyHistogram().summary())
+
+
+class _Provider(_NoneProvider):
+
+    @property
+    def snapshot(self):
+        return _snapshot("Bot \"1\"")
+
+
+class TestExporter(unittest.TestCase):
+    """Tests for the metrics exporter."""
+
+    def test_000_render(self):
+        """Snapshots are rendered in the text format."""
+        SYSTEM_LOGGER.info("Rendering metrics")
+        text = render_metrics([(0, _snapshot("Bot"))], frame_times=LatencyHistogram().summary(),
+                              redraws={"repaints": 4})
+        self.assertIn('jchess_move_seconds{quantile="0.5",client="0",name="Bot",tournament=""} 0.5', text)
+        self.assertIn('jchess_move_seconds_count{client="0",name="Bot",tournament=""} 1', text)
+        self.assertIn('jchess_games_total{result="win",client="0",name="Bot",tournament=""} 2', text)
+        self.assertIn('jchess_clock_seconds{side="own",client="0",name="Bot",tournament=""} 30.0', text)
+        self.assertIn("# TYPE jchess_frame_seconds summary", text)
+        self.assertIn("jchess_redraw_repaints_total 4", text)
+        self.assertIn('jchess_log_records_total{code="SYS"}', text)
+
+    def test_001_serve(self):
+        """Metrics of added clients are served over http."""
+        exporter = MetricsExporter(port=0)
+        exporter.add_client(_Provider())
+        exporter.add_client(_NoneProvider())
+        exporter.start()
+        try:
+            with urlopen(f"http://127.0.0.1:{exporter.port}/metrics") as response:
+                text = response.read().decode("utf-8")
+                self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+        finally:
+            exporter.stop()
+        self.assertIn('name="Bot \\"1\\""', text)
+        self.assertNotIn('client="1"', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
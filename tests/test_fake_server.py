@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.fake_server`."""
+
+import time
+import unittest
+
+from j_chess_lib.ai.examples import Random
+from j_chess_lib.communication import MoveData
+
+from j_chess_client_manager.chess import Position, IllegalMove, apply_move
+from j_chess_client_manager.clients.factory import start_client, PROCESS_BACKEND
+from j_chess_client_manager.fake_server import FakeServer, START_FEN
+
+
+def _move(position: Position, origin: str, target: str, promotion: str = None) -> Position:
+    return apply_move(position, MoveData(from_value=origin, to=target, promotion_unit=promotion))[0]
+
+
+def _games(clients) -> int:
+    return sum(0 if ai.snapshot is None else ai.snapshot.games for _process, ai in clients)
+
+
+class TestApplyMove(unittest.TestCase):
+    """Tests for the moves played by the fake server."""
+
+    def test_000_pawn_moves(self):
+        """Double steps allow en passant which removes the passed pawn."""
+        position = _move(Position.from_fen(START_FEN), "e2", "e4")
+        self.assertEqual("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1", position.fen())
+        position = _move(_move(_move(position, "a7", "a6"), "e4", "e5"), "d7", "d5")
+        position, captured = apply_move(position, MoveData(from_value="e5", to="d6"))
+        self.assertEqual("p", captured)
+        self.assertEqual("rnbqkbnr/1pp1pppp/p2P4/8/8/8/PPPP1PPP/RNBQKBNR b KQkq - 0 3", position.fen())
+
+    def test_001_castling_and_promotion(self):
+        """Castling moves the rook and promotions default to a queen."""
+        position = _move(Position.from_fen("r3k3/1P6/8/8/8/8/8/4K2R w Kq - 3 20"), "e1", "g1")
+        self.assertEqual("r3k3/1P6/8/8/8/8/8/5RK1 b q - 4 20", position.fen())
+        position = _move(position, "e8", "c8")
+        self.assertEqual("2kr4/1P6/8/8/8/8/8/5RK1 w - - 5 21", position.fen())
+        self.assertEqual("Q", _move(position, "b7", "b8").piece_at(57))
+        self.assertEqual("N", _move(position, "b7", "b8", "n").piece_at(57))
+
+    def test_002_illegal(self):
+        """Moving nothing, an enemy piece or capturing an own piece is rejected."""
+        position = Position.from_fen(START_FEN)
+        for origin, target in (("e3", "e4"), ("e7", "e5"), ("a1", "a2"), ("z9", "a1")):
+            with self.assertRaises(IllegalMove):
+                apply_move(position, MoveData(from_value=origin, to=target))
+
+
+class TestFakeServer(unittest.TestCase):
+    """Tests for the fake server with real clients."""
+
+    def test_000_play(self):
+        """Two wrapped AIs are paired, play their games and are paired again."""
+        with FakeServer(games_per_match=2, max_plies=6) as server:
+            # j_chess_lib clients can not be stopped and fail once the server closes their connection, so they play in
+            # worker processes that are stopped before the server
+            clients = [start_client(ai_class=Random, ai_parameters={"name": f"Fake-{i}"}, backend=PROCESS_BACKEND,
+                                    connection_parameters=server.connection_parameters) for i in range(2)]
+            try:
+                deadline = time.monotonic() + 20
+                while (server.statistics()["matches"] < 2 or _games(clients) < 2) and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                statistics = server.statistics()
+            finally:
+                for process, _ai in clients:
+                    process.terminate()
+                    process.join()
+        self.assertEqual(2, statistics["logins"])
+        self.assertGreaterEqual(statistics["matches"], 2)
+        self.assertGreaterEqual(statistics["games"], 2)
+        self.assertGreaterEqual(statistics["move_latency"]["count"], 6)
+        self.assertEqual(0, statistics["disconnects"])
+        self.assertGreaterEqual(_games(clients), 2)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.fleet`."""
+
+import json
+import os
+import tempfile
+import unittest
+
+from j_chess_client_manager.fleet import load_fleet, FleetError
+
+
+class TestFleet(unittest.TestCase):
+    """Tests for reading fleet files."""
+
+    def _write(self, data) -> str:
+        fd, path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_000_load(self):
+        """Defaults, conversion and replicas are applied."""
+        path = self._write({
+            "connection": {"address": "localhost", "port": "5123"},
+            "clients": [{"ai": "Random", "parameters": {"name": "Bot-{replica}", "min_turn_time": "2"},
+                         "connection": {"port": 5124}, "tournament_code": "generate", "replicas": 3}]
+        })
+        fleet = load_fleet(path)
+        self.assertEqual(1, len(fleet))
+        entry = fleet[0]
+        self.assertEqual("Random", entry.ai_class.__name__)
+        self.assertEqual({"address": "localhost", "port": 5124}, entry.connection_parameters)
+        self.assertEqual(2, entry.ai_parameters["min_turn_time"])
+        self.assertEqual("Bot-2", entry.replica_parameters(2)["name"])
+        self.assertIsNotNone(entry.tournament_code)
+        self.assertEqual(3, entry.replicas)
+
+    def test_001_all_problems_reported(self):
+        """Every invalid entry is reported before anything starts."""
+        path = self._write({
+            "clients": [{"ai": "DoesNotExist"}, {"ai": "Random", "parameters": {"unknown": 1}},
+                        {"ai": "Random", "tournament_code": "no-uuid"}, {"ai": "Random"}]
+        })
+        with self.assertRaises(FleetError) as cm:
+            load_fleet(path)
+        self.assertEqual(3, len(cm.exception.problems))
+
+    def test_002_missing_parameter(self):
+        """Required parameters of the AI have to be given in the file."""
+        path = self._write({"clients": [{"ai": "PGNPlayer"}, {"ai": "PGNPlayer", "parameters": {"pgn": "1. e4"}}]})
+        with self.assertRaises(FleetError) as cm:
+            load_fleet(path)
+        self.assertEqual(1, len(cm.exception.problems))
+        self.assertIn("Client 0 (PGNPlayer)", cm.exception.problems[0])
+        self.assertIn("pgn", cm.exception.problems[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.import_profile` and the lazy imports of the manager."""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from j_chess_client_manager.import_profile import ImportProfiler
+
+
+class TestImportProfiler(unittest.TestCase):
+    """Tests for the import profiler."""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+        with open(os.path.join(self._directory.name, "_profiled_outer.py"), "w") as f:
+            f.write("import _profiled_inner\n")
+        with open(os.path.join(self._directory.name, "_profiled_inner.py"), "w") as f:
+            f.write("import time\ntime.sleep(0.02)\n")
+        sys.path.insert(0, self._directory.name)
+
+    def tearDown(self):
+        sys.path.remove(self._directory.name)
+        for name in ("_profiled_outer", "_profiled_inner"):
+            sys.modules.pop(name, None)
+        self._directory.cleanup()
+
+    def test_000_nested(self):
+        """Nested imports are timed and their time is not counted for the importing module itself."""
+        with ImportProfiler() as profiler:
+            import _profiled_outer
+        self.assertNotIn(profiler, sys.meta_path)
+        times = {x.name: x for x in profiler.times()}
+        self.assertEqual(0, times["_profiled_outer"].depth)
+        self.assertEqual(1, times["_profiled_inner"].depth)
+        self.assertGreaterEqual(times["_profiled_inner"].self_time, 0.02)
+        self.assertGreaterEqual(times["_profiled_outer"].cumulative, times["_profiled_inner"].cumulative)
+        self.assertLess(times["_profiled_outer"].self_time, 0.02)
+        self.assertIn("_profiled_inner", profiler.report())
+        # The real loader is handed back once the module is executed
+        self.assertIs(_profiled_outer.__spec__.loader, _profiled_outer.__loader__)
+        self.assertEqual("SourceFileLoader", type(_profiled_outer.__loader__).__name__)
+
+    def test_001_headless_without_ui(self):
+        """Headless mode and fleets never import the terminal UI."""
+        code = "import sys, j_chess_client_manager.headless, j_chess_client_manager.fleet; " \
+               "print(sorted(x for x in sys.modules if x.startswith(('asciimatics', 'pyperclip', " \
+               "'j_chess_client_manager.ui'))))"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual("[]", result.stdout.strip())
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.clients.latency`."""
+
+import unittest
+
+from j_chess_client_manager.clients.latency import LatencyHistogram, MoveTimings
+
+
+class TestLatency(unittest.TestCase):
+    """Tests for the move time histograms."""
+
+    def test_000_percentiles(self):
+        """Percentiles are accurate to the width of a bucket."""
+        histogram = LatencyHistogram()
+        for i in range(1, 101):
+            histogram.record(i / 1000)
+        self.assertEqual(100, histogram.count)
+        self.assertAlmostEqual(0.1, histogram.max)
+        self.assertAlmostEqual(0.0505, histogram.mean)
+        for q in (50, 90, 99):
+            self.assertGreaterEqual(histogram.percentile(q), q / 1000)
+            self.assertLessEqual(histogram.percentile(q), q / 1000 * 1.13)
+        self.assertAlmostEqual(0.1, histogram.percentile(100))
+        self.assertEqual(0, LatencyHistogram().percentile(50))
+
+    def test_001_extremes(self):
+        """Values outside of the range end up in the first and last bucket."""
+        histogram = LatencyHistogram(min_value=1e-3, max_value=1)
+        histogram.record(0)
+        histogram.record(10)
+        self.assertEqual(1e-3, histogram.percentile(50))
+        self.assertEqual(10, histogram.percentile(100))
+
+    def test_002_games(self):
+        """Moves are aggregated per game and only the newest games are kept."""
+        timings = MoveTimings(max_games=2)
+        for game in ("a", "b", "c"):
+            for _ in range(3):
+                timings.record_move(game, 0.5)
+                timings.record_overhead(game, 0.001)
+        self.assertEqual(["b", "c"], list(timings.games().keys()))
+        game = timings.game()
+        self.assertEqual(3, game.moves)
+        self.assertAlmostEqual(1.5, game.total)
+        self.assertAlmostEqual(0.003, game.overhead)
+        self.assertEqual(9, timings.moves()["count"])
+        self.assertEqual(["Move time", "Wrapper overhead", "Game move time"], [x for x, _ in timings.metrics()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.ui.widgets.log`."""
+
+import logging
+import unittest
+from unittest import mock
+
+from j_chess_client_manager.logging import LOG_STORE
+from j_chess_client_manager.ui.widgets.log import LogList
+
+
+def _log(message: str):
+    record = logging.makeLogRecord({"msg": message, "levelno": logging.INFO, "levelname": "INFO"})
+    record.message = record.getMessage()
+    LOG_STORE.append("TEST", record)
+
+
+def _log_list(width: int, height: int = 6) -> LogList:
+    log_list = LogList("Logs", height=height)
+    log_list.register_frame(mock.MagicMock(palette={"label": (7, 0, 0)}))
+    log_list.set_layout(0, 0, 0, width, height)
+    return log_list
+
+
+class TestLogList(unittest.TestCase):
+    """Tests for the list of logs shown in the ui."""
+
+    def test_000_line_cache(self):
+        """Lines are only formatted for new records or a new width."""
+        for i in range(10):
+            _log(f"Message {i}")
+        log_list = _log_list(width=80)
+        log_list.update(0)
+        formatted = log_list.formatted_lines
+        self.assertEqual(5, formatted)
+        log_list.update(1)
+        self.assertEqual(formatted, log_list.formatted_lines)
+
+        _log("Message 10")
+        log_list.update(2)
+        self.assertEqual(formatted + 1, log_list.formatted_lines)
+
+        log_list.set_layout(0, 0, 0, 60, 6)
+        log_list.update(3)
+        self.assertEqual(formatted + 6, log_list.formatted_lines)
+        # noinspection PyProtectedMember
+        self.assertTrue(all(len(x) <= 56 for x in log_list._shown_lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
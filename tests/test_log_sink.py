@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.logging.sink` and `j_chess_client_manager.logging.viewer`."""
+
+import logging
+import os
+import tempfile
+import unittest
+
+from j_chess_client_manager.logging.sink import RotatingLogSink, list_segments
+from j_chess_client_manager.logging.viewer import LogArchive
+
+
+def _record(message: str) -> logging.LogRecord:
+    return logging.makeLogRecord({"msg": message, "levelno": logging.INFO, "levelname": "INFO"})
+
+
+class TestLogSink(unittest.TestCase):
+    """Tests for the rotating log sink and its viewer."""
+
+    def setUp(self):
+        self._directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self._directory.cleanup()
+
+    def test_000_rotation(self):
+        """Segments are rotated and the oldest ones deleted."""
+        sink = RotatingLogSink(self._directory.name, max_bytes=1024, max_segments=3, batch_size=4)
+        for i in range(200):
+            sink.put("A" if i % 2 == 0 else "B", _record(f"message {i}"))
+        sink.close()
+        self.assertEqual(200, sink.written)
+        segments = list_segments(self._directory.name)
+        self.assertEqual(3, len(segments))
+        self.assertTrue(all(os.path.getsize(path) <= 1024 for _, path in segments))
+
+    def test_001_viewer(self):
+        """The viewer pages through all segments in order."""
+        sink = RotatingLogSink(self._directory.name, max_bytes=512, max_segments=100)
+        for i in range(50):
+            sink.put("A" if i % 2 == 0 else "B", _record(f"message {i}"))
+        sink.close()
+        with LogArchive(self._directory.name) as archive:
+            self.assertEqual(50, len(archive))
+            self.assertEqual(["message 10", "message 11"], [x["m"] for x in archive.page(10, 2)])
+            self.assertEqual(["message 48", "message 49"], [x["m"] for x in archive.tail(2)])
+            self.assertEqual(["message 45", "message 47", "message 49"], [x["m"] for x in archive.tail(3, "B")])
+            self.assertEqual(["message 2", "message 4"], [x["m"] for x in archive.page(1, 2, "A")])
+
+    def test_002_partial_line(self):
+        """A partially written last line is ignored."""
+        sink = RotatingLogSink(self._directory.name)
+        sink.put("A", _record("complete"))
+        sink.close()
+        with open(list_segments(self._directory.name)[-1][1], "ab") as f:
+            f.write(b'{"t": 0')
+        with LogArchive(self._directory.name) as archive:
+            self.assertEqual(["complete"], [x["m"] for x in archive.tail(10)])
+
+
+if __name__ == '__main__':
+    unittest.main()
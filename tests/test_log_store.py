@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.logging.store`."""
+
+import logging
+import queue
+import time
+import unittest
+
+from j_chess_client_manager.logging.store import LogStore
+
+
+def _record(message: str, level: int = logging.INFO, created: float = None) -> logging.LogRecord:
+    record = logging.makeLogRecord({"msg": message, "levelno": level, "levelname": logging.getLevelName(level)})
+    if created is not None:
+        record.created = created
+    return record
+
+
+class TestLogStore(unittest.TestCase):
+    """Tests for the bounded log store."""
+
+    def test_000_capacity(self):
+        """Old records are evicted from the store and its indexes."""
+        store = LogStore(capacity=3)
+        for i in range(5):
+            store.append("A" if i % 2 == 0 else "B", _record(str(i)))
+        self.assertEqual(3, len(store))
+        self.assertEqual(2, store.evicted)
+        self.assertEqual(["2", "3", "4"], [r.msg for _, r in store.tail(10)])
+        self.assertEqual(["2", "4"], [r.msg for _, r in store.tail(10, "A")])
+        self.assertEqual(3, store.received("A"))
+        self.assertEqual({"A", "B"}, store.codes())
+
+    def test_001_tail_codes_and_levels(self):
+        """Tail merges several codes in order and filters levels."""
+        store = LogStore(capacity=100)
+        for i in range(10):
+            store.append("ABC"[i % 3], _record(str(i), logging.WARNING if i % 4 == 0 else logging.INFO))
+        self.assertEqual(["6", "7", "9"], [r.msg for _, r in store.tail(3, "A", "B")])
+        self.assertEqual(["0", "4", "8"], [r.msg for _, r in store.tail(5, level=logging.WARNING)])
+        self.assertEqual(["4"], [r.msg for _, r in store.tail(5, "B", level=logging.WARNING)])
+        self.assertEqual(7, store.count("A", "B"))
+        self.assertEqual([], store.tail(0))
+
+    def test_002_max_age_and_drain(self):
+        """Records older than max age are dropped and queues can be drained."""
+        store = LogStore(capacity=100, max_age=60)
+        log_queue = queue.Queue()
+        log_queue.put(("SYS", _record("old", created=time.time() - 120)))
+        log_queue.put(("SYS", _record("new")))
+        self.assertEqual(2, store.drain(log_queue))
+        self.assertEqual(["new"], [r.msg for _, r in store.tail(10)])
+        self.assertEqual(1, store.evicted)
+        store.configure(capacity=1, max_age=None)
+        self.assertEqual(1, len(store))
+
+
+if __name__ == '__main__':
+    unittest.main()
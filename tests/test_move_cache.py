@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.clients.move_cache`."""
+
+import atexit
+import os
+import tempfile
+import time
+import unittest
+from uuid import uuid4
+
+from j_chess_lib.ai import AI
+from j_chess_lib.ai.examples import Random
+from j_chess_lib.ai.board import BoardState
+from j_chess_lib.ai.container import GameState
+from j_chess_lib.communication import MoveData
+
+from j_chess_client_manager.clients.ai_wrapper import wrap_ai
+from j_chess_client_manager.clients.factory import start_client, PROCESS_BACKEND
+from j_chess_client_manager.clients.move_cache import MoveCache, get_move_cache, position_key, cache_namespace
+from j_chess_client_manager.clients.observers import add_game_observer, remove_game_observer
+from j_chess_client_manager.fake_server import FakeServer
+
+_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+class _Deterministic(AI):
+
+    def __init__(self, name: str = "Deterministic", depth: int = 1):
+        super().__init__(name=name)
+        self.searches = 0
+
+    def get_move(self, game_id, match_id, game_state: GameState) -> MoveData:
+        self.searches += 1
+        return MoveData(from_value="e2", to="e4")
+
+
+class TestMoveCache(unittest.TestCase):
+    """Tests for the move cache."""
+
+    def test_000_lru(self):
+        """The least recently used moves are dropped and namespaces do not share moves."""
+        cache = MoveCache(enabled=True, max_entries=2)
+        cache.put("a", _FEN, MoveData(from_value="e2", to="e4"))
+        cache.put("a", "8/8/8/8/8/8/8/K6k w - - 0 1", MoveData(from_value="a1", to="a2"))
+        self.assertIsNone(cache.get("b", _FEN))
+        self.assertEqual("e4", cache.get("a", _FEN.replace(" 0 1", " 7 30")).to)
+        cache.put("b", _FEN, MoveData(from_value="d2", to="d4"))
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get("a", "8/8/8/8/8/8/8/K6k w - - 0 1"))
+        self.assertEqual("e4", cache.get("a", _FEN).to)
+        self.assertEqual("d4", cache.get("b", _FEN).to)
+        self.assertEqual("8/8/8/8/8/8/8/K6k b - -", position_key("8/8/8/8/8/8/8/K6k b - - 12 40"))
+
+    def test_001_persistence(self):
+        """Moves are saved to and loaded from a file."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "moves.json")
+            cache = MoveCache(enabled=True, path=path)
+            cache.put("a", _FEN, MoveData(from_value="g7", to="g8", promotion_unit="N"))
+            cache.save()
+            loaded = MoveCache(enabled=True, path=path)
+            move = loaded.get("a", _FEN)
+            for x in (cache, loaded):
+                atexit.unregister(x.save)
+            self.assertEqual(("g7", "g8", "N"), (move.from_value, move.to, move.promotion_unit))
+
+    def test_002_wrapper(self):
+        """A wrapped AI is only asked for positions it did not see yet and reports its hit rate."""
+        cache = get_move_cache()
+        settings = cache.settings()
+        cache.configure(enabled=True)
+        try:
+            ais = [wrap_ai(_Deterministic, init_values={"name": f"Cached-{i}", "depth": 3}) for i in range(2)]
+            other = wrap_ai(_Deterministic, init_values={"name": "Other", "depth": 4})
+        finally:
+            cache.configure(*settings)
+        for ai in ais + [other]:
+            for _ in range(2):
+                move = ai.get_move(game_id=uuid4(), match_id=uuid4(), game_state=GameState(
+                    enemy_time=1000, your_time=1000, last_move=None, board_state=BoardState(fen=_FEN)))
+                self.assertEqual("e4", move.to)
+        self.assertEqual([1, 0, 1], [x.searches for x in ais + [other]])
+        self.assertEqual((1, 1), (ais[0].move_cache.hits, ais[0].move_cache.misses))
+        self.assertEqual(1.0, ais[1].move_cache.hit_rate)
+        self.assertIn("hit rate 50%", dict(ais[0].move_cache.metrics())["Move cache"])
+        self.assertIsNone(wrap_ai(_Deterministic, init_values={}).move_cache)
+
+    def test_003_process(self):
+        """Clients in worker processes start with the moves of the manager and send back the moves they learn."""
+        cache = get_move_cache()
+        settings = cache.settings()
+        namespace = cache_namespace(Random, {})
+        cache.configure(enabled=True)
+        processes, games = [], []
+        add_game_observer(games.append)
+        try:
+            cache.put(namespace, _FEN, MoveData(from_value="e2", to="e4"))
+            with FakeServer(games_per_match=2, max_plies=6) as server:
+                for i in range(2):
+                    process, provider = start_client(ai_class=Random, ai_parameters={"name": f"Worker-{i}"},
+                                                     connection_parameters=server.connection_parameters,
+                                                     backend=PROCESS_BACKEND)
+                    processes.append((process, provider))
+                deadline = time.monotonic() + 30
+                while (len(games) < 4 or len(cache.moves(namespace)) < 5) and time.monotonic() < deadline:
+                    time.sleep(0.05)
+        finally:
+            remove_game_observer(games.append)
+            cache.configure(*settings)
+            for process, _provider in processes:
+                process.terminate()
+                process.join()
+        self.assertGreaterEqual(len(cache.moves(namespace)), 5)
+        self.assertEqual(("e2", "e4", None), dict(cache.moves(namespace))[position_key(_FEN)])
+        # Every game starts with the move the workers got from the manager
+        self.assertGreaterEqual(len(games), 4)
+        self.assertTrue(all(x.pgn.startswith("1. e2-e4 ") for x in games), [x.pgn for x in games])
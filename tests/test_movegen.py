@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.chess.movegen`."""
+
+import unittest
+
+from j_chess_client_manager.chess import Position, Move, apply_move_squares, check_move, in_check, legal_moves, \
+    has_legal_move, parse_square, san
+
+START = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+
+def _perft(position: Position, depth: int) -> int:
+    if depth == 0:
+        return 1
+    moves = legal_moves(position)
+    if depth == 1:
+        return len(moves)
+    return sum(_perft(apply_move_squares(position, x.origin, x.target, x.promotion)[0], depth - 1) for x in moves)
+
+
+def _move(text: str) -> Move:
+    return Move(parse_square(text[:2]), parse_square(text[2:4]), text[4:].upper() or None)
+
+
+class TestMoveGeneration(unittest.TestCase):
+    """Tests for the legal move generator."""
+
+    def test_000_perft(self):
+        """Move counts of well known positions match the reference numbers."""
+        self.assertEqual(8902, _perft(Position.from_fen(START), 3))
+        self.assertEqual(2039, _perft(Position.from_fen(KIWIPETE), 2))
+        self.assertEqual(2812, _perft(Position.from_fen("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"), 3))
+        self.assertEqual(264, _perft(Position.from_fen(
+            "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1"), 2))
+
+    def test_001_check_move(self):
+        """Single moves are checked with a reason why they are illegal."""
+        position = Position.from_fen(START)
+        self.assertIsNone(check_move(position, "e2", "e4"))
+        self.assertIsNone(check_move(position, "g1", "f3"))
+        self.assertIn("No piece", check_move(position, "e7", "e5"))
+        self.assertIn("can not move", check_move(position, "e2", "e5"))
+        self.assertIsNotNone(check_move(position, "z9", "e4"))
+        self.assertIsNotNone(check_move(position, None, "e4"))
+        pinned = Position.from_fen("4k3/4r3/8/8/8/8/4B3/4K3 w - - 0 1")
+        self.assertIn("check", check_move(pinned, "e2", "d3"))
+        castle = Position.from_fen("4k3/8/8/8/8/8/5r2/4K2R w K - 0 1")
+        self.assertIsNotNone(check_move(castle, "e1", "g1"))
+        self.assertIsNone(check_move(Position.from_fen("4k3/8/8/8/8/8/8/4K2R w K - 0 1"), "e1", "g1"))
+        self.assertIn("promote", check_move(Position.from_fen("4k3/P7/8/8/8/8/8/4K3 w - - 0 1"), "a7", "a8", "K"))
+
+    def test_002_san(self):
+        """Moves are written in standard algebraic notation including checks and mates."""
+        position = Position.from_fen(START)
+        self.assertEqual("Nf3", san(position, _move("g1f3")))
+        self.assertEqual("e4", san(position, _move("e2e4")))
+        self.assertEqual("Rad1", san(Position.from_fen("4k3/8/8/8/8/8/4K3/R6R w - - 0 1"), _move("a1d1")))
+        self.assertEqual("O-O", san(Position.from_fen("4k3/8/8/8/8/8/8/R3K2R w K - 0 1"), _move("e1g1")))
+        promotion = Position.from_fen("4k3/P7/8/8/8/8/8/4K3 w - - 0 1")
+        self.assertEqual("a8=Q+", san(promotion, _move("a7a8q")))
+        fools_mate = Position.from_fen("rnbqkbnr/pppp1ppp/8/4p3/6P1/5P2/PPPPP2P/RNBQKBNR b KQkq g3 0 2")
+        self.assertEqual("Qh4#", san(fools_mate, _move("d8h4")))
+        mated = apply_move_squares(fools_mate, parse_square("d8"), parse_square("h4"))[0]
+        self.assertTrue(in_check(mated))
+        self.assertFalse(has_legal_move(mated))
+        self.assertFalse(has_legal_move(Position.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")))
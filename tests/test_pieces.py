@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.chess.pieces` and the chessboard drawing them."""
+
+import unittest
+from unittest import mock
+
+from j_chess_client_manager.chess.pieces import Pawn, King, PIECE_TYPES, piece_type, clear_path_cache, \
+    path_cache_size
+# noinspection PyProtectedMember
+from j_chess_client_manager.clients import _NoneProvider
+from j_chess_client_manager.clients.manager import ClientManager
+from j_chess_client_manager.ui.frames.main_frame import MainFrame
+from j_chess_client_manager.ui.scheduler import RedrawScheduler
+from j_chess_client_manager.ui.widgets.chessboard import ChessBoard, SHAPES, GLYPHS, LETTERS
+
+
+class _Start(_NoneProvider):
+
+    @property
+    def fen(self):
+        return "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+def _board(height: int, width: int, unicode_aware: bool = True) -> ChessBoard:
+    screen = mock.MagicMock(height=height, width=width, colours=8, unicode_aware=unicode_aware)
+    frame = MainFrame(screen=screen, scheduler=RedrawScheduler(), manager=ClientManager())
+    frame.fix()
+    # noinspection PyProtectedMember
+    board = frame._chessboard
+    board.data_provider = _Start()
+    return board
+
+
+class TestPieces(unittest.TestCase):
+    """Tests for the piece set."""
+
+    def test_000_piece_set(self):
+        """Every fen symbol has a piece with a glyph per color."""
+        self.assertEqual("KQRBNP", "".join(sorted(PIECE_TYPES.keys(), key="KQRBNP".index)))
+        self.assertIs(King, piece_type("k"))
+        self.assertIsNone(piece_type(""))
+        self.assertEqual(("♙", "♟"), (Pawn.glyph(True), Pawn.glyph(False)))
+        for piece in PIECE_TYPES.values():
+            for polygon in piece.path(100, 100):
+                self.assertTrue(all(0 <= x <= 100 and 0 <= y <= 100 for x, y in polygon))
+
+    def test_001_memoised_paths(self):
+        """Paths are scaled once per tile size and moved to the tile afterwards."""
+        clear_path_cache()
+        with mock.patch.object(Pawn, "_paths", wraps=Pawn._paths) as paths:
+            first = Pawn.path(10, 20)
+            moved = Pawn.path(10, 20, dx=5, dy=7)
+            self.assertEqual(1, paths.call_count)
+        self.assertEqual([[(x + 5, y + 7) for x, y in polygon] for polygon in first], moved)
+        self.assertEqual(1, path_cache_size())
+        clear_path_cache()
+        self.assertEqual(0, path_cache_size())
+
+    def test_002_board(self):
+        """The board draws shapes on large tiles and glyphs or letters on small ones."""
+        clear_path_cache()
+        board = _board(120, 240)
+        board.update(0)
+        self.assertEqual(64, board.tiles_redrawn)
+        # noinspection PyProtectedMember
+        geometry = board._board_geometry
+        self.assertGreaterEqual(geometry.tile_h, 3)
+        # noinspection PyProtectedMember
+        self.assertEqual(SHAPES, board._style(geometry, unicode_aware=True))
+        self.assertEqual(6, path_cache_size())
+        pieces_before = path_cache_size()
+        board.update(1)
+        self.assertEqual(0, board.tiles_redrawn)
+        self.assertEqual(pieces_before, path_cache_size())
+
+        small = _board(40, 140)
+        small.update(0)
+        # noinspection PyProtectedMember
+        geometry = small._board_geometry
+        # noinspection PyProtectedMember
+        self.assertEqual((GLYPHS, LETTERS), (small._style(geometry, True), small._style(geometry, False)))
+        self.assertRaises(ValueError, ChessBoard, piece_style="pictures")
+
+    def test_003_resize(self):
+        """Paths of the old tile size are dropped when a resize builds a new board with other tiles."""
+        clear_path_cache()
+        _board(120, 240).update(0)
+        Pawn.path(3, 3)
+        self.assertEqual(7, path_cache_size())
+        board = _board(120, 240)
+        board.update(0)
+        self.assertEqual(7, path_cache_size())
+        board = _board(100, 200)
+        board.update(0)
+        self.assertEqual(64, board.tiles_redrawn)
+        self.assertEqual(6, path_cache_size())
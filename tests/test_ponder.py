@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.clients.ponder`."""
+
+import threading
+import time
+import unittest
+from uuid import uuid4
+
+from j_chess_lib.ai import StoreAI
+from j_chess_lib.ai.board import BoardState
+from j_chess_lib.ai.board.utilities import get_possible_moves
+from j_chess_lib.ai.container import GameState
+from j_chess_lib.communication import MoveData
+
+from j_chess_client_manager.chess import Position, apply_move
+from j_chess_client_manager.clients.ai_wrapper import wrap_ai
+from j_chess_client_manager.clients.ponder import Ponderer, PonderState, likely_replies, get_ponderer
+
+_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+class _First(StoreAI):
+    """Plays the first of its possible moves."""
+
+    def __init__(self, name: str = "First"):
+        super().__init__(name=name)
+        self.searches = 0
+        self._lock = threading.Lock()
+
+    def get_move(self, game_id, match_id, game_state: GameState) -> MoveData:
+        with self._lock:
+            self.searches += 1
+        board = game_state.board_state
+        origin, target = min(get_possible_moves(board_state=board.get_board(), white=board.white_turn()))
+        return MoveData(from_value=f"{origin[0]}{origin[1]}", to=f"{target[0]}{target[1]}")
+
+
+class _Counting(_First):
+    """Counts its moves per game and remembers the last position like PGNPlayer and Random do."""
+
+    def __init__(self, name: str = "Counting"):
+        super().__init__(name=name)
+        self.steps = {}
+        self.last_fen = None
+        self.running = 0
+        self.overlaps = 0
+
+    def new_game(self, game_id, match_id, white_player: str):
+        super().new_game(game_id=game_id, match_id=match_id, white_player=white_player)
+        self.steps[(match_id, game_id)] = 0
+
+    def get_move(self, game_id, match_id, game_state: GameState) -> MoveData:
+        self.running += 1
+        if self.running > 1:
+            self.overlaps += 1
+        try:
+            self.steps[(match_id, game_id)] += 1
+            self.last_fen = game_state.board_state.fen
+            time.sleep(0.001)
+            return super().get_move(game_id, match_id, game_state)
+        finally:
+            self.running -= 1
+
+
+def _after(fen: str, *moves) -> str:
+    position = Position.from_fen(fen)
+    for origin, target in moves:
+        position = apply_move(position, MoveData(from_value=origin, to=target))[0]
+    return position.fen()
+
+
+class TestPonder(unittest.TestCase):
+    """Tests for pondering."""
+
+    def test_000_likely_replies(self):
+        """Captures of valuable pieces come first."""
+        replies = likely_replies("4k3/8/8/3q4/4P3/8/8/R3K3 w - - 0 1", limit=3)
+        self.assertEqual(3, len(replies))
+        self.assertEqual(("e4", "d5"), (replies[0].from_value, replies[0].to))
+        self.assertEqual(10, len(likely_replies(_FEN, limit=10)))
+
+    def test_001_state(self):
+        """Pondered positions are answered, all others are misses."""
+        ponderer = Ponderer(enabled=True, workers=1, replies=30)
+        state = PonderState(ponderer)
+        searched = []
+
+        def search(fen: str, reply: MoveData) -> MoveData:
+            searched.append(fen)
+            return MoveData(from_value=reply.to, to=reply.from_value)
+
+        state.start(fen=_FEN, move=MoveData(from_value="e2", to="e4"), search=search)
+        # The only worker finished all searches once it ran this
+        ponderer.submit(lambda: None).result()
+        self.assertEqual(20, len(searched))
+        move = state.take(_after(_FEN, ("e2", "e4"), ("d7", "d5")))
+        self.assertEqual(("d5", "d7"), (move.from_value, move.to))
+        self.assertIsNone(state.take(_FEN))
+        state.start(fen=_FEN, move=MoveData(from_value="e2", to="e4"), search=search)
+        self.assertIsNone(state.take("8/8/8/8/8/8/8/K6k w - - 0 1"))
+        self.assertEqual((1, 1, 0.5), (state.hits, state.misses, state.hit_rate))
+        self.assertGreaterEqual(state.wasted_cpu, 0)
+        self.assertIn("hit rate 50%", dict(state.metrics())["Ponder"])
+
+    def test_002_wrapper(self):
+        """A wrapped AI answers a pondered reply without searching again."""
+        ponderer = get_ponderer()
+        settings = ponderer.settings()
+        ponderer.configure(enabled=True, workers=1, replies=20)
+        try:
+            ai = wrap_ai(_First, init_values={"name": "Pondering"})
+            game_id, match_id = uuid4(), uuid4()
+
+            def state(fen: str, last_move: MoveData = None) -> GameState:
+                return GameState(enemy_time=1000, your_time=1000, last_move=last_move,
+                                 board_state=BoardState(fen=fen))
+
+            first = ai.get_move(game_id=game_id, match_id=match_id, game_state=state(_FEN))
+            ponderer.submit(lambda: None).result()
+            self.assertEqual(1, ai.searches)
+            reply = likely_replies(_after(_FEN, (first.from_value, first.to)), limit=1)[0]
+            fen = _after(_FEN, (first.from_value, first.to), (reply.from_value, reply.to))
+            move = ai.get_move(game_id=game_id, match_id=match_id, game_state=state(fen, reply))
+            self.assertEqual(_First().get_move(None, None, state(fen)), move)
+            self.assertEqual(1, ai.ponder.hits)
+            self.assertEqual(1, ai.searches)
+            ai.ponder.discard()
+        finally:
+            ponderer.configure(*settings)
+
+    def test_003_timeout(self):
+        """A pondered search that takes too long is not waited for."""
+        ponderer = Ponderer(enabled=True, workers=1, replies=1)
+        state = PonderState(ponderer)
+        release = threading.Event()
+
+        def search(fen: str, reply: MoveData) -> MoveData:
+            release.wait(5)
+            return MoveData(from_value=reply.to, to=reply.from_value)
+
+        state.start(fen=_FEN, move=MoveData(from_value="e2", to="e4"), search=search)
+        reply = likely_replies(_after(_FEN, ("e2", "e4")), limit=1)[0]
+        self.assertIsNone(state.take(_after(_FEN, ("e2", "e4"), (reply.from_value, reply.to)), timeout=0.05))
+        self.assertEqual((0, 1), (state.hits, state.misses))
+        release.set()
+        ponderer.submit(lambda: None).result()
+
+    def test_004_state_of_ai(self):
+        """Pondering neither changes the state of the AI nor searches twice at once."""
+        ponderer = get_ponderer()
+        settings = ponderer.settings()
+        ponderer.configure(enabled=True, workers=2, replies=20)
+        try:
+            ai = wrap_ai(_Counting, init_values={"name": "Counting"})
+            game_id, match_id = uuid4(), uuid4()
+            ai.new_match(match_id=match_id, enemy="Enemy", match_format=None)
+            ai.new_game(game_id=game_id, match_id=match_id, white_player="Counting")
+            ai.get_move(game_id=game_id, match_id=match_id, game_state=GameState(
+                enemy_time=1000, your_time=1000, last_move=None, board_state=BoardState(fen=_FEN)))
+            # Both workers are free once they meet here, so all pondered searches finished
+            barrier = threading.Barrier(2)
+            for future in [ponderer.submit(barrier.wait, 5) for _ in range(2)]:
+                future.result()
+            self.assertEqual({(match_id, game_id): 1}, ai.steps)
+            self.assertEqual(_FEN, ai.last_fen)
+            # noinspection PyProtectedMember
+            pondering = ai._ponder_ai
+            self.assertEqual({(match_id, game_id): 20}, pondering.steps)
+            self.assertEqual(0, pondering.overlaps)
+            self.assertFalse(pondering.should_stop())
+            ai.ponder.discard()
+        finally:
+            ponderer.configure(*settings)
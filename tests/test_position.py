@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.chess.position`."""
+
+import sys
+import unittest
+
+from j_chess_client_manager.chess import Position, parse_square, square_name
+
+START = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+class TestPosition(unittest.TestCase):
+    """Tests for the compact position."""
+
+    def test_000_fen_round_trip(self):
+        """Positions are created from and turned back into fens."""
+        fen = "rnbqkbnr/pp1ppppp/8/2p5/4P3/5N2/PPPP1PPP/RNBQKB1R b Kq c6 1 2"
+        position = Position.from_fen(fen)
+        self.assertEqual(fen, position.fen())
+        self.assertFalse(position.white_turn)
+        self.assertTrue(position.can_castle("K"))
+        self.assertFalse(position.can_castle("k"))
+        self.assertEqual("c6", square_name(position.en_passant))
+        self.assertEqual(position, Position.from_fen(fen))
+        self.assertRaises(ValueError, Position.from_fen, "8/8/8 w - - 0 1")
+        self.assertRaises(ValueError, Position.from_fen, "8/8/8/8/8/8/8/7x w - - 0 1")
+
+    def test_001_queries(self):
+        """Pieces are counted, listed and turned into bitboards."""
+        position = Position.from_fen(START)
+        self.assertEqual("K", position.piece_at(parse_square("e1")))
+        self.assertEqual("q", position.symbol(3, 7))
+        self.assertEqual(8, position.count("p"))
+        self.assertEqual([parse_square("b1"), parse_square("g1")], position.piece_list("N"))
+        self.assertEqual(0xFF00, position.bitboard("P"))
+        self.assertEqual(0xFFFF, position.occupancy(True))
+        self.assertEqual(0xFFFF00000000FFFF, position.occupancy())
+        self.assertEqual(39, position.material(True))
+        self.assertEqual(0, position.material_balance())
+        self.assertEqual(-9, Position.from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNB1KBNR w KQkq - 0 1")
+                         .material_balance())
+
+    def test_002_small(self):
+        """Positions have no instance dict and stay small."""
+        position = Position.from_fen(START)
+        self.assertFalse(hasattr(position, "__dict__"))
+        self.assertLess(sys.getsizeof(position) + sys.getsizeof(position.squares), 256)
+
+
+if __name__ == '__main__':
+    unittest.main()
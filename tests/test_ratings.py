@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.clients.ratings`."""
+
+import atexit
+import os
+import random
+import tempfile
+import unittest
+
+from j_chess_client_manager.archive import GameArchive
+from j_chess_client_manager.clients import ratings
+from j_chess_client_manager.clients.observers import GameResult, remove_game_observer
+from j_chess_client_manager.clients.ratings import RatingEngine
+
+
+def _games(count: int, seed: int = 7):
+    # Stronger players have a higher index and win more often
+    generator = random.Random(seed)
+    ret = []
+    for i in range(count):
+        first, second = generator.sample(range(6), 2)
+        roll = generator.random() + (first - second) * 0.1
+        score = 1.0 if roll > 0.6 else 0.0 if roll < 0.4 else 0.5
+        ret.append((f"game-{i}", f"Bot-{first}", f"Bot-{second}", score, 1000.0 + i * 60))
+    return ret
+
+
+class TestRatingEngine(unittest.TestCase):
+    """Tests for the Elo and Glicko-2 ratings."""
+
+    def test_000_glicko2_example(self):
+        """One rating period gives the numbers of the example in the Glicko-2 paper."""
+        engine = RatingEngine(period=10)
+        for name, rating, deviation in (("a", 1400, 30), ("b", 1550, 100), ("c", 1700, 300), ("p", 1500, 200)):
+            # noinspection PyProtectedMember
+            player = engine._player(name)
+            player.mu, player.phi, player.period = (rating - 1500) / ratings._SCALE, deviation / ratings._SCALE, -1
+        for opponent, score in (("a", 1.0), ("b", 0.0), ("c", 0.0)):
+            engine.add_game(None, "p", opponent, score, finished=5)
+        rating = engine.rating("p")
+        self.assertAlmostEqual(1464.06, rating.rating, places=1)
+        self.assertAlmostEqual(151.52, rating.deviation, places=1)
+        self.assertAlmostEqual(0.05999, rating.volatility, places=4)
+        self.assertIsNone(engine.rating("unknown"))
+
+    def test_001_rebuild(self):
+        """Rating game by game and rebuilding from the history give the same ratings."""
+        games = _games(500)
+        incremental, rebuilt = RatingEngine(period=3600), RatingEngine(period=3600)
+        for game in games:
+            incremental.add_game(*game)
+            # Both players of a game report it
+            incremental.add_game(game[0], game[2], game[1], 1.0 - game[3], game[4])
+        self.assertEqual(500, rebuilt.rebuild(games))
+        self.assertEqual(incremental.ratings(), rebuilt.ratings())
+        best = rebuilt.ratings()
+        self.assertEqual("Bot-5", best[0].name)
+        self.assertEqual("Bot-0", best[-1].name)
+        self.assertGreater(best[0].elo, best[-1].elo)
+        self.assertGreater(best[0].expected_score(best[-1]), 0.5)
+        self.assertEqual(1000, sum(x.games for x in best))
+        low, high = best[0].interval
+        self.assertLess(low, best[0].rating)
+        self.assertLess(high - low, 2 * 1.96 * 350)
+
+    def test_002_persistence(self):
+        """Saved ratings continue where they stopped, including the running rating period."""
+        games = _games(300)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ratings.json")
+            first = RatingEngine(path=path, period=3600)
+            atexit.unregister(first.save)
+            first.rebuild(games[:170])
+            first.save()
+            second = RatingEngine(path=path, period=3600)
+            atexit.unregister(second.save)
+            for expected, actual in zip(first.ratings(), second.ratings()):
+                self.assertEqual(expected.name, actual.name)
+                self.assertAlmostEqual(expected.rating, actual.rating, places=2)
+            for game in games[170:]:
+                second.add_game(*game)
+            complete = RatingEngine(period=3600)
+            complete.rebuild(games)
+            for expected, actual in zip(complete.ratings(), second.ratings()):
+                self.assertEqual(expected.name, actual.name)
+                self.assertAlmostEqual(expected.rating, actual.rating, places=2)
+                self.assertAlmostEqual(expected.elo, actual.elo, places=2)
+
+    def test_003_results_and_archive(self):
+        """Finished games of clients are rated once and the archive is a history to rebuild from."""
+        engine = RatingEngine(enabled=True)
+        self.addCleanup(remove_game_observer, engine.add_result)
+        self.assertEqual([("Rating", "no rated games")], engine.metrics("Bot"))
+        with tempfile.TemporaryDirectory() as directory:
+            archive = GameArchive(os.path.join(directory, "games.sqlite"))
+            for client, opponent in (("Bot", "Enemy"), ("Enemy", "Bot")):
+                result = GameResult.create(game_id="game", match_id="match", client=client, opponent=opponent,
+                                           tournament_code=None, white=client == "Bot", winner="Bot", pgn="")
+                engine.add_result(result)
+                archive.add(result)
+            archive.flush()
+            self.assertEqual(1, engine.rating("Bot").games)
+            self.assertGreater(engine.rating("Bot").elo, engine.rating("Enemy").elo)
+            metrics = dict(engine.metrics("Bot", "Enemy"))
+            self.assertIn("Elo 1516", metrics["Rating"])
+            self.assertIn("expected score", metrics["Opponent rating"])
+
+            rebuilt = RatingEngine()
+            self.assertEqual(1, rebuilt.rebuild(archive.outcomes()))
+            self.assertEqual(engine.ratings(), rebuilt.ratings())
+            archive.close()
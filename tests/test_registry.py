@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.clients.registry`."""
+
+import gc
+import os
+import sys
+import tempfile
+import unittest
+import weakref
+from unittest import mock
+
+from j_chess_lib.ai.examples import Random
+
+from j_chess_client_manager.clients import registry
+from j_chess_client_manager.clients.registry import AIEntry, AIRegistry
+
+_LAZY_MODULE = "j_chess_registry_lazy_ai"
+
+
+class TestAIRegistry(unittest.TestCase):
+    """Tests for the AI registry."""
+
+    def test_000_index(self):
+        """Imported AIs are indexed once and new ones are added as soon as they are defined."""
+        ai_registry = AIRegistry(use_entry_points=False)
+        entries = ai_registry.entries()
+        self.assertIn(Random, ai_registry.ai_classes())
+        self.assertIs(entries, ai_registry.entries())
+        self.assertIs(Random, ai_registry.find("Random"))
+        self.assertIs(Random, ai_registry.find("j_chess_lib.ai.examples:Random"))
+
+        class LateAI(Random):
+            pass
+
+        class _HiddenAI(Random):
+            pass
+
+        self.assertIn(LateAI, ai_registry.ai_classes())
+        self.assertNotIn(_HiddenAI, ai_registry.ai_classes())
+        self.assertIsNot(entries, ai_registry.entries())
+        # Classes that are not playable are not kept alive by the registry
+        hidden = weakref.ref(_HiddenAI)
+        del _HiddenAI
+        gc.collect()
+        self.assertIsNone(hidden())
+
+    def test_001_entry_points(self):
+        """AIs of entry points are listed without being imported until they are loaded."""
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, f"{_LAZY_MODULE}.py"), "w") as f:
+                f.write("from j_chess_lib.ai.examples import Random\n\n\nclass LazyAI(Random):\n    pass\n")
+            sys.path.insert(0, directory)
+            try:
+                with mock.patch.object(registry, "_entry_points",
+                                       return_value=[AIEntry(name="Lazy", path=f"{_LAZY_MODULE}:LazyAI")]):
+                    ai_registry = AIRegistry()
+                    entry = [x for x in ai_registry.entries() if x.name == "Lazy"][0]
+                self.assertFalse(entry.loaded)
+                self.assertNotIn(_LAZY_MODULE, sys.modules)
+                ai_class = ai_registry.find("Lazy")
+                self.assertEqual("LazyAI", ai_class.__name__)
+                self.assertTrue(entry.loaded)
+                self.assertEqual(1, len([x for x in ai_registry.entries() if x.path == f"{_LAZY_MODULE}:LazyAI"]))
+            finally:
+                sys.path.remove(directory)
+                sys.modules.pop(_LAZY_MODULE, None)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.ui.scheduler`."""
+
+import time
+import unittest
+
+from j_chess_client_manager.ui.scheduler import RedrawScheduler
+
+
+class _FakeScreen:
+
+    def __init__(self):
+        self.updates = 0
+
+    def force_update(self, full_refresh=False):
+        self.updates += 1
+
+
+class TestRedrawScheduler(unittest.TestCase):
+    """Tests for coalescing repaints."""
+
+    def test_000_coalesce(self):
+        """Many notifications of the visible client lead to few repaints."""
+        screen = _FakeScreen()
+        scheduler = RedrawScheduler(max_fps=5)
+        scheduler.attach(screen)
+        visible, hidden = object(), object()
+        scheduler.watch(visible)
+        for _ in range(100):
+            scheduler.notify(hidden)
+        for _ in range(100):
+            scheduler.notify(visible)
+        time.sleep(0.5)
+        self.assertEqual(200, scheduler.notifications)
+        self.assertGreaterEqual(screen.updates, 1)
+        self.assertLessEqual(screen.updates, 3)
+        self.assertEqual(screen.updates, scheduler.repaints)
+        self.assertTrue(scheduler.take_visible_changed())
+        self.assertFalse(scheduler.take_visible_changed())
+
+    def test_001_hidden_clients_do_not_repaint(self):
+        """Notifications of clients that are not visible are only counted."""
+        screen = _FakeScreen()
+        scheduler = RedrawScheduler(max_fps=50)
+        scheduler.attach(screen)
+        for _ in range(10):
+            scheduler.notify(object())
+        time.sleep(0.1)
+        self.assertEqual(0, screen.updates)
+        self.assertEqual(10, scheduler.notifications)
+
+    def test_002_max_fps(self):
+        """The frame rate has to be positive."""
+        self.assertRaises(ValueError, RedrawScheduler, max_fps=0)
+        self.assertRaises(ValueError, RedrawScheduler, max_fps=-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
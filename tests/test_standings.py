@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.clients.standings`."""
+
+import unittest
+
+from j_chess_client_manager.clients.latency import LatencyHistogram
+from j_chess_client_manager.clients.snapshot import ClientSnapshot
+from j_chess_client_manager.clients.standings import TournamentStandings, QUICK_PLAY
+
+
+class _Client:
+
+    def __init__(self, name: str, tournament_code: str = None):
+        self.name = name
+        self.tournament_code = tournament_code
+        self.snapshot = None
+        self.moves = LatencyHistogram()
+
+    def play(self, result: str = None, move: float = 0.1, in_game: bool = False, clock_warnings: int = 0):
+        self.moves.record(move)
+        old = self.snapshot
+        self.snapshot = ClientSnapshot(
+            name=self.name, tournament_code=self.tournament_code, own_time=0, enemy_time=0, clock_warning=0.0,
+            matches=0, games=(0 if old is None else old.games) + (result is not None),
+            wins=(0 if old is None else old.wins) + (result == "win"),
+            losses=(0 if old is None else old.losses) + (result == "loss"),
+            draws=(0 if old is None else old.draws) + (result == "draw"),
+            moves=self.moves.summary(), overhead=self.moves.summary(), in_game=in_game,
+            clock_warnings=clock_warnings,
+        )
+
+
+class TestTournamentStandings(unittest.TestCase):
+    """Tests for the incremental tournament standings."""
+
+    def test_000_standings(self):
+        """Clients are grouped by tournament and ordered by score."""
+        standings = TournamentStandings()
+        a, b, c = _Client("A", "T"), _Client("B", "T"), _Client("C")
+        for client in (a, b, c):
+            standings.update(client)
+        self.assertEqual([], standings.tournaments())
+        a.play("loss")
+        b.play("win", move=0.3)
+        c.play("draw", in_game=True)
+        for client in (a, b, c):
+            standings.update(client)
+        self.assertEqual([QUICK_PLAY, "T"], standings.tournaments())
+        self.assertEqual(["B", "A"], [x.name for x in standings.standings("T")])
+        a.play("win")
+        a.play("draw", in_game=True, clock_warnings=2)
+        standings.update(a)
+        self.assertEqual(["A", "B"], [x.name for x in standings.standings("T")])
+        self.assertEqual(1.5, standings.standings("T")[0].score)
+        summary = standings.summary("T")
+        self.assertEqual((2, 4, 1, 2), (summary.clients, summary.games, summary.in_progress, summary.clock_warnings))
+        self.assertAlmostEqual(0.15, summary.mean_move)
+
+    def test_001_versions(self):
+        """Versions only change when a new snapshot was applied."""
+        standings = TournamentStandings()
+        a, b = _Client("A", "T"), _Client("B", "U")
+        a.play()
+        b.play()
+        standings.update(a)
+        standings.update(b)
+        version, t_version = standings.version, standings.tournament_version("T")
+        sorted_standings = standings.standings("T")
+        standings.update(a)
+        self.assertEqual(version, standings.version)
+        b.play("win")
+        standings.update(b)
+        self.assertEqual(t_version, standings.tournament_version("T"))
+        self.assertIs(sorted_standings, standings.standings("T"))
+
+
+if __name__ == '__main__':
+    unittest.main()
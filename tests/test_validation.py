@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.clients.validation`."""
+
+import time
+import unittest
+from uuid import uuid4
+
+from j_chess_lib.ai import AI
+from j_chess_lib.ai.board import BoardState
+from j_chess_lib.ai.container import GameState
+from j_chess_lib.communication import MoveData
+
+from j_chess_client_manager.chess import Position, is_legal
+from j_chess_client_manager.clients.ai_wrapper import wrap_ai
+from j_chess_client_manager.clients.validation import MoveValidator, ValidationState, get_move_validator, \
+    pick_legal_move, LEGAL, RETRY
+
+_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+class _Scripted(AI):
+    """Plays the given moves one after another."""
+
+    def __init__(self, name: str = "Scripted", moves=("e2e5", "e2e4")):
+        super().__init__(name=name)
+        self._moves = list(moves)
+        self.asked = 0
+
+    def get_move(self, game_id, match_id, game_state: GameState) -> MoveData:
+        move = self._moves[min(self.asked, len(self._moves) - 1)]
+        self.asked += 1
+        return MoveData(from_value=move[:2], to=move[2:4])
+
+
+class _Slow(_Scripted):
+    """Takes its time for every move."""
+
+    def get_move(self, game_id, match_id, game_state: GameState) -> MoveData:
+        time.sleep(0.05)
+        return super().get_move(game_id, match_id, game_state)
+
+
+def _state(fen: str = _FEN) -> GameState:
+    return GameState(enemy_time=1000, your_time=1000, last_move=None, board_state=BoardState(fen=fen))
+
+
+class TestMoveValidation(unittest.TestCase):
+    """Tests for checking moves before they are sent."""
+
+    def test_000_pick_legal_move(self):
+        """The legal move captures the most valuable piece and there is none when the game is over."""
+        move = pick_legal_move(Position.from_fen("4k3/8/8/3q4/4P3/8/8/R3K3 w - - 0 1"))
+        self.assertEqual(("e4", "d5"), (move.from_value, move.to))
+        promotion = pick_legal_move(Position.from_fen("4k3/8/8/8/8/8/p7/4K3 b - - 0 1"))
+        self.assertEqual(("a2", "a1", "q"), (promotion.from_value, promotion.to, promotion.promotion_unit))
+        self.assertIsNone(pick_legal_move(Position.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")))
+
+    def test_001_policies(self):
+        """Illegal moves are asked again or replaced, legal moves pass unchanged."""
+        validator = MoveValidator(enabled=True, policy=RETRY, retries=2)
+        state = ValidationState(validator)
+        legal = MoveData(from_value="g1", to="f3")
+        self.assertIs(legal, state.validate(_FEN, legal, ask=lambda: self.fail("Asked again")))
+        asked = iter([MoveData(from_value="e2", to="e5"), MoveData(from_value="d2", to="d4")])
+        move = state.validate(_FEN, MoveData(from_value="e7", to="e5"), ask=lambda: next(asked))
+        self.assertEqual(("d2", "d4"), (move.from_value, move.to))
+        self.assertEqual((1, 2, 0), (state.illegal, state.retried, state.replaced))
+
+        validator.configure(enabled=True, policy=LEGAL)
+        move = state.validate(_FEN, None, ask=lambda: self.fail("Asked again"))
+        self.assertTrue(is_legal(Position.from_fen(_FEN), move.from_value, move.to))
+        self.assertEqual((2, 2, 1), (state.illegal, state.retried, state.replaced))
+        self.assertEqual(5, state.timings.count)
+        self.assertEqual(1, state.pick_timings.count)
+        self.assertIn("replaced 1", dict(state.metrics())["Move validation"])
+        self.assertRaises(ValueError, validator.configure, enabled=True, policy="ignore")
+
+    def test_002_wrapper(self):
+        """A wrapped AI never sends an illegal move when validation is enabled."""
+        validator = get_move_validator()
+        settings = validator.settings()
+        validator.configure(enabled=True, policy=RETRY, retries=1)
+        try:
+            ai = wrap_ai(_Scripted, init_values={"name": "Validated"})
+            move = ai.get_move(game_id=uuid4(), match_id=uuid4(), game_state=_state())
+            self.assertEqual(("e2", "e4"), (move.from_value, move.to))
+            self.assertEqual(2, ai.asked)
+            self.assertEqual(1, ai.validation.illegal)
+            self.assertIn("Validation time", dict(ai.metrics()))
+            self.assertEqual(1, ai.move_timings.moves()["count"])
+
+            ai = wrap_ai(_Scripted, init_values={"name": "Stubborn", "moves": ("e2e5",)})
+            move = ai.get_move(game_id=uuid4(), match_id=uuid4(), game_state=_state())
+            self.assertTrue(is_legal(Position.from_fen(_FEN), move.from_value, move.to))
+            self.assertEqual(1, ai.validation.replaced)
+
+            ai = wrap_ai(_Slow, init_values={"name": "Slow"})
+            ai.get_move(game_id=uuid4(), match_id=uuid4(), game_state=_state())
+            self.assertEqual(2, ai.asked)
+            self.assertGreaterEqual(ai.move_timings.moves()["sum"], 0.1)
+            self.assertLess(ai.move_timings.overhead()["sum"], 0.05)
+        finally:
+            validator.configure(*settings)
+        self.assertIsNone(wrap_ai(_Scripted, init_values={"name": "Unchecked"}).validation)
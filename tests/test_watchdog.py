@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+
+"""Tests for `j_chess_client_manager.clients.watchdog`."""
+
+import time
+import unittest
+
+from j_chess_client_manager.clients.watchdog import ClockWatchdog
+
+
+class TestClockWatchdog(unittest.TestCase):
+    """Tests for the clock watchdog."""
+
+    def test_000_warnings(self):
+        """Warnings are given once per fraction and the search is asked to stop."""
+        watchdog = ClockWatchdog(fractions=(0.9, 0.2), stop_fraction=0.5, poll_interval=0.005)
+        warnings = []
+        search = watchdog.begin(client=self, budget=0.2, on_warning=warnings.append)
+        deadline = time.monotonic() + 2
+        while not search.stop_requested and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.assertTrue(search.stop_requested)
+        self.assertEqual([0.2], warnings)
+        while len(warnings) < 2 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.assertEqual([0.2, 0.9], warnings)
+        self.assertEqual(0.9, search.warning)
+        watchdog.end(search)
+
+    def test_001_unknown_budget(self):
+        """Moves without a known clock are not watched."""
+        watchdog = ClockWatchdog()
+        self.assertIsNone(watchdog.begin(client=self, budget=-0.001))
+        self.assertRaises(ValueError, watchdog.configure, fractions=(1.5,))
+
+
+if __name__ == '__main__':
+    unittest.main()